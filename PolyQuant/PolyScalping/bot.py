@@ -5,7 +5,7 @@ from loguru import logger
 from datetime import datetime
 import traceback
 
-from config import config
+from config import get_config
 from utils import current_timestamp, format_pct, format_price, truncate
 from models import Market, Position, ActiveOrder, OrderSide
 from clients import PolymarketClient
@@ -40,7 +40,7 @@ class ScalpingBot:
         self.tracker.add_callback(self.on_price_update)
         await self.tracker.start()
 
-        if not config.trading_enabled:
+        if not get_config().trading_enabled:
             logger.warning("TRADING IS DISABLED (Dry Run Mode)")
 
     async def run_loop(self):
@@ -91,7 +91,7 @@ class ScalpingBot:
                 del self.active_markets[mid]
 
         # Don't scan if we have max markets
-        if len(self.active_markets) >= config.max_concurrent_markets:
+        if len(self.active_markets) >= get_config().max_concurrent_markets:
             return
 
         # Fetch new
@@ -102,7 +102,7 @@ class ScalpingBot:
         logger.debug(f"Search found {len(candidates)} candidates for {query}")
         
         for c in candidates:
-            if len(self.active_markets) >= config.max_concurrent_markets:
+            if len(self.active_markets) >= get_config().max_concurrent_markets:
                 break
                 
             # Filter for asset name and "15m"
@@ -136,7 +136,7 @@ class ScalpingBot:
                 end_ts = datetime.fromisoformat(end_date.replace("Z", "+00:00")).timestamp()
                 if end_ts < now:
                     continue 
-                if end_ts - now < (config.min_time_to_expiry_minutes * 60):
+                if end_ts - now < (get_config().min_time_to_expiry_minutes * 60):
                     continue
                     
                 mid = c["id"]
@@ -189,7 +189,7 @@ class ScalpingBot:
 
     async def sync_positions(self):
         """Reconcile local state with Polymarket Data API."""
-        if not config.polymarket_wallet_address:
+        if not get_config().polymarket_wallet_address:
             return
 
         logger.info("Syncing positions & balances...")
@@ -200,7 +200,7 @@ class ScalpingBot:
             self.wallet_balance = bal
             
         # 2. Sync Positions
-        real_positions = await self.client.get_user_positions(config.polymarket_wallet_address)
+        real_positions = await self.client.get_user_positions(get_config().polymarket_wallet_address)
         # Process real positions to update self.positions
         # real_positions is a list of dicts with 'conditionId', 'token_id', 'size', etc.
         
@@ -336,8 +336,8 @@ class ScalpingBot:
                 # For now assume all are cancelable except maybe explicitly marked unwinds.
                 to_cancel.append(oid)
         
+        await self.client.cancel_orders(to_cancel)
         for oid in to_cancel:
-            await self.client.cancel_order(oid)
             del self.orders[oid]
 
     def has_order_at_level(self, market_id, token_id, price) -> bool:
@@ -349,7 +349,7 @@ class ScalpingBot:
 
     def check_global_risk(self):
         """Kill switch."""
-        if self.daily_pnl < -config.daily_loss_limit_usdc:
+        if self.daily_pnl < -get_config().daily_loss_limit_usdc:
             logger.critical("DAILY LOSS LIMIT REACHED. STOPPING BOT.")
             self.is_running = False
 
@@ -14,7 +14,7 @@ from scalping_strategy import BTCScalpingStrategy, AdvancedScalpingStrategy, Mar
 from multi_level_scalping_strategy import MultiLevelScalpingStrategy
 from clients import PolymarketClient
 from tracker import MarketDataStreamer
-from config import config
+from config import get_config
 from models import OrderSide
 
 
@@ -82,7 +82,7 @@ class BTCScalpingBot:
 
         logger.info(f"Initial BTC Price: ${self.price_tracker.get_current_price():,.2f}")
 
-        if not config.trading_enabled:
+        if not get_config().trading_enabled:
             logger.warning("⚠️  TRADING DISABLED - Running in DRY RUN mode")
 
         logger.info("Bot ready!")
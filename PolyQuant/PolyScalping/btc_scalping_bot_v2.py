@@ -19,7 +19,7 @@ from btc_price_tracker import BTCPriceTracker
 from multi_level_strategy_v2 import MultiLevelScalpingStrategyV2, MarketContext
 from clients import PolymarketClient
 from tracker import MarketDataStreamer
-from config import config
+from config import get_config
 from models import OrderSide
 
 
@@ -59,7 +59,7 @@ class BTCScalpingBotV2:
         """봇 메인 루프"""
         logger.info("="*100)
         logger.info("BTC Scalping Bot V2 Starting...")
-        logger.info(f"Trading: {'ENABLED' if config.trading_enabled else 'DISABLED (SIMULATION)'}")
+        logger.info(f"Trading: {'ENABLED' if get_config().trading_enabled else 'DISABLED (SIMULATION)'}")
         logger.info("="*100)
 
         # WebSocket 시작
@@ -349,12 +349,13 @@ class BTCScalpingBotV2:
             return
 
         order_ids = self.active_tp_orders[market_id]
-        for order_id in order_ids:
-            try:
-                await self.poly_client.cancel_order(order_id)
-                logger.info(f"  ✓ Cancelled TP order: {order_id}")
-            except Exception as e:
-                logger.warning(f"  ⚠️  Failed to cancel TP order {order_id}: {e}")
+        try:
+            if await self.poly_client.cancel_orders(order_ids):
+                logger.info(f"  ✓ Cancelled TP orders: {order_ids}")
+            else:
+                logger.warning(f"  ⚠️  Failed to cancel some TP orders: {order_ids}")
+        except Exception as e:
+            logger.warning(f"  ⚠️  Failed to cancel TP orders {order_ids}: {e}")
 
         # 리스트 클리어
         self.active_tp_orders[market_id] = []
@@ -4,89 +4,208 @@ BTC 스캘핑 봇 웹 서버
 """
 import asyncio
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from contextlib import asynccontextmanager
 from typing import List, Dict, Optional
+import itertools
+from collections import deque
 import json
 import time
+from datetime import datetime
+from pathlib import Path
 from loguru import logger
 
 from btc_scalping_bot import BTCScalpingBot
-from config import config
+from config import get_config as get_app_config
 from simple_dca_strategy import SimpleDCAStrategy
 from multi_level_scalping_strategy import MultiLevelScalpingStrategy
 from models import OrderSide
 
 
 # WebSocket 연결 관리
+class _ClientState:
+    """연결별 전송 상태"""
+    __slots__ = ("queue", "dirty_markets", "sent_markets", "wakeup")
+
+    def __init__(self, maxsize: int):
+        # 일반 메시지 (이벤트/거래/상태) - 가득 차면 가장 오래된 것부터 버림
+        self.queue: deque = deque(maxlen=maxsize)
+        # 마켓 상태는 큐에 넣지 않고 마켓별로 합침 → 전송 시 이 연결이 마지막으로 받은 상태와 비교
+        self.dirty_markets: set = set()
+        self.sent_markets: Dict[str, Dict] = {}
+        self.wakeup = asyncio.Event()
+
+
 class ConnectionManager:
+    # 브로드캐스트를 모아서 보내는 주기 (초)
+    BATCH_WINDOW = 0.05
+    # 연결별 일반 메시지 큐 최대 길이 (가득 차면 가장 오래된 메시지부터 버림)
+    QUEUE_MAXSIZE = 1000
+    # 프레임 전송 타임아웃 (초) - 초과 시 멈춘 클라이언트로 보고 연결 종료
+    SEND_TIMEOUT = 5.0
+
     def __init__(self):
         self.active_connections: List[WebSocket] = []
+        self._clients: Dict[WebSocket, _ClientState] = {}
+        self._senders: Dict[WebSocket, asyncio.Task] = {}
+        # 마켓별 최신 전체 상태 (새 연결 키프레임, /api/status 응답에 사용)
+        self.market_snapshots: Dict[str, Dict] = {}
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        state = self._clients[websocket] = _ClientState(self.QUEUE_MAXSIZE)
+        # 새 연결은 현재 모든 마켓을 market_update(전체)로 먼저 받음
+        if self.market_snapshots:
+            state.dirty_markets.update(self.market_snapshots)
+            state.wakeup.set()
+        self._senders[websocket] = asyncio.create_task(self._sender(websocket, state))
         logger.info(f"New WebSocket connection. Total: {len(self.active_connections)}")
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        if websocket not in self._clients:
+            return
+        if websocket in self.active_connections:
+            self.active_connections.remove(websocket)
+        self._clients.pop(websocket, None)
+        task = self._senders.pop(websocket, None)
+        if task and task is not asyncio.current_task():
+            task.cancel()
         logger.info(f"WebSocket disconnected. Total: {len(self.active_connections)}")
 
     async def broadcast(self, message: dict):
-        """모든 연결된 클라이언트에게 메시지 전송"""
-        if not self.active_connections:
-            return
-
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error sending message: {e}")
-                disconnected.append(connection)
+        """모든 연결된 클라이언트의 전송 큐에 메시지 추가 (실제 전송은 _sender가 묶어서 처리)"""
+        for state in self._clients.values():
+            state.queue.append(message)
+            state.wakeup.set()
+
+    async def broadcast_market(self, full_info: dict):
+        """마켓 전체 상태 갱신 - 연결별로 마지막 전송 상태와 비교해 market_update/market_delta 전송"""
+        market_id = full_info["id"]
+        self.market_snapshots[market_id] = full_info
+        for state in self._clients.values():
+            state.dirty_markets.add(market_id)
+            state.wakeup.set()
+
+    def remove_market(self, market_id: str):
+        """마켓 스냅샷 제거 (만료/수동 제거 시)"""
+        self.market_snapshots.pop(market_id, None)
+        for state in self._clients.values():
+            state.dirty_markets.discard(market_id)
+            state.sent_markets.pop(market_id, None)
+
+    def _market_messages(self, state: _ClientState) -> List[dict]:
+        """dirty 마켓을 이 연결 기준 메시지로 변환 (처음이면 전체, 이후엔 바뀐 필드만)"""
+        messages = []
+        for market_id in state.dirty_markets:
+            full_info = self.market_snapshots.get(market_id)
+            if full_info is None:
+                continue
+            prev = state.sent_markets.get(market_id)
+            state.sent_markets[market_id] = full_info
+            if prev is None:
+                messages.append({"type": "market_update", "data": full_info})
+                continue
+            changes = {k: v for k, v in full_info.items() if prev.get(k) != v}
+            if changes:
+                messages.append({"type": "market_delta", "id": market_id, "changes": changes})
+        state.dirty_markets.clear()
+        return messages
+
+    async def _sender(self, websocket: WebSocket, state: _ClientState):
+        """연결별 전송 루프: BATCH_WINDOW 동안 쌓인 메시지를 하나의 프레임으로 전송"""
+        try:
+            while True:
+                await state.wakeup.wait()
+                await asyncio.sleep(self.BATCH_WINDOW)
+                state.wakeup.clear()
+
+                batch = list(state.queue)
+                state.queue.clear()
+                batch.extend(self._market_messages(state))
+                if not batch:
+                    continue
+
+                payload = batch[0] if len(batch) == 1 else {"type": "batch", "messages": batch}
+                await asyncio.wait_for(websocket.send_json(payload), timeout=self.SEND_TIMEOUT)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning(f"WebSocket send timed out ({self.SEND_TIMEOUT}s) - closing stalled client")
+            await self._close(websocket)
+        except Exception as e:
+            logger.error(f"Error sending message: {e}")
+            await self._close(websocket)
 
-        # 끊긴 연결 제거
-        for conn in disconnected:
-            if conn in self.active_connections:
-                self.active_connections.remove(conn)
+    async def _close(self, websocket: WebSocket):
+        """연결 정리 후 소켓 종료 - 브라우저가 onclose를 받고 재연결하도록"""
+        self.disconnect(websocket)
+        try:
+            await asyncio.wait_for(websocket.close(code=1011), timeout=self.SEND_TIMEOUT)
+        except Exception:
+            pass
 
 
 manager = ConnectionManager()
+DASHBOARD_HTML = Path(__file__).parent / "static" / "dashboard.html"
 bot_instance: BTCScalpingBot = None
 bot_task = None
 
-# 거래 히스토리 저장
+# 거래 히스토리 저장 (최근 N개만 유지)
+MAX_TRADE_HISTORY = 100
+MAX_EVENT_LOG = 200
 trade_history: List[Dict] = []
 event_log: List[Dict] = []
+_trimmed_buffers: set = set()
+# 대시보드 v-for 키로 쓰는 단조 증가 ID (같은 초에 여러 건이 생겨도 충돌 없음)
+_trade_seq = itertools.count(1)
+_event_seq = itertools.count(1)
+
+
+def _append_bounded(buf: List[Dict], item: Dict, cap: int, name: str):
+    """버퍼에 추가하고 cap을 넘는 오래된 항목은 제자리에서 삭제"""
+    buf.append(item)
+    if len(buf) > cap:
+        del buf[:len(buf) - cap]
+        if name not in _trimmed_buffers:
+            # 처음 잘릴 때 한 번만 알림
+            _trimmed_buffers.add(name)
+            logger.warning(f"{name} is bounded to the last {cap} entries; older entries are being dropped")
+
+
+def _format_ts(ts: float) -> str:
+    """대시보드 표시용 시각 문자열 (레코드 생성 시 한 번만 포맷)"""
+    return datetime.fromtimestamp(ts).strftime('%H:%M:%S')
 
 
 # 봇 이벤트 콜백
 async def on_trade_executed(trade_info: dict):
     """거래 체결 시 호출"""
-    global trade_history, event_log
+    trade_info["seq"] = next(_trade_seq)
+    trade_info["ts_str"] = _format_ts(trade_info.get("timestamp") or time.time())
 
     # 히스토리에 추가
-    trade_history.append(trade_info)
-    if len(trade_history) > 100:
-        trade_history = trade_history[-100:]  # 최근 100개만 유지
+    _append_bounded(trade_history, trade_info, MAX_TRADE_HISTORY, "trade_history")
 
     # 이벤트 로그
+    now = time.time()
     event = {
+        "seq": next(_event_seq),
         "type": "trade",
-        "timestamp": time.time(),
+        "timestamp": now,
+        "ts_str": _format_ts(now),
         "data": trade_info
     }
-    event_log.append(event)
-    if len(event_log) > 200:
-        event_log = event_log[-200:]
+    _append_bounded(event_log, event, MAX_EVENT_LOG, "event_log")
 
     # 실시간 브로드캐스트
     await manager.broadcast({
         "type": "trade_executed",
-        "data": trade_info
+        "data": trade_info,
+        "event_seq": event["seq"]
     })
 
     logger.info(f"Trade executed: {trade_info}")
@@ -94,18 +213,21 @@ async def on_trade_executed(trade_info: dict):
 
 async def on_signal_generated(signal_info: dict):
     """신호 생성 시 호출"""
-    global event_log
-
+    now = time.time()
+    signal_info["ts_str"] = _format_ts(signal_info.get("timestamp") or now)
     event = {
+        "seq": next(_event_seq),
         "type": "signal",
-        "timestamp": time.time(),
+        "timestamp": now,
+        "ts_str": _format_ts(now),
         "data": signal_info
     }
-    event_log.append(event)
+    _append_bounded(event_log, event, MAX_EVENT_LOG, "event_log")
 
     await manager.broadcast({
         "type": "signal_generated",
-        "data": signal_info
+        "data": signal_info,
+        "event_seq": event["seq"]
     })
 
 
@@ -129,10 +251,7 @@ async def on_market_update(market_info: dict):
             "timestamp": market_info.get("timestamp", time.time())
         }
 
-        await manager.broadcast({
-            "type": "market_update",
-            "data": full_info
-        })
+        await manager.broadcast_market(full_info)
     else:
         await manager.broadcast({
             "type": "market_update",
@@ -189,7 +308,7 @@ class WebBTCScalpingBot(BTCScalpingBot):
         })
 
         # DRY RUN 모드에서는 거래 실행 및 로깅 스킵
-        if not config.trading_enabled:
+        if not get_app_config().trading_enabled:
             logger.error(f"❌ [DRY RUN MODE] {signal.action} signal BLOCKED - TRADING_ENABLED=False ❌")
             logger.error(f"   Would execute: {signal.action} {signal.token_id[:8]} @ {signal.price} x{signal.size}")
             return
@@ -378,17 +497,19 @@ class WebBTCScalpingBot(BTCScalpingBot):
             # ⚠️ 먼저 활성 TP limit order들을 취소
             market_id = ctx.market_id
             if market_id in self.strategy.active_exit_orders:
-                order_ids = self.strategy.active_exit_orders[market_id]
-                logger.warning(f"🚫 Cancelling {len(order_ids)} active TP limit orders before EXIT...")
-                for order_id in order_ids:
+                # 실패 표시용 마커는 실제 주문이 아니므로 제외하고 한 번에 취소
+                order_ids = [o for o in self.strategy.active_exit_orders[market_id]
+                             if o not in ("insufficient-balance", "failed-order")]
+                if order_ids:
+                    logger.warning(f"🚫 Cancelling {len(order_ids)} active TP limit orders before EXIT...")
                     try:
-                        success = await self.poly_client.cancel_order(order_id)
+                        success = await self.poly_client.cancel_orders(order_ids)
                         if success:
-                            logger.info(f"✓ Cancelled TP limit order: {order_id}")
+                            logger.info(f"✓ Cancelled TP limit orders: {order_ids}")
                         else:
-                            logger.warning(f"⚠️ Failed to cancel TP limit order: {order_id}")
+                            logger.warning(f"⚠️ Failed to cancel some TP limit orders: {order_ids}")
                     except Exception as e:
-                        logger.error(f"Error cancelling order {order_id}: {e}")
+                        logger.error(f"Error cancelling orders {order_ids}: {e}")
                 # 취소 완료 후 리스트 클리어
                 self.strategy.active_exit_orders[market_id] = []
 
@@ -594,6 +715,12 @@ class WebBTCScalpingBot(BTCScalpingBot):
                 except Exception as e2:
                     logger.error(f"TP Limit Order retry failed: {e2}")
 
+    async def cleanup_expired_markets(self):
+        """만료된 마켓 정리 (오버라이드 - 대시보드 스냅샷도 함께 제거)"""
+        await super().cleanup_expired_markets()
+        for market_id in [m for m in manager.market_snapshots if m not in self.active_markets]:
+            manager.remove_market(market_id)
+
     async def evaluate_market(self, market_id: str, ctx):
         """마켓 평가 (오버라이드 - 실시간 업데이트 추가)"""
         # 가격 변경 추적을 위해 이전 가격 저장
@@ -665,8 +792,8 @@ async def lifespan(app: FastAPI):
     global bot_instance, bot_task
 
     logger.info("Starting BTC Scalping Web Server...")
-    logger.critical(f"🚨 TRADING_ENABLED = {config.trading_enabled} 🚨")
-    if not config.trading_enabled:
+    logger.critical(f"🚨 TRADING_ENABLED = {get_app_config().trading_enabled} 🚨")
+    if not get_app_config().trading_enabled:
         logger.error("⚠️  BOT IS IN DRY RUN MODE - NO REAL ORDERS WILL BE PLACED ⚠️")
     else:
         logger.success("✅ LIVE TRADING MODE ACTIVE ✅")
@@ -788,6 +915,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# /api/dashboard 등 JSON 응답 압축
+app.add_middleware(GZipMiddleware, minimum_size=512)
 
 
 # API Models
@@ -802,20 +931,29 @@ async def get_status():
     if not bot_instance:
         return {"status": "initializing"}
 
+    # WebSocket으로 보낸 것과 같은 필드/값 (yes_price/no_price = Mid) - 폴링이 WS 상태를 덮어써도 어긋나지 않음
     active_markets_info = []
     for market_id, ctx in bot_instance.market_contexts.items():
-        market = bot_instance.active_markets.get(market_id, {})
-        summary = bot_instance.strategy.get_position_summary(ctx)
+        snapshot = manager.market_snapshots.get(market_id)
+        if snapshot is not None:
+            active_markets_info.append(snapshot)
+            continue
 
+        # 아직 브로드캐스트 전인 마켓은 같은 형식으로 직접 구성
+        market = bot_instance.active_markets.get(market_id, {})
+        bid_yes, ask_yes = bot_instance.orderbook_tracker.get_price(ctx.token_yes)
+        bid_no, ask_no = bot_instance.orderbook_tracker.get_price(ctx.token_no)
         active_markets_info.append({
             "id": market_id,
             "question": market.get("question", "Unknown"),
+            "yes_price": (bid_yes + ask_yes) / 2 if bid_yes and ask_yes else ctx.yes_price,
+            "no_price": (bid_no + ask_no) / 2 if bid_no and ask_no else ctx.no_price,
             "time_remaining": ctx.end_time - time.time(),
-            "yes_price": ctx.yes_price,
-            "no_price": ctx.no_price,
-            "position": summary,
+            "position": bot_instance.strategy.get_position_summary(ctx),
             "liquidity": market.get("liquidity", 0),
-            "volume": market.get("volume", 0)
+            "volume": market.get("volume", 0),
+            "btc_price": bot_instance.price_tracker.get_current_price(),
+            "timestamp": time.time()
         })
 
     # 거래 히스토리에서 통계 계산 (더 정확함)
@@ -844,9 +982,9 @@ async def get_status():
             "entry_success_rate": successful_entries / len(entry_trades) if len(entry_trades) > 0 else 0
         },
         "config": {
-            "trading_enabled": config.trading_enabled,
-            "max_concurrent_markets": config.max_concurrent_markets,
-            "daily_loss_limit": config.daily_loss_limit_usdc
+            "trading_enabled": get_app_config().trading_enabled,
+            "max_concurrent_markets": get_app_config().max_concurrent_markets,
+            "daily_loss_limit": get_app_config().daily_loss_limit_usdc
         }
     }
 
@@ -883,6 +1021,17 @@ async def get_websocket_status():
     return status
 
 
+@app.get("/api/dashboard")
+async def get_dashboard_data():
+    """대시보드 폴링용 통합 응답 (status/trades/events/ws_status를 한 번에)"""
+    return {
+        "status": await get_status(),
+        "trades": await get_trades(),
+        "events": await get_events(),
+        "ws_status": await get_websocket_status()
+    }
+
+
 @app.post("/api/websocket_reconnect")
 async def reconnect_websocket():
     """WebSocket 재연결"""
@@ -1010,6 +1159,10 @@ async def update_config(config_update: ConfigUpdate):
         strategy.high_price_profit_pct = config_update.high_price_profit_pct / 100.0
         logger.info(f"Updated high_price_profit_pct to {config_update.high_price_profit_pct}%")
 
+    # 전략 내부 캐시 갱신 (목표가 등)
+    if hasattr(strategy, 'on_config_changed'):
+        strategy.on_config_changed()
+
     return {
         "status": "success",
         "config": {
@@ -1059,16 +1212,16 @@ async def emergency_unwind(market_id: str):
         closed_count = 0
         results = []
 
-        # 같은 side끼리 묶어서 처리
-        from collections import defaultdict
-        positions_by_side = defaultdict(list)
+        # 같은 side끼리 묶어서 처리 - 한 번 순회로 side별 수량/비용 합산
+        totals_by_side = {}
         for pos in positions:
-            positions_by_side[pos.side].append(pos)
+            size = pos.size
+            totals = totals_by_side.setdefault(pos.side, [0, 0])
+            totals[0] += size
+            totals[1] += size * pos.entry_price
 
         # 각 side별로 청산
-        for side, side_positions in positions_by_side.items():
-            total_size = sum(p.size for p in side_positions)
-            total_cost = sum(p.size * p.entry_price for p in side_positions)
+        for side, (total_size, total_cost) in totals_by_side.items():
             avg_entry = total_cost / total_size if total_size > 0 else 0
 
             logger.warning(f"   Closing {side} position: {total_size} shares @ avg {avg_entry:.3f}")
@@ -1149,8 +1302,11 @@ async def emergency_unwind(market_id: str):
                         "status": "failed"
                     })
 
-        # 포지션 클리어
-        bot_instance.strategy.positions[market_id] = []
+        # 포지션 클리어 (합산 캐시도 함께)
+        if hasattr(bot_instance.strategy, 'clear_positions'):
+            bot_instance.strategy.clear_positions(market_id)
+        else:
+            bot_instance.strategy.positions[market_id] = []
 
         # 해당 마켓 자동 거래 중지 (거래 횟수 최대치로 설정)
         bot_instance.strategy.trade_count[market_id] = bot_instance.strategy.max_trades_per_market
@@ -1301,6 +1457,7 @@ async def remove_market(market_id: str):
             del bot_instance.market_contexts[market_id]
         if market_id in bot_instance.market_start_prices:
             del bot_instance.market_start_prices[market_id]
+        manager.remove_market(market_id)
 
         logger.info(f"Market removed manually: {market_id}")
 
@@ -1387,613 +1544,13 @@ async def websocket_endpoint(websocket: WebSocket):
 
 
 # HTML 페이지
-@app.get("/", response_class=HTMLResponse)
+@app.get("/")
 async def get_dashboard():
-    """메인 대시보드"""
-    return """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>BTC Scalping Bot Dashboard</title>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1">
-        <script src="https://cdn.tailwindcss.com"></script>
-        <script src="https://unpkg.com/vue@3/dist/vue.global.js"></script>
-        <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    </head>
-    <body class="bg-gray-900 text-gray-100">
-        <div id="app" class="container mx-auto px-4 py-6">
-            <!-- Header -->
-            <div class="mb-8">
-                <h1 class="text-4xl font-bold mb-2">🚀 BTC Scalping Bot</h1>
-                <p class="text-gray-400">Real-time 15-minute market trading dashboard</p>
-            </div>
-
-            <!-- Status Bar -->
-            <div class="grid grid-cols-1 md:grid-cols-4 gap-4 mb-6">
-                <div class="bg-gray-800 rounded-lg p-4">
-                    <div class="text-sm text-gray-400">Bot Status</div>
-                    <div class="text-2xl font-bold" :class="status.running ? 'text-green-400' : 'text-red-400'">
-                        {{ status.running ? 'RUNNING' : 'STOPPED' }}
-                    </div>
-                </div>
-                <div class="bg-gray-800 rounded-lg p-4">
-                    <div class="text-sm text-gray-400">BTC Price</div>
-                    <div class="text-2xl font-bold text-blue-400">
-                        ${{ formatNumber(status.btc_price) }}
-                    </div>
-                </div>
-                <div class="bg-gray-800 rounded-lg p-4">
-                    <div class="text-sm text-gray-400">Total PnL</div>
-                    <div class="text-2xl font-bold" :class="status.stats?.total_pnl >= 0 ? 'text-green-400' : 'text-red-400'">
-                        ${{ formatNumber(status.stats?.total_pnl, 2, true) }}
-                    </div>
-                    <div class="text-xs text-gray-500 mt-1">
-                        {{ status.stats?.total_trades || 0 }} completed trades
-                    </div>
-                </div>
-                <div class="bg-gray-800 rounded-lg p-4">
-                    <div class="text-sm text-gray-400">Win Rate</div>
-                    <div class="text-2xl font-bold text-purple-400">
-                        {{ formatPercent(status.stats?.win_rate) }}
-                    </div>
-                    <div class="text-xs text-gray-500 mt-1">
-                        {{ status.stats?.winning_trades || 0 }} / {{ status.stats?.total_trades || 0 }} wins
-                    </div>
-                </div>
-            </div>
-
-            <!-- Additional Stats -->
-            <div class="bg-gray-800 rounded-lg p-4 mb-6">
-                <h3 class="text-lg font-semibold mb-3">📊 Trading Statistics</h3>
-                <div class="grid grid-cols-2 md:grid-cols-4 gap-4 text-sm">
-                    <div>
-                        <div class="text-gray-400">Total Entries</div>
-                        <div class="text-xl font-bold text-blue-400">{{ status.stats?.total_entries || 0 }}</div>
-                    </div>
-                    <div>
-                        <div class="text-gray-400">Successful Entries</div>
-                        <div class="text-xl font-bold text-green-400">{{ status.stats?.successful_entries || 0 }}</div>
-                    </div>
-                    <div>
-                        <div class="text-gray-400">Failed Entries</div>
-                        <div class="text-xl font-bold text-red-400">{{ status.stats?.failed_entries || 0 }}</div>
-                    </div>
-                    <div>
-                        <div class="text-gray-400">Entry Success Rate</div>
-                        <div class="text-xl font-bold text-purple-400">{{ formatPercent(status.stats?.entry_success_rate) }}</div>
-                    </div>
-                </div>
-            </div>
-
-            <!-- Controls -->
-            <div class="bg-gray-800 rounded-lg p-4 mb-6">
-                <div class="flex gap-4 mb-4">
-                    <button @click="controlBot('start')"
-                            class="px-6 py-2 bg-green-600 hover:bg-green-700 rounded-lg font-semibold">
-                        ▶ Start
-                    </button>
-                    <button @click="controlBot('stop')"
-                            class="px-6 py-2 bg-red-600 hover:bg-red-700 rounded-lg font-semibold">
-                        ⏹ Stop
-                    </button>
-                    <button @click="loadData"
-                            class="px-6 py-2 bg-blue-600 hover:bg-blue-700 rounded-lg font-semibold">
-                        🔄 Refresh
-                    </button>
-                    <div class="flex-1"></div>
-                    <div class="flex items-center gap-2">
-                        <span class="w-3 h-3 rounded-full" :class="wsConnected ? 'bg-green-500' : 'bg-red-500'"></span>
-                        <span class="text-sm">{{ wsConnected ? 'Connected' : 'Disconnected' }}</span>
-                    </div>
-                </div>
-
-                <!-- WebSocket Status -->
-                <div class="border-t border-gray-700 pt-4">
-                    <div class="flex items-center justify-between mb-2">
-                        <h3 class="text-lg font-semibold">WebSocket Status</h3>
-                        <button @click="reconnectWebSocket"
-                                class="px-4 py-1 text-sm bg-yellow-600 hover:bg-yellow-700 rounded font-semibold"
-                                :disabled="wsReconnecting">
-                            {{ wsReconnecting ? '⏳ Reconnecting...' : '🔌 Reconnect WS' }}
-                        </button>
-                    </div>
-                    <div class="grid grid-cols-2 md:grid-cols-4 gap-3 text-sm">
-                        <div class="bg-gray-700 rounded p-2">
-                            <div class="text-gray-400 text-xs">Status</div>
-                            <div class="font-bold" :class="wsStatus.connected ? 'text-green-400' : 'text-red-400'">
-                                {{ wsStatus.connected ? '✓ Connected' : '✗ Disconnected' }}
-                            </div>
-                        </div>
-                        <div class="bg-gray-700 rounded p-2">
-                            <div class="text-gray-400 text-xs">Subscriptions</div>
-                            <div class="font-bold text-blue-400">
-                                {{ wsStatus.subscribed_tokens || 0 }} tokens
-                            </div>
-                        </div>
-                        <div class="bg-gray-700 rounded p-2">
-                            <div class="text-gray-400 text-xs">Total Messages</div>
-                            <div class="font-bold text-purple-400">
-                                {{ formatNumber(wsStatus.total_messages) || 0 }}
-                            </div>
-                        </div>
-                        <div class="bg-gray-700 rounded p-2">
-                            <div class="text-gray-400 text-xs">Last Message</div>
-                            <div class="font-bold" :class="wsStatus.is_healthy ? 'text-green-400' : 'text-red-400'">
-                                {{ formatLastMessageTime(wsStatus.last_message_ago) }}
-                            </div>
-                        </div>
-                    </div>
-                    <div v-if="!wsStatus.is_healthy && wsStatus.last_message_ago >= 0"
-                         class="mt-2 p-2 bg-red-900/30 border border-red-600 rounded text-sm text-red-300">
-                        ⚠️ Warning: No messages received for {{ Math.floor(wsStatus.last_message_ago) }}s. Prices may not be updating.
-                    </div>
-                </div>
-            </div>
-
-            <!-- Add Market Section -->
-            <div class="bg-gray-800 rounded-lg p-6 mb-6">
-                <h2 class="text-2xl font-bold mb-4">➕ Add Market</h2>
-                <div class="bg-gray-700 rounded-lg p-4">
-                    <div class="flex gap-2">
-                        <input v-model="marketUrl"
-                               type="text"
-                               placeholder="https://polymarket.com/event/btc-updown-15m-..."
-                               class="flex-1 px-3 py-2 bg-gray-600 rounded border border-gray-500 text-white">
-                        <button @click="addMarket"
-                                class="px-4 py-2 bg-green-600 hover:bg-green-700 rounded font-semibold">
-                            Add
-                        </button>
-                    </div>
-                    <div class="mt-2 text-sm text-gray-400">
-                        Paste a Polymarket market URL (e.g., https://polymarket.com/event/btc-updown-15m-1768889700)
-                    </div>
-
-                    <!-- Search Markets -->
-                    <div class="mt-4">
-                        <div class="flex gap-2 mb-2">
-                            <input v-model="searchQuery"
-                                   @keyup.enter="searchMarkets"
-                                   type="text"
-                                   placeholder="Search markets... (e.g., 'BTC', 'Bitcoin')"
-                                   class="flex-1 px-3 py-2 bg-gray-600 rounded border border-gray-500 text-white">
-                            <button @click="searchMarkets"
-                                    class="px-4 py-2 bg-blue-600 hover:bg-blue-700 rounded font-semibold">
-                                Search
-                            </button>
-                        </div>
-                        <div v-if="searchResults.length > 0" class="space-y-2 max-h-64 overflow-y-auto">
-                            <div v-for="market in searchResults" :key="market.id"
-                                 class="bg-gray-600 rounded p-2 flex justify-between items-center">
-                                <div class="flex-1">
-                                    <div class="text-sm font-semibold">{{ market.question }}</div>
-                                    <div class="text-xs text-gray-400">
-                                        Liquidity: ${{ formatNumber(market.liquidity) }} |
-                                        24h Vol: ${{ formatNumber(market.volume24hr) }}
-                                    </div>
-                                </div>
-                                <button @click="marketUrl = market.url; addMarket()"
-                                        class="px-3 py-1 bg-green-600 hover:bg-green-700 rounded text-sm">
-                                    Add
-                                </button>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-
-            <!-- Active Markets -->
-            <div class="bg-gray-800 rounded-lg p-6 mb-6">
-                <h2 class="text-2xl font-bold mb-4">📊 Active Markets ({{ activeMarkets.length }})</h2>
-                <div v-if="activeMarkets.length > 0" class="space-y-4">
-                    <div v-for="market in activeMarkets" :key="'market-' + market.id"
-                         class="bg-gray-700 rounded-lg p-4 transition-opacity duration-200">
-                        <div class="flex justify-between items-start mb-2">
-                            <div class="flex-1">
-                                <div class="font-semibold text-lg">{{ market.question }}</div>
-                                <div class="text-sm text-gray-400">ID: {{ market.id }}</div>
-                            </div>
-                            <div class="flex items-center gap-3">
-                                <div class="text-right">
-                                    <div class="text-sm text-gray-400">Time Left</div>
-                                    <div class="font-semibold text-yellow-400">{{ formatTime(market.time_remaining) }}</div>
-                                </div>
-                                <button @click="removeMarket(market.id)"
-                                        class="px-3 py-1 bg-red-600 hover:bg-red-700 rounded text-sm font-semibold"
-                                        title="Remove this market">
-                                    🗑️
-                                </button>
-                            </div>
-                        </div>
-                        <div class="grid grid-cols-2 gap-4 mt-3">
-                            <div class="bg-gray-800 rounded p-2">
-                                <div class="text-xs text-gray-400 mb-1">YES Price</div>
-                                <div class="text-xl font-bold text-green-400">{{ market.yes_price?.toFixed(3) || '-' }}</div>
-                            </div>
-                            <div class="bg-gray-800 rounded p-2">
-                                <div class="text-xs text-gray-400 mb-1">NO Price</div>
-                                <div class="text-xl font-bold text-red-400">{{ market.no_price?.toFixed(3) || '-' }}</div>
-                            </div>
-                        </div>
-                        <div class="grid grid-cols-2 gap-4 mt-2 text-xs text-gray-400">
-                            <div>Liquidity: ${{ formatNumber(market.liquidity) }}</div>
-                            <div>Volume: ${{ formatNumber(market.volume) }}</div>
-                        </div>
-                        <div v-if="market.position && market.position.has_position" class="mt-3 pt-3 border-t border-gray-600">
-                            <div class="text-sm font-semibold text-blue-400">
-                                Position: {{ market.position.side }} x{{ market.position.size }}
-                            </div>
-                            <div class="text-sm mt-1" :class="market.position.unrealized_pnl_pct >= 0 ? 'text-green-400' : 'text-red-400'">
-                                PnL: {{ formatPercent(market.position.unrealized_pnl_pct) }}
-                                (${{ market.position.unrealized_pnl_usdc?.toFixed(2) || '0.00' }})
-                            </div>
-                        </div>
-                    </div>
-                </div>
-                <div v-else class="text-center text-gray-500 py-8">
-                    <div class="text-lg mb-2">No active markets</div>
-                    <div class="text-sm">Click ➕ Add Market above to add a BTC 15m market</div>
-                </div>
-            </div>
-
-            <!-- Trade History -->
-            <div class="bg-gray-800 rounded-lg p-6 mb-6">
-                <div class="flex justify-between items-center mb-4">
-                    <h2 class="text-2xl font-bold">💰 Recent Trades</h2>
-                    <div class="text-sm text-gray-400">
-                        Total: {{ trades.length }} |
-                        Success: {{ trades.filter(t => t.status === 'success').length }} |
-                        Failed: {{ trades.filter(t => t.status === 'failed').length }}
-                    </div>
-                </div>
-                <div v-if="trades.length > 0" class="space-y-2 max-h-96 overflow-y-auto">
-                    <div v-for="trade in trades.slice().reverse()" :key="trade.timestamp"
-                         class="rounded p-3"
-                         :class="trade.status === 'failed' ? 'bg-red-900/20 border border-red-700' : 'bg-gray-700'">
-                        <div class="flex justify-between items-center">
-                            <div class="flex items-center gap-2">
-                                <!-- Status Badge -->
-                                <span v-if="trade.status === 'failed'"
-                                      class="px-2 py-0.5 text-xs bg-red-700 text-white rounded">
-                                    FAILED
-                                </span>
-
-                                <!-- Action -->
-                                <span class="font-semibold"
-                                      :class="trade.action === 'EXIT' ? 'text-yellow-400' : 'text-blue-400'">
-                                    {{ trade.action }}
-                                </span>
-
-                                <!-- Side -->
-                                <span :class="trade.side === 'YES' ? 'text-green-400' : 'text-red-400'"
-                                      class="font-bold">
-                                    {{ trade.side }}
-                                </span>
-
-                                <!-- Size and Price -->
-                                <span class="text-gray-300">
-                                    {{ trade.size }}x @ {{ trade.price?.toFixed(3) }}c
-                                </span>
-
-                                <!-- Entry/Exit Info for EXIT trades -->
-                                <span v-if="trade.action === 'EXIT' && trade.entry_price"
-                                      class="text-xs text-gray-400">
-                                    ({{ trade.entry_price?.toFixed(3) }}c → {{ trade.exit_price?.toFixed(3) }}c)
-                                </span>
-                            </div>
-
-                            <!-- PnL and Time -->
-                            <div class="text-right">
-                                <div v-if="trade.pnl !== undefined" class="flex items-center gap-2">
-                                    <span :class="trade.pnl >= 0 ? 'text-green-400' : 'text-red-400'"
-                                          class="font-semibold text-lg">
-                                        {{ trade.pnl >= 0 ? '+' : '' }}${{ trade.pnl?.toFixed(2) }}
-                                    </span>
-                                    <span v-if="trade.pnl_pct !== undefined"
-                                          :class="trade.pnl_pct >= 0 ? 'text-green-300' : 'text-red-300'"
-                                          class="text-sm">
-                                        ({{ trade.pnl_pct >= 0 ? '+' : '' }}{{ (trade.pnl_pct * 100).toFixed(1) }}%)
-                                    </span>
-                                </div>
-                                <div v-else-if="trade.action.startsWith('ENTER')" class="text-gray-400 text-sm">
-                                    Position: {{ trade.position_after }} @ {{ trade.avg_price?.toFixed(3) }}c
-                                </div>
-                                <div class="text-xs text-gray-500 mt-1">{{ formatTimestamp(trade.timestamp) }}</div>
-                            </div>
-                        </div>
-
-                        <!-- Market Question -->
-                        <div class="text-sm text-gray-400 mt-2 truncate">{{ trade.market_question }}</div>
-                    </div>
-                </div>
-                <div v-else class="text-center text-gray-500 py-8">
-                    No trades yet. Waiting for entry signals...
-                </div>
-            </div>
-
-            <!-- Events Log -->
-            <div class="bg-gray-800 rounded-lg p-6">
-                <h2 class="text-2xl font-bold mb-4">📋 Event Log</h2>
-                <div class="space-y-1 max-h-64 overflow-y-auto text-sm font-mono">
-                    <div v-for="event in events.slice().reverse().slice(0, 50)" :key="event.timestamp"
-                         class="flex gap-2 text-gray-400">
-                        <span class="text-gray-600">{{ formatTimestamp(event.timestamp) }}</span>
-                        <span :class="getEventColor(event.type)">{{ event.type }}</span>
-                        <span>{{ formatEventData(event) }}</span>
-                    </div>
-                </div>
-            </div>
-        </div>
-
-        <script>
-        const { createApp } = Vue;
-
-        createApp({
-            data() {
-                return {
-                    status: {},
-                    trades: [],
-                    events: [],
-                    wsConnected: false,
-                    ws: null,
-                    showAddMarket: false,
-                    marketUrl: '',
-                    searchQuery: '',
-                    searchResults: [],
-                    wsStatus: {
-                        connected: false,
-                        subscribed_tokens: 0,
-                        total_messages: 0,
-                        last_message_ago: -1,
-                        is_healthy: false
-                    },
-                    wsReconnecting: false
-                }
-            },
-            computed: {
-                activeMarkets() {
-                    // 안정적인 키를 위해 active_markets를 복사하고 정렬
-                    const markets = this.status.active_markets || [];
-                    return markets.slice().sort((a, b) => {
-                        // ID로 정렬하여 순서 안정화
-                        return (a.id || '').localeCompare(b.id || '');
-                    });
-                }
-            },
-            mounted() {
-                this.loadData();
-                this.connectWebSocket();
-                // 주기적 업데이트 - 1초마다 (WebSocket과 함께 사용)
-                setInterval(() => this.loadData(), 1000);
-            },
-            methods: {
-                async loadData() {
-                    try {
-                        const [statusRes, tradesRes, eventsRes, wsStatusRes] = await Promise.all([
-                            fetch('/api/status'),
-                            fetch('/api/trades'),
-                            fetch('/api/events'),
-                            fetch('/api/websocket_status')
-                        ]);
-                        this.status = await statusRes.json();
-                        const tradesData = await tradesRes.json();
-                        const eventsData = await eventsRes.json();
-                        this.trades = tradesData.trades || [];
-                        this.events = eventsData.events || [];
-
-                        // WebSocket 상태 업데이트
-                        const wsStatusData = await wsStatusRes.json();
-                        if (!wsStatusData.error) {
-                            this.wsStatus = wsStatusData;
-                        }
-                    } catch (e) {
-                        console.error('Error loading data:', e);
-                    }
-                },
-                connectWebSocket() {
-                    const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-                    this.ws = new WebSocket(`${protocol}//${window.location.host}/ws`);
-
-                    this.ws.onopen = () => {
-                        this.wsConnected = true;
-                        console.log('WebSocket connected');
-                    };
-
-                    this.ws.onclose = () => {
-                        this.wsConnected = false;
-                        console.log('WebSocket disconnected');
-                        // 재연결
-                        setTimeout(() => this.connectWebSocket(), 3000);
-                    };
-
-                    this.ws.onmessage = (event) => {
-                        const msg = JSON.parse(event.data);
-                        this.handleWebSocketMessage(msg);
-                    };
-                },
-                handleWebSocketMessage(msg) {
-                    if (msg.type === 'trade_executed') {
-                        this.trades.push(msg.data);
-                        this.events.push({type: 'trade', timestamp: msg.data.timestamp, data: msg.data});
-                    } else if (msg.type === 'signal_generated') {
-                        this.events.push({type: 'signal', timestamp: msg.data.timestamp, data: msg.data});
-                    } else if (msg.type === 'market_update') {
-                        // 마켓 상태 업데이트 - 더 빠른 반영
-                        if (!this.status.active_markets) {
-                            this.status.active_markets = [];
-                        }
-                        const idx = this.status.active_markets.findIndex(m => m.id === msg.data.id);
-                        if (idx >= 0) {
-                            // 기존 마켓 업데이트 - 직접 교체 (더 빠름)
-                            this.status.active_markets.splice(idx, 1, msg.data);
-                        } else {
-                            // 새 마켓 추가
-                            this.status.active_markets.push(msg.data);
-                        }
-
-                        // BTC 가격도 업데이트
-                        if (msg.data.btc_price) {
-                            this.status.btc_price = msg.data.btc_price;
-                        }
-                    } else if (msg.type === 'bot_status') {
-                        // 전체 상태 업데이트
-                        Object.assign(this.status, msg.data);
-                    }
-                },
-                async controlBot(action) {
-                    try {
-                        await fetch('/api/control', {
-                            method: 'POST',
-                            headers: {'Content-Type': 'application/json'},
-                            body: JSON.stringify({action})
-                        });
-                        await this.loadData();
-                    } catch (e) {
-                        console.error('Error controlling bot:', e);
-                    }
-                },
-                async reconnectWebSocket() {
-                    if (this.wsReconnecting) return;
-
-                    this.wsReconnecting = true;
-                    try {
-                        const response = await fetch('/api/websocket_reconnect', {
-                            method: 'POST'
-                        });
-                        const result = await response.json();
-
-                        if (result.status === 'success') {
-                            console.log('WebSocket reconnected successfully');
-                            // 2초 후에 상태 업데이트
-                            setTimeout(async () => {
-                                await this.loadData();
-                                this.wsReconnecting = false;
-                            }, 2000);
-                        } else {
-                            console.error('WebSocket reconnection failed:', result.message);
-                            alert('Failed to reconnect WebSocket: ' + result.message);
-                            this.wsReconnecting = false;
-                        }
-                    } catch (e) {
-                        console.error('Error reconnecting WebSocket:', e);
-                        alert('Error reconnecting WebSocket');
-                        this.wsReconnecting = false;
-                    }
-                },
-                async addMarket() {
-                    if (!this.marketUrl) {
-                        alert('Please enter a market URL');
-                        return;
-                    }
-                    try {
-                        const res = await fetch('/api/add_market', {
-                            method: 'POST',
-                            headers: {'Content-Type': 'application/json'},
-                            body: JSON.stringify({market_url: this.marketUrl})
-                        });
-                        const data = await res.json();
-                        if (data.error) {
-                            alert('Error: ' + data.error);
-                        } else {
-                            alert('Market added successfully!');
-                            this.marketUrl = '';
-                            this.showAddMarket = false;
-                            await this.loadData();
-                        }
-                    } catch (e) {
-                        console.error('Error adding market:', e);
-                        alert('Error adding market');
-                    }
-                },
-                async removeMarket(marketId) {
-                    if (!confirm('Are you sure you want to remove this market?')) {
-                        return;
-                    }
-                    try {
-                        const res = await fetch(`/api/remove_market/${marketId}`, {
-                            method: 'DELETE'
-                        });
-                        const data = await res.json();
-                        if (data.error) {
-                            alert('Error: ' + data.error);
-                        } else {
-                            // 성공 - UI에서 즉시 제거
-                            if (this.status.active_markets) {
-                                const idx = this.status.active_markets.findIndex(m => m.id === marketId);
-                                if (idx >= 0) {
-                                    this.status.active_markets.splice(idx, 1);
-                                }
-                            }
-                            await this.loadData();
-                        }
-                    } catch (e) {
-                        console.error('Error removing market:', e);
-                        alert('Error removing market');
-                    }
-                },
-                async searchMarkets() {
-                    try {
-                        const query = encodeURIComponent(this.searchQuery);
-                        const res = await fetch(`/api/search_markets?query=${query}`);
-                        const data = await res.json();
-                        this.searchResults = data.markets || [];
-                    } catch (e) {
-                        console.error('Error searching markets:', e);
-                    }
-                },
-                formatNumber(num, decimals = 0, sign = false) {
-                    if (num === null || num === undefined) return '-';
-                    const formatted = num.toFixed(decimals).replace(/\B(?=(\d{3})+(?!\d))/g, ',');
-                    return sign && num > 0 ? '+' + formatted : formatted;
-                },
-                formatPercent(val) {
-                    if (val === null || val === undefined) return '-';
-                    return (val * 100).toFixed(1) + '%';
-                },
-                formatLastMessageTime(seconds) {
-                    if (seconds === null || seconds === undefined || seconds < 0) return 'Never';
-                    if (seconds < 1) return 'Just now';
-                    if (seconds < 60) return Math.floor(seconds) + 's ago';
-                    const mins = Math.floor(seconds / 60);
-                    if (mins < 60) return mins + 'm ago';
-                    const hours = Math.floor(mins / 60);
-                    return hours + 'h ago';
-                },
-                formatTime(seconds) {
-                    if (!seconds || seconds < 0) return '0s';
-                    const mins = Math.floor(seconds / 60);
-                    const secs = Math.floor(seconds % 60);
-                    return `${mins}m ${secs}s`;
-                },
-                formatTimestamp(ts) {
-                    return new Date(ts * 1000).toLocaleTimeString();
-                },
-                getEventColor(type) {
-                    const colors = {
-                        'trade': 'text-green-400',
-                        'signal': 'text-yellow-400',
-                        'error': 'text-red-400'
-                    };
-                    return colors[type] || 'text-gray-400';
-                },
-                formatEventData(event) {
-                    if (event.type === 'trade') {
-                        const d = event.data;
-                        return `${d.action} ${d.side} x${d.size} @ ${d.price?.toFixed(3)}`;
-                    } else if (event.type === 'signal') {
-                        const d = event.data;
-                        return `${d.action} - ${d.reason}`;
-                    }
-                    return JSON.stringify(event.data).substring(0, 50);
-                }
-            }
-        }).mount('#app');
-        </script>
-    </body>
-    </html>
-    """
+    """메인 대시보드 (static/dashboard.html)"""
+    return FileResponse(DASHBOARD_HTML, headers={"Cache-Control": "public, max-age=60"})
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # WebSocket 프레임 압축 (permessage-deflate)
+    uvicorn.run(app, host="0.0.0.0", port=8000, ws="websockets", ws_per_message_deflate=True)
@@ -2,7 +2,35 @@
 """
 Quick config verification script
 """
-from config import config
+import json
+import os
+from types import SimpleNamespace
+
+# Non-secret fields printed below; cached so repeat checks skip .env parsing
+FIELDS = ("trading_enabled", "polymarket_wallet_address", "max_concurrent_markets", "shares_per_clip")
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ENV_PATH = os.path.join(BASE_DIR, ".env")
+CACHE_PATH = os.path.join(BASE_DIR, ".config_cache.json")
+
+
+def load_config():
+    """Return the cached fields if .env hasn't changed since, otherwise parse config and refresh the cache."""
+    try:
+        if os.path.getmtime(ENV_PATH) < os.path.getmtime(CACHE_PATH):
+            with open(CACHE_PATH) as f:
+                return SimpleNamespace(**json.load(f))
+    except (OSError, ValueError):
+        pass
+
+    from config import Config, get_config
+    cfg = get_config()
+    if isinstance(cfg, Config):
+        with open(CACHE_PATH, "w") as f:
+            json.dump({k: getattr(cfg, k) for k in FIELDS}, f)
+    return cfg
+
+
+config = load_config()
 
 print("=" * 60)
 print("CONFIG VERIFICATION")
@@ -1,7 +1,10 @@
 import asyncio
 import aiohttp
+import functools
 import json
 import time
+import types
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Any
 from loguru import logger
 
@@ -9,7 +12,7 @@ from loguru import logger
 
 try:
     from py_clob_client.client import ClobClient
-    from py_clob_client.clob_types import OrderArgs, ApiCreds, BalanceAllowanceParams, AssetType
+    from py_clob_client.clob_types import OrderArgs, ApiCreds, BalanceAllowanceParams, AssetType, BookParams
     from py_clob_client.order_builder.constants import BUY, SELL
 except ImportError:
     logger.warning("py-clob-client not found. Using Mock client.")
@@ -20,8 +23,10 @@ except ImportError:
         def update_balance_allowance(self): pass
         def get_balance_allowance(self, params): return {"balance": "100.0", "allowance": "1000.0"}
         def get_order_book(self, token_id): return None
+        def get_order_books(self, params): return []
         def create_and_post_order(self, args): return {"orderID": "mock-id", "status": "simulated"}
         def cancel(self, order_id): return True
+        def cancel_orders(self, order_ids): return {"canceled": list(order_ids), "not_canceled": {}}
         def cancel_all(self): return True
     
     class ApiCreds:
@@ -33,6 +38,11 @@ except ImportError:
     class BalanceAllowanceParams:
         def __init__(self, **kwargs): pass
 
+    class BookParams:
+        def __init__(self, token_id, side=""):
+            self.token_id = token_id
+            self.side = side
+
     class AssetType:
         COLLATERAL = "collateral"
         CONDITIONAL = "conditional"
@@ -40,15 +50,35 @@ except ImportError:
     BUY = "buy"
     SELL = "sell"
 
-from config import config
+from config import get_config
 from models import Market, OrderSide
 
-ASSET_TO_TAG_ID = {
+
+# OrderSide -> py-clob-client side constant
+_SIDE_MAP: Dict[OrderSide, str] = {OrderSide.BUY: BUY, OrderSide.SELL: SELL}
+
+ASSET_TO_TAG_ID = types.MappingProxyType({
     "BTC": "235",
-    "ETH": "1002", 
+    "ETH": "1002",
     "SOL": "11060",
     "XRP": "21" # Fallback
-}
+})
+
+
+@functools.lru_cache(maxsize=64)
+def _active_market_params(asset: str, limit: int, order: str, ascending: bool) -> tuple:
+    """Immutable Gamma /markets query params, built once per (asset, limit, order, ascending)."""
+    params = (
+        ("limit", str(limit)),
+        ("active", "true"),
+        ("closed", "false"),
+        ("order", order),
+        ("ascending", str(ascending).lower()),
+    )
+    tag_id = ASSET_TO_TAG_ID.get(asset, "")
+    if tag_id:
+        params += (("tag_id", tag_id),)
+    return params
 
 
 class PolymarketClient:
@@ -58,12 +88,25 @@ class PolymarketClient:
     def __init__(self):
         self.clob_client: Optional[ClobClient] = None
         self.session: Optional[aiohttp.ClientSession] = None
+        self._connector: Optional[aiohttp.TCPConnector] = None
+        # Caps concurrent Gamma/Data API requests when callers fan out
+        self._sem = asyncio.Semaphore(16)
+        self._markets_url = f"{get_config().polymarket_data_url}/markets"
+        # Diagnostic logging on the order path is skipped entirely unless LOG_LEVEL=DEBUG
+        self._debug = get_config().log_level == "DEBUG"
+        # (balance, expiry) from time.monotonic(); cleared whenever an order/cancel goes through
+        self._bal_cache: Optional[tuple] = None
+        # Conditional GET state for get_active_markets, keyed by the params tuple
+        self._etags: Dict[tuple, str] = {}
+        self._markets_cache: Dict[tuple, List[Dict]] = {}
+        # Blocking py-clob-client calls run here instead of the shared default executor
+        self._clob_pool: Optional[ThreadPoolExecutor] = None
         self._init_clob_client()
         
     def _init_clob_client(self):
         """Initialize the CLOB client with EOA or Proxy mode."""
         try:
-            key = config.polymarket_private_key
+            key = get_config().polymarket_private_key
             if not key:
                 logger.warning("No private key found. Trading will be disabled.")
                 return
@@ -72,21 +115,21 @@ class PolymarketClient:
             # 0 = EOA (Direct Key)
             # 1 = Gnosis Safe
             # 2 = Polymarket Proxy (Standard for MetaMask users on Polymarket)
-            sig_type = 2 if config.use_proxy else 0
+            sig_type = 2 if get_config().use_proxy else 0
 
             # For Proxy mode, specify funder address
             if sig_type == 2:
                 self.clob_client = ClobClient(
-                    host=config.polymarket_base_url,
+                    host=get_config().polymarket_base_url,
                     key=key,
                     chain_id=137,
                     signature_type=sig_type,
-                    funder=config.polymarket_wallet_address,  # Funder/Proxy address
+                    funder=get_config().polymarket_wallet_address,  # Funder/Proxy address
                 )
-                logger.info(f"Initialized Proxy mode with funder: {config.polymarket_wallet_address}")
+                logger.info(f"Initialized Proxy mode with funder: {get_config().polymarket_wallet_address}")
             else:
                 self.clob_client = ClobClient(
-                    host=config.polymarket_base_url,
+                    host=get_config().polymarket_base_url,
                     key=key,
                     chain_id=137,
                     signature_type=sig_type,
@@ -104,12 +147,12 @@ class PolymarketClient:
             except Exception as e:
                 logger.error(f"Failed to derive L2 creds: {e}")
                 # Fallback to explicit keys if derivation fails
-                if config.polymarket_api_key and config.polymarket_api_secret and config.polymarket_api_passphrase:
+                if get_config().polymarket_api_key and get_config().polymarket_api_secret and get_config().polymarket_api_passphrase:
                     logger.warning("Falling back to explicit API credentials from .env")
                     creds = ApiCreds(
-                        api_key=config.polymarket_api_key,
-                        api_secret=config.polymarket_api_secret,
-                        api_passphrase=config.polymarket_api_passphrase,
+                        api_key=get_config().polymarket_api_key,
+                        api_secret=get_config().polymarket_api_secret,
+                        api_passphrase=get_config().polymarket_api_passphrase,
                     )
                     self.clob_client.set_api_creds(creds)
                     logger.info("Using explicitly configured API credentials.")
@@ -132,105 +175,168 @@ class PolymarketClient:
             logger.exception(f"Failed to initialize ClobClient: {e}")
             self.clob_client = None
 
-    async def __aenter__(self):
-        self.session = aiohttp.ClientSession(
-            headers={"Content-Type": "application/json"}
+    async def _run_clob(self, fn, *args):
+        """Run a blocking CLOB call on the dedicated thread pool."""
+        if self._clob_pool is None:
+            self._clob_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="clob")
+        return await asyncio.get_running_loop().run_in_executor(
+            self._clob_pool, functools.partial(fn, *args)
         )
+
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        """Lazily create the shared HTTP session (for callers not using `async with`)."""
+        if self.session is None or self.session.closed:
+            # Keep idle sockets between poll intervals (matches server-side 75s keepalive) and cache DNS
+            self._connector = aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=40,
+                keepalive_timeout=75,
+                ttl_dns_cache=300,
+                enable_cleanup_closed=True,
+            )
+            self.session = aiohttp.ClientSession(
+                headers={"Content-Type": "application/json"},
+                connector=self._connector,
+                timeout=aiohttp.ClientTimeout(total=10, connect=3),
+            )
+        return self.session
+
+    async def __aenter__(self):
+        await self._ensure_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.session:
             await self.session.close()
+            self.session = None
+        if self._connector and not self._connector.closed:
+            await self._connector.close()
+        self._connector = None
+        if self._clob_pool:
+            self._clob_pool.shutdown(wait=False)
+            self._clob_pool = None
 
     async def get_active_markets(self, asset: str = "BTC", limit: int = 50, order: str = "volume24hr", ascending: bool = False) -> List[Dict]:
         """
         Fetch active markets for a given asset.
         """
-        tag_id = ASSET_TO_TAG_ID.get(asset.upper(), "")
-        url = f"{config.polymarket_data_url}/markets"
-        
-        params = {
+        params = _active_market_params(asset.upper(), limit, order, ascending)
 
-            "limit": limit,
-            "active": "true",
-            "closed": "false",
-            "order": order, 
-            "ascending": str(ascending).lower(),
-            "tag_id": tag_id
-        }
-        
-        if params.get("tag_id") == "":
-            del params["tag_id"]
-        
         # NOTE: Gamma API is loose. We grab a bunch and filter in logic.
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    # data can be list or dict with 'data' key
-                    if isinstance(data, dict):
-                        return data.get("data", [])
-                    return data
-                else:
-                    logger.error(f"Failed to fetch markets: {resp.status}")
-                    return []
+        etag = self._etags.get(params)
+        headers = {"If-None-Match": etag} if etag else None
+        session = await self._ensure_session()
+        async with self._sem, session.get(self._markets_url, params=params, headers=headers, allow_redirects=False) as resp:
+            if resp.status == 304:
+                # Unchanged since last poll - empty body, reuse the parsed list
+                # (a fresh list each time so callers can filter/pop without touching the cache)
+                return list(self._markets_cache.get(params, ()))
+            if resp.status == 200:
+                data = await resp.json()
+                # data can be list or dict with 'data' key
+                if isinstance(data, dict):
+                    data = data.get("data", [])
+                new_etag = resp.headers.get("ETag")
+                if new_etag:
+                    self._etags[params] = new_etag
+                    self._markets_cache[params] = list(data)
+                return data
+            else:
+                logger.error(f"Failed to fetch markets: {resp.status}")
+                return []
+
+    async def get_active_markets_df(self, asset: str = "BTC", min_volume: float = 0, **kwargs):
+        """
+        Same as get_active_markets, but returned as a pandas DataFrame filtered to
+        volume24hr >= min_volume (vectorized instead of a per-dict loop).
+        Adds a 'spread' column (bestAsk - bestBid) when both quotes are present.
+        Requires the optional pandas dependency (pip install pandas).
+        """
+        try:
+            import pandas as pd  # optional; only needed by callers that want columnar data
+        except ImportError as e:
+            raise ImportError("get_active_markets_df requires pandas (pip install pandas)") from e
+
+        df = pd.DataFrame(await self.get_active_markets(asset, **kwargs))
+        if df.empty:
+            return df
+        if "volume24hr" not in df:
+            df["volume24hr"] = 0.0
+        df["volume24hr"] = pd.to_numeric(df["volume24hr"], errors="coerce").fillna(0.0)
+        if "bestBid" in df and "bestAsk" in df:
+            df["spread"] = pd.to_numeric(df["bestAsk"], errors="coerce") - pd.to_numeric(df["bestBid"], errors="coerce")
+        return df[df["volume24hr"] >= min_volume]
+
+    async def get_active_markets_multi(self, assets: List[str], **kwargs) -> Dict[str, List[Dict]]:
+        """
+        Fetch active markets for several assets concurrently (bounded by the request semaphore).
+        """
+        results = await asyncio.gather(*[self.get_active_markets(a, **kwargs) for a in assets])
+        return dict(zip(assets, results))
 
     async def search_markets(self, query: str, limit: int = 50) -> List[Dict]:
         """
         Search for markets using the Gamma Markets API.
         Example: search_markets("15m")
         """
-        url = f"{config.polymarket_data_url}/markets"
         params = {
             "q": query,
             "active": "true",
             "closed": "false",
             "limit": limit
         }
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    # data is likely a list
-                    return data if isinstance(data, list) else data.get("data", [])
-                else:
-                    logger.error(f"Search failed: {resp.status}")
-                    return []
+        session = await self._ensure_session()
+        async with self._sem, session.get(self._markets_url, params=params, allow_redirects=False) as resp:
+            if resp.status == 200:
+                data = await resp.json()
+                # data is likely a list
+                return data if isinstance(data, list) else data.get("data", [])
+            else:
+                logger.error(f"Search failed: {resp.status}")
+                return []
 
     async def get_user_positions(self, address: str) -> List[Dict]:
         """
         Fetch all user positions from the Data API.
         """
-        url = f"{config.polymarket_data_api_url}/positions"
+        url = f"{get_config().polymarket_data_api_url}/positions"
         params = {"user": address}
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as resp:
-                if resp.status == 200:
-                    return await resp.json()
-                else:
-                    logger.error(f"Failed to fetch positions: {resp.status}")
-                    return []
+        session = await self._ensure_session()
+        async with self._sem, session.get(url, params=params, allow_redirects=False) as resp:
+            if resp.status == 200:
+                return await resp.json()
+            else:
+                logger.error(f"Failed to fetch positions: {resp.status}")
+                return []
+
+    def invalidate_balance(self):
+        """Drop the cached balance so the next get_usdc_balance() hits the CLOB."""
+        self._bal_cache = None
 
     async def get_usdc_balance(self) -> float:
         """
-        Fetch USDC balance of the configured wallet.
+        Fetch USDC balance of the configured wallet (cached for 2s).
         """
         if not self.clob_client:
             return 0.0
-        
+
+        if self._bal_cache and time.monotonic() < self._bal_cache[1]:
+            return self._bal_cache[0]
+
         try:
             # Requires BalanceAllowanceParams
             params = BalanceAllowanceParams(asset_type=AssetType.COLLATERAL)
             # get_balance_allowance is synchronous in the client usually, 
             # but let's check if it's async in this version.
             # Most py-clob-client methods are synchronous wrappers around requests.
-            resp = await asyncio.to_thread(
+            resp = await self._run_clob(
                 self.clob_client.get_balance_allowance,
                 params
             )
             if resp:
-                b = resp.get("balance", "0")
-                return float(b)
+                b = float(resp.get("balance", "0"))
+                self._bal_cache = (b, time.monotonic() + 2.0)
+                return b
             return 0.0
         except Exception as e:
             logger.error(f"Error fetching balance: {e}")
@@ -244,12 +350,24 @@ class PolymarketClient:
         # or wrap CLOB call. Wrapper is better for consistency.
         if self.clob_client:
             try:
-                return await asyncio.to_thread(self.clob_client.get_order_book, token_id)
+                return await self._run_clob(self.clob_client.get_order_book, token_id)
             except Exception as e:
                 logger.error(f"Error fetching orderbook from CLOB: {e}")
                 return None
         return None
 
+    async def get_orderbooks(self, token_ids: List[str]) -> Dict[str, Any]:
+        """Fetch orderbooks for several tokens in one CLOB request, keyed by token_id."""
+        if not self.clob_client or not token_ids:
+            return {}
+        try:
+            params = [BookParams(token_id=t) for t in token_ids]
+            books = await self._run_clob(self.clob_client.get_order_books, params)
+            return {book.asset_id: book for book in books or []}
+        except Exception as e:
+            logger.error(f"Error fetching orderbooks from CLOB: {e}")
+            return {}
+
     async def place_order(
         self, 
         token_id: str, 
@@ -259,7 +377,7 @@ class PolymarketClient:
         post_only: bool = False
     ):
         """Place a limit order."""
-        if not config.trading_enabled:
+        if not get_config().trading_enabled:
             logger.warning("Trading DISABLED. Order simulated.")
             return {"status": "simulated", "orderID": "sim-123"}
             
@@ -267,12 +385,9 @@ class PolymarketClient:
             logger.error("No ClobClient available.")
             return None
 
-        # DEBUG
-        logger.error(f"DEBUG: side type={type(side)}, value={side}, repr={repr(side)}")
-        logger.error(f"DEBUG: OrderSide.BUY={OrderSide.BUY}, side==OrderSide.BUY={side == OrderSide.BUY}")
-
-        side_const = BUY if side == OrderSide.BUY else SELL
-        logger.error(f"DEBUG: side_const={side_const}, BUY={BUY}, SELL={SELL}")
+        side_const = _SIDE_MAP.get(side, SELL)
+        if self._debug:
+            logger.opt(lazy=True).debug("side={} const={}", lambda: repr(side), lambda: side_const)
         
         # Create OrderArgs
         # Note: 'post_only' might not be directly in OrderArgs in some versions, 
@@ -290,11 +405,13 @@ class PolymarketClient:
             # Debug: Log the order details
             logger.info(f"Placing order: token_id={token_id}, price={price}, size={size}, side={side_const}")
 
-            resp = await asyncio.to_thread(
+            resp = await self._run_clob(
                 self.clob_client.create_and_post_order,
                 args
             )
             logger.info(f"Order response: {resp}")
+            # A placed (and possibly filled) order changes the balance
+            self.invalidate_balance()
             return resp
         except Exception as e:
             logger.error(f"Order placement failed: {e}")
@@ -307,24 +424,49 @@ class PolymarketClient:
 
     async def cancel_order(self, order_id: str):
         """Cancel an order."""
-        if not config.trading_enabled:
+        if not get_config().trading_enabled:
             return True
         
         if not self.clob_client:
             return False
             
         try:
-            await asyncio.to_thread(self.clob_client.cancel, order_id)
+            await self._run_clob(self.clob_client.cancel, order_id)
+            self.invalidate_balance()
             return True
         except Exception as e:
             logger.error(f"Order cancellation failed: {e}")
             return False
 
+    async def cancel_orders(self, order_ids: List[str]) -> bool:
+        """Cancel several orders in one CLOB request."""
+        if not order_ids:
+            return True
+
+        if not get_config().trading_enabled:
+            return True
+
+        if not self.clob_client:
+            return False
+
+        try:
+            resp = await self._run_clob(self.clob_client.cancel_orders, list(order_ids))
+            self.invalidate_balance()
+            not_canceled = resp.get("not_canceled") if isinstance(resp, dict) else None
+            if not_canceled:
+                logger.warning(f"Some orders were not cancelled: {not_canceled}")
+                return False
+            return True
+        except Exception as e:
+            logger.error(f"Batch order cancellation failed: {e}")
+            return False
+
     async def cancel_all(self):
         """Cancel all open orders."""
-        if not config.trading_enabled or not self.clob_client:
+        if not get_config().trading_enabled or not self.clob_client:
             return
         try:
-            await asyncio.to_thread(self.clob_client.cancel_all)
+            await self._run_clob(self.clob_client.cancel_all)
+            self.invalidate_balance()
         except Exception as e:
             logger.error(f"Cancel all failed: {e}")
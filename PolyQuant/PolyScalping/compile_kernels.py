@@ -0,0 +1,38 @@
+"""
+스캘핑 전략 Numba 커널 AOT 빌드 스크립트
+
+multi_level_scalping_strategy / multi_level_strategy_v2의 PnL 커널을 미리 컴파일해
+scalping_kernels 확장 모듈로 저장합니다.
+빌드된 모듈이 있으면 전략이 import 시 바로 사용하므로 첫 틱의 JIT 컴파일 지연이 없습니다.
+(모듈이 없으면 기존처럼 njit JIT → 순수 Python 순으로 대체)
+
+사용법:
+    python compile_kernels.py
+
+주의:
+    - numba와 C 컴파일러(gcc/clang)가 필요합니다
+    - 커널 코드나 Python/numba 버전이 바뀌면 다시 실행하세요
+    - numba.pycc는 numba에서 deprecated 상태입니다 (향후 버전에서 제거 예정).
+      제거된 numba에서는 이 스크립트가 실패하며, 전략은 njit JIT로 그대로 동작합니다
+"""
+import os
+
+from numba.pycc import CC
+
+from multi_level_scalping_strategy import _UNWIND_PNL_SIG, _unwind_pnl_py
+from multi_level_strategy_v2 import _SIDE_PNL_SIG, _side_pnl_py
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def main():
+    cc = CC("scalping_kernels")
+    cc.output_dir = BASE_DIR
+    cc.export("unwind_pnl", _UNWIND_PNL_SIG)(_unwind_pnl_py)
+    cc.export("side_pnl", _SIDE_PNL_SIG)(_side_pnl_py)
+    cc.compile()
+    print(f"✓ scalping_kernels 빌드 완료: {BASE_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,29 +2,27 @@
 Configuration management for PolyScalping Bot.
 """
 import os
+from functools import lru_cache
 from typing import Optional, List
-from pydantic import Field
-from pydantic_settings import BaseSettings
+import msgspec
 from dotenv import load_dotenv
 
-load_dotenv()
-
-class Config(BaseSettings):
+class Config(msgspec.Struct, kw_only=True):
     """Configuration class for the scalping bot."""
     
     # API Configuration
     # API Credentials
-    polymarket_private_key: str = Field(..., env="POLYMARKET_PRIVATE_KEY")
-    polymarket_api_key: str = Field(default="", env="POLYMARKET_API_KEY")
-    polymarket_api_secret: str = Field(default="", env="POLYMARKET_API_SECRET")
-    polymarket_api_passphrase: str = Field(default="", env="POLYMARKET_API_PASSPHRASE")
-    use_proxy: bool = Field(default=True, env="USE_PROXY")
-    polymarket_wallet_address: str = Field(..., env="POLYMARKET_WALLET_ADDRESS")
+    polymarket_private_key: str
+    polymarket_api_key: str = ""
+    polymarket_api_secret: str = ""
+    polymarket_api_passphrase: str = ""
+    use_proxy: bool = True
+    polymarket_wallet_address: str
     
     # Trading Configuration
-    trading_enabled: bool = Field(default=False, env="TRADING_ENABLED")
-    max_concurrent_markets: int = Field(default=2, env="MAX_CONCURRENT_MARKETS")
-    daily_loss_limit_usdc: float = Field(default=50.0, env="DAILY_LOSS_LIMIT_USDC")
+    trading_enabled: bool = False
+    max_concurrent_markets: int = 2
+    daily_loss_limit_usdc: float = 50.0
     
     # Timing
     dca_cutoff_minutes: int = 5
@@ -44,42 +42,78 @@ class Config(BaseSettings):
 
 
     # Logging
-    log_level: str = Field(default="INFO", env="LOG_LEVEL")
+    log_level: str = "INFO"
     
     # API Endpoints
     polymarket_base_url: str = "https://clob.polymarket.com"
-    polymarket_base_url: str = "https://clob.polymarket.com"
     polymarket_data_url: str = "https://gamma-api.polymarket.com"
     polymarket_data_api_url: str = "https://data-api.polymarket.com"
     polymarket_ws_url: str = "wss://ws-subscriptions-clob.polymarket.com/ws/market"
 
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
-        extra = "ignore" 
+# Bool spellings accepted from the environment (same set pydantic-settings accepted)
+_TRUE = frozenset({"1", "true", "t", "yes", "y", "on"})
+_FALSE = frozenset({"0", "false", "f", "no", "n", "off"})
+_BOOL_FIELDS = frozenset(f.name for f in msgspec.structs.fields(Config) if f.type is bool)
+
+
+def _from_env() -> Config:
+    """Build Config from os.environ (field name == env var name, case-insensitive)."""
+    env = {k.lower(): v for k, v in os.environ.items()}
+    values = {}
+    for name in Config.__struct_fields__:
+        if name not in env:
+            continue
+        raw = env[name]
+        if name in _BOOL_FIELDS:
+            low = raw.strip().lower()
+            if low in _TRUE:
+                raw = True
+            elif low in _FALSE:
+                raw = False
+        values[name] = raw
+    # strict=False: numeric/bool strings are converted to the annotated types
+    return msgspec.convert(values, Config, strict=False)
+
+class DummyConfig:
+    """Fallback config to allow imports when .env is missing."""
+    polymarket_api_key = ""
+    polymarket_private_key = ""
+    polymarket_wallet_address = ""
+    trading_enabled = False
+    log_level = "INFO"
+    shares_per_clip = 10.0
+    entry_price_1 = 0.35
+    entry_price_2 = 0.30
+    entry_price_3 = 0.25
+    unwind_profit_spread = 0.02
+    stop_loss_spread = -0.10
+
+    max_concurrent_markets = 2
+    daily_loss_limit_usdc = 50.0
+    polymarket_base_url = "https://clob.polymarket.com"
+    polymarket_data_url = "https://gamma-api.polymarket.com"
+
+
+@lru_cache(maxsize=1)
+def get_config():
+    """Load .env and parse the environment once; returns the shared config instance."""
+    load_dotenv()
+    try:
+        return _from_env()
+    except Exception as e:
+        print(f"Warning: Error loading config (expected during setup without .env): {e}")
+        return DummyConfig()
 
-# Global config instance
-try:
-    config = Config()
-except Exception as e:
-    print(f"Warning: Error loading config (expected during setup without .env): {e}")
-    # Create a dummy config to allow imports
-    class DummyConfig:
-        polymarket_api_key = ""
-        polymarket_private_key = ""
-        polymarket_wallet_address = ""
-        trading_enabled = False
-        log_level = "INFO"
-        shares_per_clip = 10.0
-        entry_price_1 = 0.35
-        entry_price_2 = 0.30
-        entry_price_3 = 0.25
-        unwind_profit_spread = 0.02
-        stop_loss_spread = -0.10
 
-        max_concurrent_markets = 2
-        daily_loss_limit_usdc = 50.0
-        polymarket_base_url = "https://clob.polymarket.com"
-        polymarket_data_url = "https://gamma-api.polymarket.com"
-    config = DummyConfig()
+def __getattr__(name):
+    """
+    `from config import config` for entry-point scripts (PEP 562). This builds
+    the config at the importing statement; library modules call get_config()
+    at use sites instead, so importing them does not load .env.
+    """
+    if name == "config":
+        return get_config()
+    if name.startswith("__"):
+        raise AttributeError(name)
+    return getattr(get_config(), name)
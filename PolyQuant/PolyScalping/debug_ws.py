@@ -1,9 +1,97 @@
 import asyncio
 import aiohttp
 import json
-from config import config
+from typing import Any, Callable, List, Optional
+from config import get_config
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = lambda obj: orjson.dumps(obj).decode()
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
 from clients import PolymarketClient
 
+
+class ClobStream:
+    """
+    Long-lived CLOB market-channel WebSocket.
+    All token subscriptions share one connection; drops reconnect with exponential backoff.
+    """
+    def __init__(self, url: str, on_message: Callable[[Any, bytes], None],
+                 session: Optional[aiohttp.ClientSession] = None):
+        self.url = url
+        self.on_message = on_message
+        self.assets_ids: List[str] = []
+        self.running = False
+        self._session = session
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+
+    async def subscribe(self, token_ids: List[str]):
+        """Add tokens to the shared connection (sent immediately if connected, else on next connect)."""
+        new = [t for t in token_ids if t not in self.assets_ids]
+        self.assets_ids.extend(new)
+        if new and self._ws is not None and not self._ws.closed:
+            await self._ws.send_str(_json_dumps({"operation": "subscribe", "assets_ids": new}))
+
+    async def run(self):
+        self.running = True
+        own_session = self._session is None
+        session = self._session or aiohttp.ClientSession()
+        attempt = 0
+        try:
+            while self.running:
+                try:
+                    # Same frame limits as before; no heartbeat since the server doesn't answer pings
+                    async with session.ws_connect(self.url, max_msg_size=4 * 1024 * 1024, compress=15) as ws:
+                        self._ws = ws
+                        attempt = 0
+                        print("Connected.")
+                        payload = _json_dumps({"assets_ids": self.assets_ids, "type": "market"})
+                        print(f"Sending: {payload}")
+                        await ws.send_str(payload)
+
+                        async for msg in ws:
+                            if msg.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                                # Binary frames go straight to the parser; text frames are encoded once
+                                raw = msg.data if msg.type == aiohttp.WSMsgType.BINARY else msg.data.encode()
+                                # A bad frame (plain-text error reply) or callback error must not drop the connection
+                                try:
+                                    data = _json_loads(raw)
+                                except ValueError:
+                                    print(f"Received non-JSON: {raw[:200]!r}")
+                                    continue
+                                try:
+                                    self.on_message(data, raw)
+                                except Exception as e:
+                                    print(f"Message handler error: {e}")
+                            elif msg.type == aiohttp.WSMsgType.ERROR:
+                                print(f"Error: {ws.exception()}")
+                                break
+                        print("Closed")
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"WS connection failed: {e}")
+                finally:
+                    self._ws = None
+
+                if self.running:
+                    delay = min(30.0, 0.5 * 2 ** attempt)
+                    attempt += 1
+                    print(f"Reconnecting in {delay:.1f}s...")
+                    await asyncio.sleep(delay)
+        finally:
+            if own_session:
+                await session.close()
+
+    async def stop(self):
+        self.running = False
+        if self._ws is not None and not self._ws.closed:
+            await self._ws.close()
+
+
 async def main():
     # 1. Get a valid token ID
     print("Fetching active BTC market...")
@@ -15,7 +103,7 @@ async def main():
         
         m = markets[0]
         if 'clobTokenIds' in m:
-            tids = json.loads(m['clobTokenIds'])
+            tids = _json_loads(m['clobTokenIds'])
             token_id = tids[0]
         elif 'tokens' in m:
             token_id = m['tokens'][0]['id']
@@ -25,37 +113,40 @@ async def main():
             
         print(f"Testing with Token ID: {token_id} (Market: {m.get('question')})")
 
-    # 2. Connect to WS
-    url = config.polymarket_ws_url
+    # 2. Stream from the WS until a few messages arrive
+    url = get_config().polymarket_ws_url
     print(f"Connecting to {url}...")
-    
-    async with aiohttp.ClientSession() as session:
-        async with session.ws_connect(url) as ws:
-            print("Connected.")
-            
-            # Try assets_ids
-            payload = {
-                "assets_ids": [token_id],
-                "type": "market"
-            }
-            print(f"Sending: {json.dumps(payload)}")
-            await ws.send_json(payload)
-            
-            # Read a few messages
-            for _ in range(5):
-                try:
-                    msg = await asyncio.wait_for(ws.receive(), timeout=5.0)
-                    if msg.type == aiohttp.WSMsgType.TEXT:
-                        print(f"Received: {msg.data[:500]}...") # Truncate
-                    elif msg.type == aiohttp.WSMsgType.CLOSED:
-                        print("Closed")
-                        break
-                    elif msg.type == aiohttp.WSMsgType.ERROR:
-                        print("Error")
-                        break
-                except asyncio.TimeoutError:
-                    print("Timeout waiting for msg")
-                    break
+
+    received = 0
+    done = asyncio.Event()
+
+    def on_message(data, raw: bytes):
+        nonlocal received
+        received += 1
+        print(f"Received ({type(data).__name__}, {len(raw)} bytes): {raw[:500]!r}...") # Truncate
+        if received >= 5:
+            done.set()
+
+    stream = ClobStream(url, on_message)
+    await stream.subscribe([token_id])
+    task = asyncio.create_task(stream.run())
+    try:
+        await asyncio.wait_for(done.wait(), timeout=25.0)
+    except asyncio.TimeoutError:
+        print("Timeout waiting for msg")
+    finally:
+        await stream.stop()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     asyncio.run(main())
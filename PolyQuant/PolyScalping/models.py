@@ -6,7 +6,7 @@ class OrderSide(Enum):
     BUY = "BUY"
     SELL = "SELL"
 
-@dataclass
+@dataclass(slots=True)
 class Market:
     """Represents a Polymarket market (binary)."""
     id: str
@@ -25,7 +25,7 @@ class Market:
     
     last_updated: float = 0.0
 
-@dataclass
+@dataclass(slots=True)
 class Position:
     """Tracks current holdings for a specific market."""
     market_id: str
@@ -41,7 +41,7 @@ class Position:
     def total_exposure(self) -> float:
         return (self.shares_yes * self.avg_price_yes) + (self.shares_no * self.avg_price_no)
 
-@dataclass
+@dataclass(slots=True)
 class ActiveOrder:
     """Tracks an open order placed by the bot."""
     order_id: str
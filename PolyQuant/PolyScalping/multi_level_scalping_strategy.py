@@ -2,17 +2,50 @@
 멀티 레벨 스캘핑 전략
 특정 가격 레벨에서 진입하고 5% 익절 반복
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from bisect import bisect_right
+from collections import defaultdict
 from typing import Optional, List
 from loguru import logger
 from scalping_strategy import ScalpSignal, MarketContext
 from btc_price_tracker import BTCPriceTracker
 import time
 
+try:
+    from numba import njit
+except ImportError:  # numba 미설치 시 NumPy 벡터 연산으로 대체
+    njit = None
 
-@dataclass
+# loguru DEBUG/INFO 레벨 번호 (핸들러 최소 레벨과 비교용)
+_DEBUG_LEVELNO = logger.level("DEBUG").no
+_INFO_LEVELNO = logger.level("INFO").no
+
+
+# 0 나누기 방지용 분모 하한 (size/cost가 0이면 분자도 0이므로 결과는 0)
+_EPS = 1e-12
+
+
+# 강제 청산 PnL 커널: (pnl, pnl_pct) - 중간 float 객체 없이 f8 레지스터에서 계산
+# (클래스 메서드는 numba 컴파일 불가 - 모듈 함수로 유지, 시그니처 지정으로 import 시 컴파일)
+def _unwind_pnl_py(size, avg_entry, exit_price):
+    pnl = size * (1.0 - avg_entry - exit_price)
+    # 분기 없는 형태 (avg_entry <= 0이면 0) - Python 대체 함수와 컴파일 커널이 같은 식을 사용
+    pnl_pct = pnl / max(size * avg_entry, _EPS) * (avg_entry > 0.0)
+    return pnl, pnl_pct
+
+
+_UNWIND_PNL_SIG = "UniTuple(f8, 2)(f8, f8, f8)"
+
+try:
+    # AOT 빌드 모듈 (python compile_kernels.py) - 첫 틱부터 JIT 컴파일/캐시 로드 없이 사용
+    from scalping_kernels import unwind_pnl as _unwind_pnl
+except ImportError:
+    _unwind_pnl = njit(_UNWIND_PNL_SIG, cache=True)(_unwind_pnl_py) if njit is not None else _unwind_pnl_py
+
+
+@dataclass(frozen=True, slots=True)
 class LevelPosition:
-    """레벨별 포지션"""
+    """레벨별 포지션 (생성 후 변경 없음)"""
     level_price: float  # 진입 레벨 (0.34, 0.24, 0.12)
     side: str  # "YES" or "NO"
     entry_price: float  # 실제 진입 가격
@@ -20,17 +53,97 @@ class LevelPosition:
     entry_time: float  # 진입 시간
     is_high_price_scalp: bool = False  # 하이 프라이스 스캘핑 여부
     profit_target: float = 0.05  # 수익 목표 (기본 5%, 하이 프라이스는 2%)
+    target_exit_price: float = field(init=False)  # 목표 청산 가격 (생성 시 1회 계산)
 
-    def get_target_exit_price(self) -> float:
-        """목표 청산 가격 계산 (진입가 대비 profit_target% 이익)"""
+    def __post_init__(self):
         # Polymarket: PnL = size * (1 - entry_price - exit_price)
         # profit_target% 이익: profit_target * cost = profit_target * (size * entry_price)
         # size * (1 - entry_price - exit_price) = profit_target * size * entry_price
         # 1 - entry_price - exit_price = profit_target * entry_price
         # exit_price = 1 - entry_price - profit_target * entry_price
         # exit_price = 1 - (1 + profit_target) * entry_price
-        target_exit = 1.0 - (1.0 + self.profit_target) * self.entry_price
-        return max(0.01, target_exit)  # 최소 0.01
+        object.__setattr__(self, "target_exit_price", max(0.01, 1.0 - (1.0 + self.profit_target) * self.entry_price))  # 최소 0.01
+
+    def get_target_exit_price(self) -> float:
+        """목표 청산 가격 (호환용 - target_exit_price 사용)"""
+        return self.target_exit_price
+
+
+# 포지션 없는 마켓의 요약 템플릿 - 반환 시 매번 복사 (호출부가 수정해도 공유 템플릿은 그대로)
+# MappingProxyType은 웹서버 send_json(json.dumps) 직렬화가 안 되므로 일반 dict 사용
+_EMPTY_SUMMARY = {
+    "has_position": False,
+    "side": None,
+    "size": 0,
+    "avg_entry_price": 0,
+    "current_exit_price": 0,
+    "unrealized_pnl_usdc": 0,
+    "unrealized_pnl_pct": 0
+}
+
+# side 인덱스 - 내부 버퍼는 (YES, NO) 튜플로 보관하고 정수로 접근 (외부 노출 side는 문자열 유지)
+_YES, _NO = 0, 1
+_SIDE_NAMES = ("YES", "NO")
+_SIDE_INDEX = {"YES": _YES, "NO": _NO}
+
+
+class PosBuffer:
+    """
+    side별 포지션 버퍼 - 마켓 첫 체결 시 슬롯을 미리 할당하고 n 커서로 채움
+
+    합산값 (size, cost, high scalp 여부)은 add()에서 갱신하므로 청산 체크 시 순회 없음
+    """
+    __slots__ = ("n", "slots", "size", "cost", "has_high_scalp", "target_exit",
+                 "level_n", "level_size", "level_cost")
+
+    def __init__(self, cap: int):
+        cap = max(cap, 1)
+        self.n = 0
+        self.slots: List[Optional[LevelPosition]] = [None] * cap
+        self.size = 0.0
+        self.cost = 0.0
+        self.has_high_scalp = False
+        self.target_exit = 0.0  # 평균가 기준 목표 청산가 (전략에서 갱신)
+        # LEVEL 포지션만 합산 (강제 청산 대상 - HIGH SCALP 제외)
+        self.level_n = 0
+        self.level_size = 0.0
+        self.level_cost = 0.0
+
+    @property
+    def positions(self) -> List[LevelPosition]:
+        return self.slots[:self.n]
+
+    def add(self, position: LevelPosition):
+        n = self.n
+        if n == len(self.slots):
+            # 설정 변경 등으로 예상 용량을 넘으면 2배 확장
+            self.slots.extend([None] * n)
+        self.slots[n] = position
+        self.n = n + 1
+        self.size += position.size
+        self.cost += position.size * position.entry_price
+        if position.is_high_price_scalp:
+            self.has_high_scalp = True
+        else:
+            self.level_n += 1
+            self.level_size += position.size
+            self.level_cost += position.size * position.entry_price
+
+    def clear(self):
+        for i in range(self.n):
+            self.slots[i] = None
+        self.n = 0
+        self.size = 0.0
+        self.cost = 0.0
+        self.has_high_scalp = False
+        self.target_exit = 0.0
+        self.level_n = 0
+        self.level_size = 0.0
+        self.level_cost = 0.0
+
+
+def _empty_level_masks() -> dict:
+    return {"YES": 0, "NO": 0}
 
 
 class MultiLevelScalpingStrategy:
@@ -68,24 +181,109 @@ class MultiLevelScalpingStrategy:
         self.max_high_scalp_count = 4
 
         # 각 마켓의 활성 포지션들 (레벨별로 여러 개 가능)
-        self.positions: dict[str, List[LevelPosition]] = {}
+        self.positions: dict[str, List[LevelPosition]] = defaultdict(list)
 
-        # 각 레벨에서 마지막 진입 시간 (재진입 방지용)
-        self.last_entry_time: dict[str, dict[float, float]] = {}
+        # 마켓별 → side별 진입한 레벨 비트마스크 (bit i = entry_levels[i] 진입 완료, 재진입 방지용)
+        self.entered_levels: dict[str, dict[str, int]] = defaultdict(_empty_level_masks)
 
         # 마켓별 거래 횟수 추적
-        self.trade_count: dict[str, int] = {}
+        self.trade_count: dict[str, int] = defaultdict(int)
 
         # 마켓별 high price scalping 횟수 추적
-        self.high_scalp_count: dict[str, int] = {}
+        self.high_scalp_count: dict[str, int] = defaultdict(int)
 
         # TP limit order 추적용 (봇이 limit order 체결 확인하기 전까지 필요)
-        self.active_exit_orders: dict[str, List[str]] = {}
+        self.active_exit_orders: dict[str, List[str]] = defaultdict(list)
+        # 마켓별 마지막 PLACE_TP_LIMIT (side, 가격) - 주문 대기 중 같은 가격 재발행 방지
         self.last_tp_limit_price: dict[str, tuple[str, float]] = {}
 
         # EXIT 시그널 중복 방지용 (마지막 EXIT 시그널 시간)
         self.last_exit_signal_time: dict[str, float] = {}
 
+        # 마켓별 → side별 포지션 버퍼 + 합산 (size, cost, high scalp 여부, 평균가 기준 목표 청산가)
+        # _check_exit가 매 틱마다 포지션을 순회/필터링하지 않도록 체결/청산 시점에 갱신
+        # (self.positions는 봇/웹서버 호환용 전체 목록으로 유지)
+        self.side_agg: dict[str, tuple[PosBuffer, PosBuffer]] = defaultdict(self._new_market_buffers)
+
+        # 가격 오름차순으로 정렬한 레벨 (bisect용) 및 원래 인덱스
+        self._rebuild_level_index()
+
+        # 마켓별 시그널 메타데이터 템플릿 (토큰 ID는 마켓마다 고정)
+        self._market_meta_template: dict[str, dict] = {}
+
+        # 틱마다 찍히는 진단 로그는 DEBUG 핸들러가 있을 때만 포맷
+        self._refresh_log_level()
+
+        # 시그널 reason에 들어가는 익절 % 문자열 (설정 변경 시에만 재생성)
+        self._refresh_reason_strings()
+
+    def _refresh_log_level(self):
+        """현재 loguru 핸들러 기준 DEBUG/INFO 출력 여부 캐시"""
+        min_level = logger._core.min_level
+        self._debug_enabled = min_level <= _DEBUG_LEVELNO
+        self._info_enabled = min_level <= _INFO_LEVELNO
+
+    def _refresh_reason_strings(self):
+        """익절 % 표시 문자열 캐시 (시그널마다 float 포맷 반복 방지)"""
+        self._tp_pct_str = f"+{self.take_profit_pct*100:.0f}%"
+        self._hp_pct_str = f"+{self.high_price_profit_pct*100:.0f}%"
+
+    def _rebuild_level_index(self):
+        """entry_levels 기준 정렬 인덱스 재구성"""
+        order = sorted(range(len(self.entry_levels)), key=self.entry_levels.__getitem__)
+        self._sorted_levels = tuple(self.entry_levels[i] for i in order)
+        # 낮은 레벨부터 순회할 (레벨 가격, 원래 인덱스, 비트) 목록 - 틱마다 range/인덱싱 없이 순회
+        self._level_iter = tuple((self.entry_levels[i], i, 1 << i) for i in order)
+        self._all_levels_mask = (1 << len(self.entry_levels)) - 1
+        self._max_entry_level = self._sorted_levels[-1] if self._sorted_levels else 0.0
+        self._level_snapshot = tuple(self.entry_levels)
+
+    def _new_market_buffers(self) -> tuple[PosBuffer, PosBuffer]:
+        """마켓 첫 체결 시 side별 버퍼 할당 (_YES/_NO 인덱스) - 마켓당 최대 포지션 수 기준"""
+        cap = self.max_trades_per_market * len(self.entry_levels) + self.max_high_scalp_count
+        return (PosBuffer(cap), PosBuffer(cap))
+
+    def _update_side_target(self, agg: PosBuffer):
+        """합산 평균가 기준 목표 청산가 재계산"""
+        if agg.size <= 0:
+            agg.target_exit = 0.0
+            return
+        profit_target = self.high_price_profit_pct if agg.has_high_scalp else self.take_profit_pct
+        agg.target_exit = 1.0 - (1.0 + profit_target) * (agg.cost / agg.size)
+
+    def on_config_changed(self):
+        """설정 변경 후 호출 - 익절 % 등이 바뀌면 캐시된 목표가/표시 문자열 재계산"""
+        self._refresh_log_level()
+        self._refresh_reason_strings()
+
+        for aggs in self.side_agg.values():
+            for agg in aggs:
+                self._update_side_target(agg)
+
+        # 가격이 바뀐 레벨은 새 레벨로 보고 진입 기록 해제
+        if tuple(self.entry_levels) != self._level_snapshot:
+            changed = 0
+            for i, (old, new) in enumerate(zip(self._level_snapshot, self.entry_levels)):
+                if old != new:
+                    changed |= 1 << i
+            for masks in self.entered_levels.values():
+                for side in masks:
+                    masks[side] &= ~changed
+            self._rebuild_level_index()
+
+    def clear_positions(self, market_id: str):
+        """마켓의 모든 포지션 제거 (긴급 청산 등 외부에서 호출)"""
+        self.positions[market_id] = []
+        self.side_agg.pop(market_id, None)
+        self.last_tp_limit_price.pop(market_id, None)
+
+    def _signal_meta(self, ctx: MarketContext, **fields) -> dict:
+        """시그널 메타데이터 - 마켓별 token_yes/token_no 템플릿에 필드 추가"""
+        tmpl = self._market_meta_template.get(ctx.market_id)
+        if tmpl is None:
+            tmpl = self._market_meta_template[ctx.market_id] = {"token_yes": ctx.token_yes, "token_no": ctx.token_no}
+        return dict(tmpl, **fields)
+
     def calculate_order_size(self, level_index: int) -> float:
         """레벨별 주문 크기 반환"""
         if 0 <= level_index < len(self.level_sizes):
@@ -94,9 +292,6 @@ class MultiLevelScalpingStrategy:
 
     def on_order_filled(self, market_id: str, side: str, price: float, size: float, level: float, metadata: dict = None):
         """주문 체결 콜백 - 실제로 체결된 후에만 포지션 추가"""
-        if market_id not in self.positions:
-            self.positions[market_id] = []
-
         # 메타데이터에서 하이 프라이스 스캘핑 정보 추출
         is_high_price = metadata.get('is_high_price_scalp', False) if metadata else False
         profit_target = metadata.get('profit_target', self.take_profit_pct) if metadata else self.take_profit_pct
@@ -117,13 +312,15 @@ class MultiLevelScalpingStrategy:
         )
         self.positions[market_id].append(position)
 
+        agg = self.side_agg[market_id][_SIDE_INDEX[side]]
+        agg.add(position)
+        self._update_side_target(agg)
+
         scalp_type = "HIGH PRICE SCALP" if is_high_price else "LEVEL"
         total_positions = len(self.positions[market_id])
 
         # **중요: High scalp 체결 시 카운터 증가** (주문 발행이 아닌 체결 시점)
         if is_high_price:
-            if market_id not in self.high_scalp_count:
-                self.high_scalp_count[market_id] = 0
             self.high_scalp_count[market_id] += 1
             logger.info(f"Position confirmed [{scalp_type}]: {side} {size} @ {price:.3f} (target {profit_target*100:.0f}%) | High scalp #{self.high_scalp_count[market_id]}/{self.max_high_scalp_count} | Total positions: {total_positions}")
         else:
@@ -139,40 +336,53 @@ class MultiLevelScalpingStrategy:
 
     def on_exit_filled(self, market_id: str, side: str, is_high_price_scalp: bool = False):
         """청산 체결 콜백 - 포지션 제거 및 거래 횟수 증가"""
-        # 해당 side의 모든 포지션 제거
+        # 해당 side의 모든 포지션 제거 (남는 건 반대 side 목록 그대로)
+        aggs = self.side_agg.get(market_id)
+        idx = _SIDE_INDEX.get(side)
         if market_id in self.positions:
-            positions = self.positions[market_id]
-            removed_positions = [p for p in positions if p.side == side]
-            self.positions[market_id] = [p for p in positions if p.side != side]
-            logger.info(f"✓ Removed {len(removed_positions)} {side} positions from {market_id}")
+            if aggs is not None and idx is not None:
+                removed_count = aggs[idx].n
+                self.positions[market_id] = aggs[1 - idx].positions
+            else:
+                # 버퍼가 없으면 (외부에서 목록을 직접 수정한 경우) 한 번 순회로 분리
+                remaining = []
+                removed_count = 0
+                for p in self.positions[market_id]:
+                    if p.side == side:
+                        removed_count += 1
+                    else:
+                        remaining.append(p)
+                self.positions[market_id] = remaining
+            logger.info(f"✓ Removed {removed_count} {side} positions from {market_id}")
+
+        if aggs is not None and idx is not None:
+            aggs[idx].clear()
 
         # active_exit_orders 클리어
         if market_id in self.active_exit_orders:
             self.active_exit_orders[market_id] = []
 
         # last_tp_limit_price 클리어 (새로운 진입을 위해)
-        if market_id in self.last_tp_limit_price:
-            del self.last_tp_limit_price[market_id]
+        self.last_tp_limit_price.pop(market_id, None)
 
         # EXIT 시그널 타이머 초기화 (새로운 진입을 위해)
-        if market_id in self.last_exit_signal_time:
-            del self.last_exit_signal_time[market_id]
+        self.last_exit_signal_time.pop(market_id, None)
 
         # **중요 수정: LEVEL 포지션이 모두 청산되었을 때만 사이클 증가**
         # (부분 청산이 아니라 완전 청산일 때만)
         if not is_high_price_scalp:
-            # 남은 LEVEL 포지션 확인
-            remaining_positions = self.positions.get(market_id, [])
-            level_positions = [p for p in remaining_positions if not p.is_high_price_scalp]
+            # 남은 LEVEL 포지션 확인 (버퍼의 LEVEL 개수 사용)
+            if aggs is not None:
+                level_count = aggs[_YES].level_n + aggs[_NO].level_n
+            else:
+                level_count = sum(1 for p in self.positions.get(market_id, []) if not p.is_high_price_scalp)
 
             # LEVEL 포지션이 하나도 없으면 사이클 완료
-            if len(level_positions) == 0:
-                if market_id not in self.trade_count:
-                    self.trade_count[market_id] = 0
+            if level_count == 0:
                 self.trade_count[market_id] += 1
                 logger.info(f"✓✓✓ CYCLE COMPLETED: Trade #{self.trade_count[market_id]}/{self.max_trades_per_market}")
             else:
-                logger.info(f"Partial exit: {len(level_positions)} LEVEL positions still remaining (cycle not complete)")
+                logger.info(f"Partial exit: {level_count} LEVEL positions still remaining (cycle not complete)")
 
         positions = self.positions.get(market_id, [])
 
@@ -183,190 +393,153 @@ class MultiLevelScalpingStrategy:
 
     def evaluate_market(self, ctx: MarketContext) -> Optional[ScalpSignal]:
         """마켓 평가 및 신호 생성"""
-        market_id = ctx.market_id
+        market_id: str = ctx.market_id
 
-        # 초기화
-        if market_id not in self.positions:
-            self.positions[market_id] = []
-        if market_id not in self.last_entry_time:
-            self.last_entry_time[market_id] = {}
+        # 초기화 (마켓별 상태는 여기서 한 번만 조회해서 하위 체크에 전달)
+        positions: List[LevelPosition] = self.positions[market_id]
+        masks: dict[str, int] = self.entered_levels[market_id]
+        aggs: Optional[tuple[PosBuffer, PosBuffer]] = self.side_agg.get(market_id)
+        active_exits: Optional[List[str]] = self.active_exit_orders.get(market_id)
 
-        # 0. 긴급 청산 확인
-        time_remaining = ctx.end_time - time.time()
+        # 0. 긴급 청산 확인 (현재 시각/남은 시간은 여기서 한 번만 계산해서 하위 체크에 전달)
+        now: float = time.time()
+        time_remaining: float = ctx.end_time - now
+        mono: float = time.monotonic()  # EXIT 중복 방지 간격용 (시스템 시계 조정 영향 없음)
 
         # 5분 이하: 즉시 강제 청산 (MARKET order), 그 다음 high scalping
         if time_remaining <= 300:  # 5분
-            positions = self.positions.get(market_id, [])
-            logger.warning(f"⏰⏰⏰ <5MIN TRIGGER: {time_remaining:.0f}s remaining - Total positions: {len(positions)}")
+            # 5분 이하 구간에서는 매 틱 찍히므로 포맷은 loguru에 위임 (출력될 때만 포맷)
+            logger.warning("⏰⏰⏰ <5MIN TRIGGER: {:.0f}s remaining - Total positions: {}", time_remaining, len(positions))
 
             # 포지션 상세 로그
-            for i, p in enumerate(positions):
-                logger.info(f"  Position #{i+1}: {p.side} x{p.size} @ {p.entry_price:.3f} (high_scalp={p.is_high_price_scalp})")
+            if self._debug_enabled and positions:
+                logger.debug("Positions:\n" + "\n".join(
+                    f"  Position #{i+1}: {p.side} x{p.size} @ {p.entry_price:.3f} (high_scalp={p.is_high_price_scalp})"
+                    for i, p in enumerate(positions)))
 
             # **중요: 5분 이하이면 무조건 MARKET order로 즉시 청산**
             # TP 조건 체크 없이 모든 포지션을 강제 청산
             if positions:
-                logger.warning(f"🚨 <5MIN: Force unwinding ALL positions (no TP check, MARKET order only)")
-                force_exit = self._force_unwind(ctx)  # 모든 포지션 MARKET order로 즉시 청산
+                logger.warning("🚨 <5MIN: Force unwinding ALL positions (no TP check, MARKET order only)")
+                force_exit: Optional[ScalpSignal] = self._force_unwind(ctx, time_remaining)  # 모든 포지션 MARKET order로 즉시 청산
                 if force_exit:
                     logger.warning(f"✅ _force_unwind returned EXIT signal: {force_exit.reason}")
                     return force_exit
 
             # 포지션이 없으면 high price scalping 진입 체크 (일반 진입은 안 함)
-            logger.warning(f"✓ No positions - checking high price scalping entry (<5min)")
-            high_price_signal = self._check_high_price_scalping(ctx)
+            logger.warning("✓ No positions - checking high price scalping entry (<5min)")
+            high_price_signal: Optional[ScalpSignal] = self._check_high_price_scalping(ctx, time_remaining, aggs, active_exits)
             if high_price_signal:
                 logger.warning(f"🎯 HIGH PRICE SCALP ENTRY (<5min): {high_price_signal.reason}")
                 return high_price_signal
 
             return None
 
+        # 포지션 없고 양쪽 가격 모두 최고 레벨 이상이면 청산/진입 모두 불가 - 바로 종료
+        # (청산 쪽 목표가 미달 스킵은 _try_exit_side에서 처리)
+        if not positions and ctx.yes_price >= self._max_entry_level and ctx.no_price >= self._max_entry_level:
+            return None
+
         # 1. 청산 신호 확인 (진입보다 우선)
-        exit_signal = self._check_exit(ctx)
+        exit_signal: Optional[ScalpSignal] = self._check_exit(ctx, mono, time_remaining, positions, aggs)
         if exit_signal:
             return exit_signal
 
         # 2. 진입 신호 확인
-        entry_signal = self._check_entry(ctx)
+        entry_signal: Optional[ScalpSignal] = self._check_entry(ctx, time_remaining, masks, active_exits)
         if entry_signal:
             return entry_signal
 
         return None
 
-    def _check_entry(self, ctx: MarketContext) -> Optional[ScalpSignal]:
+    def _check_entry(self, ctx: MarketContext, time_remaining: float,
+                     masks: dict[str, int], active_exits: Optional[List[str]]) -> Optional[ScalpSignal]:
         """진입 신호 확인 - 레벨별로 한 번씩만 진입 (10 shares)"""
-        market_id = ctx.market_id
-        now = time.time()
+        market_id: str = ctx.market_id
 
-        logger.info(f"🔍 _check_entry called for {market_id[:8]}... YES={ctx.yes_price:.3f} NO={ctx.no_price:.3f}")
+        debug: bool = self._debug_enabled
+        if debug:
+            logger.debug(f"🔍 _check_entry called for {market_id[:8]}... YES={ctx.yes_price:.3f} NO={ctx.no_price:.3f}")
 
         # **변경: 포지션이 있어도 다른 레벨은 진입 가능**
         # 단, 거래 횟수 제한은 유지
 
         # **중요: 마켓별 거래 횟수 제한 체크**
-        if market_id not in self.trade_count:
-            self.trade_count[market_id] = 0
+        trade_count: int = self.trade_count[market_id]
 
-        if self.trade_count[market_id] >= self.max_trades_per_market:
-            logger.info(f"   ❌ Blocked: trade_count={self.trade_count[market_id]} >= max={self.max_trades_per_market}")
+        if trade_count >= self.max_trades_per_market:
+            if debug:
+                logger.debug(f"   ❌ Blocked: trade_count={trade_count} >= max={self.max_trades_per_market}")
             return None
 
         # 리스크 관리: 진입 금지 조건
-        time_remaining = ctx.end_time - now
-
         # **중요: 5분 미만 남으면 LEVEL 진입 절대 금지**
         # (5분 미만에는 high price scalping만 허용)
         if time_remaining < 300:  # 5분 = 300초
-            logger.info(f"   ❌ Blocked: <5min remaining ({time_remaining:.0f}s)")
+            if debug:
+                logger.debug(f"   ❌ Blocked: <5min remaining ({time_remaining:.0f}s)")
             return None
 
         # 1. 7분 미만 남으면 신규 진입 금지 (unwinding만 허용)
         if time_remaining < 420:  # 7분 = 420초
-            logger.info(f"   ❌ Blocked: <7min remaining ({time_remaining:.0f}s)")
+            if debug:
+                logger.debug(f"   ❌ Blocked: <7min remaining ({time_remaining:.0f}s)")
             return None
 
         # **중요: TP limit order가 활성화되어 있으면 진입 금지 (체결 대기 중)**
-        has_active_exit_orders = market_id in self.active_exit_orders and len(self.active_exit_orders[market_id]) > 0
-        if has_active_exit_orders:
-            logger.info(f"   ❌ Blocked: has_active_exit_orders (count={len(self.active_exit_orders.get(market_id, []))})")
+        if active_exits:
+            if debug:
+                logger.debug(f"   ❌ Blocked: has_active_exit_orders (count={len(active_exits)})")
             # TP limit order 체결 대기 중이면 새로운 진입 하지 않음
             return None
 
         # **포지션이 있어도 다른 레벨에서는 진입 가능** (주석과 일치하도록 수정)
 
-        # YES 체크 - 레벨을 하향 돌파할 때마다 진입 (34¢ 미만, 24¢ 미만, 14¢ 미만)
-        # **수정: 현재 가격이 여러 레벨 미만일 때, 가장 낮은 레벨에서만 진입**
-        # 1단계: 현재 가격보다 높은 레벨들 중 아직 진입하지 않은 가장 낮은 레벨 찾기
-        lowest_unentered_level = None
-        lowest_unentered_index = None
-
-        for i in reversed(range(len(self.entry_levels))):  # 낮은 레벨부터 체크
-            level = self.entry_levels[i]
-
-            # 현재 가격이 레벨 미만일 때 (하향 돌파)
-            if ctx.yes_price < level:
-                # 이 레벨에서 이미 진입했는지 확인
-                last_time = self.last_entry_time[market_id].get(('YES', level), 0)
-                if last_time == 0:
-                    # 아직 진입하지 않은 레벨 발견
-                    lowest_unentered_level = level
-                    lowest_unentered_index = i
-                    break  # 가장 낮은 레벨을 찾았으므로 중단
-
-        # 2단계: 찾은 레벨에서 진입
-        if lowest_unentered_level is not None:
-            # 진입 신호 생성 (포지션은 주문 체결 후 추가)
-            self.last_entry_time[market_id][('YES', lowest_unentered_level)] = now
-            i = lowest_unentered_index
-            level = lowest_unentered_level
-
-            # 레벨별 shares
-            order_size = self.calculate_order_size(i)
-            order_value = order_size * ctx.yes_price
-
-            logger.info(f"Entry signal: YES @ {ctx.yes_price:.3f} (below {level:.2f} level) - Size: {order_size} shares (${order_value:.2f})")
-
-            return ScalpSignal(
-                action="ENTER_YES",
-                token_id=ctx.token_yes,
-                price=ctx.yes_price,
-                size=order_size,
-                confidence=1.0,
-                edge=0.0,
-                reason=f"YES @ {ctx.yes_price:.3f} (below {level:.2f}) - Target +{self.take_profit_pct*100:.0f}%",
-                urgency="MEDIUM",
-                # 메타데이터로 레벨 정보 및 토큰 ID 전달
-                metadata={"side": "YES", "level": level, "token_id": ctx.token_yes, "token_yes": ctx.token_yes, "token_no": ctx.token_no}
-            )
+        # YES → NO 순서로 체크 - 레벨을 하향 돌파할 때마다 진입 (34¢ 미만, 24¢ 미만, 14¢ 미만)
+        signal: Optional[ScalpSignal] = self._try_enter_side(ctx, masks, "YES", ctx.yes_price, ctx.token_yes, "ENTER_YES")
+        if signal:
+            return signal
+        return self._try_enter_side(ctx, masks, "NO", ctx.no_price, ctx.token_no, "ENTER_NO")
 
-        # NO 체크 - 레벨을 하향 돌파할 때마다 진입 (34¢ 미만, 24¢ 미만, 14¢ 미만)
+    def _try_enter_side(self, ctx: MarketContext, masks: dict[str, int], side: str, price: float, token_id: str, action: str) -> Optional[ScalpSignal]:
+        """한 side의 레벨 진입 체크 (YES/NO 공용)"""
         # **수정: 현재 가격이 여러 레벨 미만일 때, 가장 낮은 레벨에서만 진입**
         # 1단계: 현재 가격보다 높은 레벨들 중 아직 진입하지 않은 가장 낮은 레벨 찾기
-        lowest_unentered_level = None
-        lowest_unentered_index = None
-
-        for i in reversed(range(len(self.entry_levels))):  # 낮은 레벨부터 체크
-            level = self.entry_levels[i]
-
-            # 현재 가격이 레벨 미만일 때 (하향 돌파)
-            if ctx.no_price < level:
-                # 이 레벨에서 이미 진입했는지 확인
-                last_time = self.last_entry_time[market_id].get(('NO', level), 0)
-                if last_time == 0:
-                    # 아직 진입하지 않은 레벨 발견
-                    lowest_unentered_level = level
-                    lowest_unentered_index = i
-                    break  # 가장 낮은 레벨을 찾았으므로 중단
-
-        # 2단계: 찾은 레벨에서 진입
-        if lowest_unentered_level is not None:
-            # 진입 신호 생성 (포지션은 주문 체결 후 추가)
-            self.last_entry_time[market_id][('NO', lowest_unentered_level)] = now
-            i = lowest_unentered_index
-            level = lowest_unentered_level
-
-            # 레벨별 shares
-            order_size = self.calculate_order_size(i)
-            order_value = order_size * ctx.no_price
-
-            logger.info(f"Entry signal: NO @ {ctx.no_price:.3f} (below {level:.2f} level) - Size: {order_size} shares (${order_value:.2f})")
+        # (정렬된 레벨에서 bisect로 가격 초과 구간 시작점을 찾고 비트마스크로 진입 여부 확인)
+        mask: int = masks[side]
+        if mask == self._all_levels_mask:
+            return None
 
-            return ScalpSignal(
-                action="ENTER_NO",
-                token_id=ctx.token_no,
-                price=ctx.no_price,
-                size=order_size,
-                confidence=1.0,
-                edge=0.0,
-                reason=f"NO @ {ctx.no_price:.3f} (below {level:.2f}) - Target +{self.take_profit_pct*100:.0f}%",
-                urgency="MEDIUM",
-                # 메타데이터로 레벨 정보 및 토큰 ID 전달
-                metadata={"side": "NO", "level": level, "token_id": ctx.token_no, "token_yes": ctx.token_yes, "token_no": ctx.token_no}
-            )
+        for level, i, bit in self._level_iter[bisect_right(self._sorted_levels, price):]:
+            if not mask & bit:
+                break  # 아직 진입하지 않은 가장 낮은 레벨 발견
+        else:
+            return None
 
-        return None
+        # 2단계: 찾은 레벨에서 진입 신호 생성 (포지션은 주문 체결 후 추가)
+        masks[side] = mask | bit
+
+        # 레벨별 shares
+        order_size: float = self.calculate_order_size(i)
+        order_value: float = order_size * price
+
+        logger.info(f"Entry signal: {side} @ {price:.3f} (below {level:.2f} level) - Size: {order_size} shares (${order_value:.2f})")
+
+        return ScalpSignal(
+            action=action,
+            token_id=token_id,
+            price=price,
+            size=order_size,
+            confidence=1.0,
+            edge=0.0,
+            reason=f"{side} @ {price:.3f} (below {level:.2f}) - Target {self._tp_pct_str}",
+            urgency="MEDIUM",
+            # 메타데이터로 레벨 정보 및 토큰 ID 전달
+            metadata=self._signal_meta(ctx, side=side, level=level, token_id=token_id)
+        )
 
-    def _check_high_price_scalping(self, ctx: MarketContext) -> Optional[ScalpSignal]:
+    def _check_high_price_scalping(self, ctx: MarketContext, time_remaining: float,
+                                   aggs: Optional[tuple[PosBuffer, PosBuffer]], active_exits: Optional[List[str]]) -> Optional[ScalpSignal]:
         """
         하이 프라이스 스캘핑 전략
         5분 미만 남았을 때, 한쪽이 90¢ 이상이면 그 쪽을 매수 (승리 확률 높은 쪽)
@@ -380,9 +553,7 @@ class MultiLevelScalpingStrategy:
         if not self.enable_high_price_scalping:
             return None
 
-        market_id = ctx.market_id
-        now = time.time()
-        time_remaining = ctx.end_time - now
+        market_id: str = ctx.market_id
 
         # 5분 미만만 허용
         if time_remaining >= 300:
@@ -390,30 +561,29 @@ class MultiLevelScalpingStrategy:
 
         # **중요: HIGH SCALP 포지션이 이미 있으면 진입 금지**
         # (LEVEL 포지션은 상관없음 - 강제 청산 대상)
-        existing_positions = self.positions.get(market_id, [])
-        high_scalp_positions = [p for p in existing_positions if p.is_high_price_scalp]
-        has_active_exit_orders = market_id in self.active_exit_orders and len(self.active_exit_orders[market_id]) > 0
+        has_high_scalp: bool = aggs is not None and (aggs[_YES].has_high_scalp or aggs[_NO].has_high_scalp)
+        has_active_exit_orders: bool = bool(active_exits)
 
-        if len(high_scalp_positions) > 0 or has_active_exit_orders:
-            logger.debug(f"_check_high_price_scalping: Blocked (high_scalp_positions={len(high_scalp_positions)}, active_exit_orders={has_active_exit_orders})")
+        if has_high_scalp or has_active_exit_orders:
+            if self._debug_enabled:
+                logger.debug(f"_check_high_price_scalping: Blocked (has_high_scalp={has_high_scalp}, active_exit_orders={has_active_exit_orders})")
             return None
 
         # High price scalping 횟수 체크 (최대 4번)
-        if market_id not in self.high_scalp_count:
-            self.high_scalp_count[market_id] = 0
+        high_scalp_count: int = self.high_scalp_count[market_id]
 
-        if self.high_scalp_count[market_id] >= self.max_high_scalp_count:
+        if high_scalp_count >= self.max_high_scalp_count:
             return None
 
         # YES가 threshold(90¢) 이상일 때 → YES를 매수 (승리 확률 높은 쪽)
         if ctx.yes_price >= self.high_price_threshold:
             # 설정된 shares
-            order_size = self.high_price_scalp_size
-            order_value = order_size * ctx.yes_price
+            order_size: float = self.high_price_scalp_size
+            order_value: float = order_size * ctx.yes_price
 
             # **중요: 횟수는 체결 시점(on_order_filled)에서 증가**
             # 여기서는 증가하지 않음 (주문 실패 시 카운터만 증가하는 문제 방지)
-            current_count = self.high_scalp_count[market_id] + 1  # 예상 카운트 (로그용)
+            current_count: int = high_scalp_count + 1  # 예상 카운트 (로그용)
 
             logger.info(f"HIGH PRICE SCALP #{current_count}/{self.max_high_scalp_count}: YES @ {ctx.yes_price:.3f} (마감 {time_remaining:.0f}s, NO={ctx.no_price:.3f}) - Size: {order_size} shares (${order_value:.2f})")
 
@@ -424,9 +594,9 @@ class MultiLevelScalpingStrategy:
                 size=order_size,
                 confidence=0.95,  # 90¢+ 이면 승리 확률 매우 높음
                 edge=self.high_price_profit_pct,
-                reason=f"High price scalp #{current_count}/{self.max_high_scalp_count}: YES @ {ctx.yes_price:.3f} (마감 {time_remaining:.0f}s, target +{self.high_price_profit_pct*100:.0f}%)",
+                reason=f"High price scalp #{current_count}/{self.max_high_scalp_count}: YES @ {ctx.yes_price:.3f} (마감 {time_remaining:.0f}s, target {self._hp_pct_str})",
                 urgency="HIGH",
-                metadata={"side": "YES", "level": ctx.yes_price, "is_high_price_scalp": True, "profit_target": self.high_price_profit_pct, "token_id": ctx.token_yes, "token_yes": ctx.token_yes, "token_no": ctx.token_no}
+                metadata=self._signal_meta(ctx, side="YES", level=ctx.yes_price, is_high_price_scalp=True, profit_target=self.high_price_profit_pct, token_id=ctx.token_yes)
             )
 
         # NO가 threshold(90¢) 이상일 때 → NO를 매수 (승리 확률 높은 쪽)
@@ -437,7 +607,7 @@ class MultiLevelScalpingStrategy:
 
             # **중요: 횟수는 체결 시점(on_order_filled)에서 증가**
             # 여기서는 증가하지 않음 (주문 실패 시 카운터만 증가하는 문제 방지)
-            current_count = self.high_scalp_count[market_id] + 1  # 예상 카운트 (로그용)
+            current_count = high_scalp_count + 1  # 예상 카운트 (로그용)
 
             logger.info(f"HIGH PRICE SCALP #{current_count}/{self.max_high_scalp_count}: NO @ {ctx.no_price:.3f} (마감 {time_remaining:.0f}s, YES={ctx.yes_price:.3f}) - Size: {order_size} shares (${order_value:.2f})")
 
@@ -448,258 +618,157 @@ class MultiLevelScalpingStrategy:
                 size=order_size,
                 confidence=0.95,  # 90¢+ 이면 승리 확률 매우 높음
                 edge=self.high_price_profit_pct,
-                reason=f"High price scalp #{current_count}/{self.max_high_scalp_count}: NO @ {ctx.no_price:.3f} (마감 {time_remaining:.0f}s, target +{self.high_price_profit_pct*100:.0f}%)",
+                reason=f"High price scalp #{current_count}/{self.max_high_scalp_count}: NO @ {ctx.no_price:.3f} (마감 {time_remaining:.0f}s, target {self._hp_pct_str})",
                 urgency="HIGH",
-                metadata={"side": "NO", "level": ctx.no_price, "is_high_price_scalp": True, "profit_target": self.high_price_profit_pct, "token_id": ctx.token_no, "token_yes": ctx.token_yes, "token_no": ctx.token_no}
+                metadata=self._signal_meta(ctx, side="NO", level=ctx.no_price, is_high_price_scalp=True, profit_target=self.high_price_profit_pct, token_id=ctx.token_no)
             )
 
         return None
 
-    def _record_exit_signal(self, market_id: str, signal: ScalpSignal) -> ScalpSignal:
-        """EXIT 시그널 시간 기록 (중복 방지용)"""
-        self.last_exit_signal_time[market_id] = time.time()
+    def _record_exit_signal(self, market_id: str, signal: ScalpSignal, mono: float) -> ScalpSignal:
+        """EXIT 시그널 시간 기록 (중복 방지용, time.monotonic() 기준)"""
+        self.last_exit_signal_time[market_id] = mono
         return signal
 
-    def _check_exit(self, ctx: MarketContext) -> Optional[ScalpSignal]:
+    def _build_exit_signal(self, action: str, token_id: str, price: float, size: float,
+                           reason: str, metadata: dict) -> ScalpSignal:
+        """청산 시그널 생성 (confidence/edge/urgency 공통)"""
+        return ScalpSignal(
+            action=action,
+            token_id=token_id,
+            price=price,
+            size=size,
+            confidence=1.0,
+            edge=0.0,
+            reason=reason,
+            urgency="HIGH",
+            metadata=metadata
+        )
+
+    def _check_exit(self, ctx: MarketContext, mono: float, time_remaining: float,
+                    positions: List[LevelPosition], aggs: Optional[tuple[PosBuffer, PosBuffer]]) -> Optional[ScalpSignal]:
         """청산 신호 확인 - TP 조건 만족 시 limit order 발행 (가격 개선 시 업데이트)"""
-        market_id = ctx.market_id
-        positions = self.positions.get(market_id, [])
-        time_remaining = ctx.end_time - time.time()
+        market_id: str = ctx.market_id
 
-        if not positions:
+        if not positions or aggs is None:
             return None
 
         # **중복 EXIT 시그널 방지**: 1초 이내에 같은 마켓의 EXIT 시그널은 한 번만
-        now = time.time()
-        last_exit_time = self.last_exit_signal_time.get(market_id, 0)
-        if now - last_exit_time < 1.0:
-            logger.debug(f"_check_exit: Skipping duplicate EXIT signal (last signal {now - last_exit_time:.2f}s ago)")
+        last_exit_time: Optional[float] = self.last_exit_signal_time.get(market_id)
+        debug: bool = self._debug_enabled
+        if last_exit_time is not None and mono - last_exit_time < 1.0:
+            if debug:
+                logger.debug(f"_check_exit: Skipping duplicate EXIT signal (last signal {mono - last_exit_time:.2f}s ago)")
             return None
 
-        logger.debug(f"_check_exit: {len(positions)} positions, time_remaining={time_remaining:.0f}s")
+        if debug:
+            logger.debug(f"_check_exit: {len(positions)} positions, time_remaining={time_remaining:.0f}s")
 
         # **변경: TP limit order가 이미 있어도 가격이 더 좋아지면 새로운 주문 발행**
         # (봇에서 기존 주문을 취소하고 새 주문을 넣을 것으로 예상)
 
-        # 모든 포지션을 합산 (같은 side끼리)
-        yes_positions = [p for p in positions if p.side == "YES"]
-        no_positions = [p for p in positions if p.side == "NO"]
-
-        # YES 포지션 청산 체크
-        if yes_positions:
-            # 평균가 계산
-            total_yes_size = sum(p.size for p in yes_positions)
-            total_yes_cost = sum(p.size * p.entry_price for p in yes_positions)
-            avg_yes_entry = total_yes_cost / total_yes_size if total_yes_size > 0 else 0
-
-            # High price scalp인지 확인 (하나라도 있으면)
-            is_high_price_scalp = any(p.is_high_price_scalp for p in yes_positions)
-
-            # **디버그: 포지션 상세 출력**
-            for i, p in enumerate(yes_positions):
-                logger.debug(f"  YES pos #{i+1}: {p.size} @ {p.entry_price:.3f} (high_scalp={p.is_high_price_scalp})")
-
-            logger.debug(f"YES positions: {len(yes_positions)}, total_size={total_yes_size}, avg_entry={avg_yes_entry:.3f}, is_high_scalp={is_high_price_scalp}")
-
-            # 청산 가격
-            if is_high_price_scalp:
-                # High price scalp은 Market order로 즉시 청산 (NO 매수)
-                current_exit_price = ctx.no_price
-                profit_target = self.high_price_profit_pct
-
-                # Target exit price: 진입가 대비 profit_target% 이익
-                # PnL = size * (1 - entry - exit) = profit_target * size * entry
-                # exit = 1 - entry - profit_target * entry = 1 - (1 + profit_target) * entry
-                target_exit = 1.0 - (1.0 + profit_target) * avg_yes_entry
-
-                if current_exit_price <= target_exit:
-                    pnl = total_yes_size * (1.0 - avg_yes_entry - current_exit_price)
-                    pnl_pct = (pnl / total_yes_cost) if total_yes_cost > 0 else 0
-
-                    logger.info(f"TP condition met (HIGH PRICE SCALP): BUY NO x{total_yes_size} @ {current_exit_price:.3f} (unwinding YES @ {avg_yes_entry:.3f}) = ${pnl:+.2f} ({pnl_pct:+.1%})")
-
-                    # **중요: 포지션은 봇의 on_exit_filled()에서 제거** (주문 체결 후)
-                    # (즉시 제거하면 주문 실패 시 데이터 불일치 발생)
-                    return self._record_exit_signal(market_id, ScalpSignal(
-                        action="EXIT",  # Market order - 즉시 청산
-                        token_id=ctx.token_no,
-                        price=current_exit_price,
-                        size=total_yes_size,
-                        confidence=1.0,
-                        edge=0.0,
-                        reason=f"HIGH SCALP EXIT: BUY NO @ {current_exit_price:.3f} (target {pnl_pct:+.1%})",
-                        urgency="HIGH",
-                        metadata={"side": "YES", "is_high_price_scalp": True, "fallback_sell_price": ctx.yes_price, "fallback_token": ctx.token_yes}
-                    ))
-            else:
-                # 일반 포지션 → Unwinding으로 청산
-                current_exit_price = ctx.no_price
-                profit_target = self.take_profit_pct
-
-                # 5분 이하 남았으면 2%로 낮춤
-                if time_remaining <= 300:
-                    profit_target = 0.02
-
-                # Target exit price 계산
-                target_exit = 1.0 - (1.0 + profit_target) * avg_yes_entry
-
-                # **상세 로그: TP 조건 체크**
-                logger.info(f"💰 YES TP check: current_exit={current_exit_price:.3f}, target_exit={target_exit:.3f}, profit_target={profit_target*100:.1f}%")
-                logger.info(f"   Avg entry: {avg_yes_entry:.3f}, Total size: {total_yes_size}, Positions: {len(yes_positions)}")
-                if current_exit_price <= target_exit:
-                    logger.info(f"   ✅ TP CONDITION MET! (current {current_exit_price:.3f} <= target {target_exit:.3f})")
-                else:
-                    logger.info(f"   ❌ TP not met yet (current {current_exit_price:.3f} > target {target_exit:.3f}, need NO to drop more)")
-
-                if current_exit_price <= target_exit:
-                    pnl = total_yes_size * (1.0 - avg_yes_entry - current_exit_price)
-                    pnl_pct = (pnl / total_yes_cost) if total_yes_cost > 0 else 0
-
-                    logger.info(f"TP condition met: BUY NO x{total_yes_size} @ {current_exit_price:.3f} (unwinding YES avg @ {avg_yes_entry:.3f}) = ${pnl:+.2f} ({pnl_pct:+.1%})")
-
-                    # 5분 이하면 MARKET order, 5분 초과면 LIMIT order
-                    if time_remaining <= 300:
-                        # **중요: 포지션은 봇의 on_exit_filled()에서 제거** (주문 체결 후)
-                        # (즉시 제거하면 주문 실패 시 데이터 불일치 발생)
-                        return self._record_exit_signal(market_id, ScalpSignal(
-                            action="EXIT",
-                            token_id=ctx.token_no,
-                            price=current_exit_price,
-                            size=total_yes_size,
-                            confidence=1.0,
-                            edge=0.0,
-                            reason=f"TP EXIT (<5min): BUY NO @ {current_exit_price:.3f} (target {pnl_pct:+.1%})",
-                            urgency="HIGH",
-                            metadata={"side": "YES", "fallback_sell_price": ctx.yes_price, "fallback_token": ctx.token_yes}
-                        ))
-                    else:
-                        # LIMIT order 발행 (5분 이상)
-                        return self._record_exit_signal(market_id, ScalpSignal(
-                            action="PLACE_TP_LIMIT",
-                            token_id=ctx.token_no,
-                            price=current_exit_price,
-                            size=total_yes_size,
-                            confidence=1.0,
-                            edge=0.0,
-                            reason=f"Place TP limit: BUY NO @ {current_exit_price:.3f} (target {pnl_pct:+.1%})",
-                            urgency="HIGH",
-                            metadata={
-                                "side": "YES",
-                                "order_type": "BUY",
-                                "token_yes": ctx.token_yes,
-                                "token_no": ctx.token_no
-                            }
-                        ))
-
-        # NO 포지션 청산 체크
-        if no_positions:
-            # 평균가 계산
-            total_no_size = sum(p.size for p in no_positions)
-            total_no_cost = sum(p.size * p.entry_price for p in no_positions)
-            avg_no_entry = total_no_cost / total_no_size if total_no_size > 0 else 0
-
-            # High price scalp인지 확인
-            is_high_price_scalp = any(p.is_high_price_scalp for p in no_positions)
-
-            # **디버그: 포지션 상세 출력**
-            for i, p in enumerate(no_positions):
-                logger.debug(f"  NO pos #{i+1}: {p.size} @ {p.entry_price:.3f} (high_scalp={p.is_high_price_scalp})")
-
-            logger.debug(f"NO positions: {len(no_positions)}, total_size={total_no_size}, avg_entry={avg_no_entry:.3f}, is_high_scalp={is_high_price_scalp}")
-
-            # 청산 가격
-            if is_high_price_scalp:
-                # High price scalp은 Market order로 즉시 청산 (YES 매수)
-                current_exit_price = ctx.yes_price
-                profit_target = self.high_price_profit_pct
-
-                # Target exit price: 진입가 대비 profit_target% 이익
-                # PnL = size * (1 - entry - exit) = profit_target * size * entry
-                # exit = 1 - entry - profit_target * entry = 1 - (1 + profit_target) * entry
-                target_exit = 1.0 - (1.0 + profit_target) * avg_no_entry
-
-                if current_exit_price <= target_exit:
-                    pnl = total_no_size * (1.0 - avg_no_entry - current_exit_price)
-                    pnl_pct = (pnl / total_no_cost) if total_no_cost > 0 else 0
-
-                    logger.info(f"TP condition met (HIGH PRICE SCALP): BUY YES x{total_no_size} @ {current_exit_price:.3f} (unwinding NO @ {avg_no_entry:.3f}) = ${pnl:+.2f} ({pnl_pct:+.1%})")
-
-                    # **중요: 포지션은 봇의 on_exit_filled()에서 제거** (주문 체결 후)
-                    # (즉시 제거하면 주문 실패 시 데이터 불일치 발생)
-                    return self._record_exit_signal(market_id, ScalpSignal(
-                        action="EXIT",  # Market order - 즉시 청산
-                        token_id=ctx.token_yes,
-                        price=current_exit_price,
-                        size=total_no_size,
-                        confidence=1.0,
-                        edge=0.0,
-                        reason=f"HIGH SCALP EXIT: BUY YES @ {current_exit_price:.3f} (target {pnl_pct:+.1%})",
-                        urgency="HIGH",
-                        metadata={"side": "NO", "is_high_price_scalp": True, "fallback_sell_price": ctx.no_price, "fallback_token": ctx.token_no}
-                    ))
-            else:
-                # 일반 포지션 → Unwinding으로 청산
-                current_exit_price = ctx.yes_price
-                profit_target = self.take_profit_pct
-
-                # 5분 이하 남았으면 2%로 낮춤
-                if time_remaining <= 300:
-                    profit_target = 0.02
-
-                # Target exit price 계산
-                target_exit = 1.0 - (1.0 + profit_target) * avg_no_entry
-
-                # **상세 로그: TP 조건 체크**
-                logger.info(f"💰 NO TP check: current_exit={current_exit_price:.3f}, target_exit={target_exit:.3f}, profit_target={profit_target*100:.1f}%")
-                logger.info(f"   Avg entry: {avg_no_entry:.3f}, Total size: {total_no_size}, Positions: {len(no_positions)}")
-                if current_exit_price <= target_exit:
-                    logger.info(f"   ✅ TP CONDITION MET! (current {current_exit_price:.3f} <= target {target_exit:.3f})")
-                else:
-                    logger.info(f"   ❌ TP not met yet (current {current_exit_price:.3f} > target {target_exit:.3f}, need YES to drop more)")
-
-                if current_exit_price <= target_exit:
-                    pnl = total_no_size * (1.0 - avg_no_entry - current_exit_price)
-                    pnl_pct = (pnl / total_no_cost) if total_no_cost > 0 else 0
-
-                    logger.info(f"TP condition met: BUY YES x{total_no_size} @ {current_exit_price:.3f} (unwinding NO avg @ {avg_no_entry:.3f}) = ${pnl:+.2f} ({pnl_pct:+.1%})")
-
-                    # 5분 이하면 MARKET order, 5분 초과면 LIMIT order
-                    if time_remaining <= 300:
-                        # **중요: 포지션은 봇의 on_exit_filled()에서 제거** (주문 체결 후)
-                        # (즉시 제거하면 주문 실패 시 데이터 불일치 발생)
-                        return self._record_exit_signal(market_id, ScalpSignal(
-                            action="EXIT",
-                            token_id=ctx.token_yes,
-                            price=current_exit_price,
-                            size=total_no_size,
-                            confidence=1.0,
-                            edge=0.0,
-                            reason=f"TP EXIT (<5min): BUY YES @ {current_exit_price:.3f} (target {pnl_pct:+.1%})",
-                            urgency="HIGH",
-                            metadata={"side": "NO", "fallback_sell_price": ctx.no_price, "fallback_token": ctx.token_no}
-                        ))
-                    else:
-                        # LIMIT order 발행 (5분 이상)
-                        return self._record_exit_signal(market_id, ScalpSignal(
-                            action="PLACE_TP_LIMIT",
-                            token_id=ctx.token_yes,
-                            price=current_exit_price,
-                            size=total_no_size,
-                            confidence=1.0,
-                            edge=0.0,
-                            reason=f"Place TP limit: BUY YES @ {current_exit_price:.3f} (target {pnl_pct:+.1%})",
-                            urgency="HIGH",
-                            metadata={
-                                "side": "NO",
-                                "order_type": "BUY",
-                                "token_yes": ctx.token_yes,
-                                "token_no": ctx.token_no
-                            }
-                        ))
-
+        # YES 포지션은 NO 매수로, NO 포지션은 YES 매수로 청산 (unwinding)
+        signal: Optional[ScalpSignal] = (self._try_exit_side(ctx, aggs[_YES], "YES", "NO", ctx.no_price, ctx.token_no, ctx.yes_price, ctx.token_yes, time_remaining, debug)
+                                         or self._try_exit_side(ctx, aggs[_NO], "NO", "YES", ctx.yes_price, ctx.token_yes, ctx.no_price, ctx.token_no, time_remaining, debug))
+        if signal:
+            return self._record_exit_signal(market_id, signal, mono)
         return None
 
-    def _force_unwind(self, ctx: MarketContext) -> Optional[ScalpSignal]:
+    def _try_exit_side(self, ctx: MarketContext, agg: PosBuffer, side: str, exit_side: str, exit_price: float, exit_token: str,
+                       hold_price: float, hold_token: str, time_remaining: float, debug: bool) -> Optional[ScalpSignal]:
+        """한 side 포지션의 청산 체크 (YES/NO 공용) - exit_*: 반대 토큰 매수 가격/토큰, hold_*: 보유 토큰"""
+        total_size: float = agg.size
+        if total_size <= 0:
+            return None
+
+        # High price scalp인지 확인 (하나라도 있으면)
+        is_high_price_scalp: bool = agg.has_high_scalp
+
+        # Target exit price: 진입가 대비 profit_target% 이익 (side_agg에 캐시)
+        # PnL = size * (1 - entry - exit) = profit_target * size * entry
+        # exit = 1 - entry - profit_target * entry = 1 - (1 + profit_target) * entry
+        target_exit: float = agg.target_exit
+
+        # 목표가에 못 미치면 합산/로그 없이 바로 스킵
+        # (<5분 일반 포지션은 목표가가 2%로 달라지므로 스킵하지 않음)
+        if exit_price > target_exit and (is_high_price_scalp or time_remaining > 300):
+            return None
+
+        # 평균가 계산
+        total_cost: float = agg.cost
+        avg_entry: float = total_cost / total_size
+
+        # **디버그: 포지션 상세 출력**
+        if debug:
+            logger.debug("\n".join([
+                *(f"  {side} pos #{i+1}: {p.size} @ {p.entry_price:.3f} (high_scalp={p.is_high_price_scalp})"
+                  for i, p in enumerate(agg.positions)),
+                f"{side} positions: {agg.n}, total_size={total_size}, avg_entry={avg_entry:.3f}, is_high_scalp={is_high_price_scalp}",
+            ]))
+
+        market_id: str = ctx.market_id
+
+        if is_high_price_scalp:
+            # High price scalp은 Market order로 즉시 청산 (반대 토큰 매수)
+            pnl: float = total_size * (1.0 - avg_entry - exit_price)
+            pnl_pct: float = (pnl / total_cost) if total_cost > 0 else 0
+
+            logger.info(f"TP condition met (HIGH PRICE SCALP): BUY {exit_side} x{total_size} @ {exit_price:.3f} (unwinding {side} @ {avg_entry:.3f}) = ${pnl:+.2f} ({pnl_pct:+.1%})")
+
+            # **중요: 포지션은 봇의 on_exit_filled()에서 제거** (주문 체결 후)
+            # (즉시 제거하면 주문 실패 시 데이터 불일치 발생)
+            return self._build_exit_signal(
+                "EXIT", exit_token, exit_price, total_size,  # Market order - 즉시 청산
+                f"HIGH SCALP EXIT: BUY {exit_side} @ {exit_price:.3f} (target {pnl_pct:+.1%})",
+                {"side": side, "is_high_price_scalp": True, "fallback_sell_price": hold_price, "fallback_token": hold_token})
+
+        # 일반 포지션 → Unwinding으로 청산
+        profit_target: float = self.take_profit_pct
+
+        # 5분 이하 남았으면 2%로 낮춤
+        if time_remaining <= 300:
+            profit_target = 0.02
+            target_exit = 1.0 - (1.0 + profit_target) * avg_entry
+
+        # **상세 로그: TP 조건 체크**
+        if debug:
+            logger.debug(f"💰 {side} TP check: current_exit={exit_price:.3f}, target_exit={target_exit:.3f}, profit_target={profit_target*100:.1f}%")
+            logger.debug(f"   Avg entry: {avg_entry:.3f}, Total size: {total_size}, Positions: {agg.n}")
+        if exit_price > target_exit:
+            if debug:
+                logger.debug(f"   ❌ TP not met yet (current {exit_price:.3f} > target {target_exit:.3f}, need {exit_side} to drop more)")
+            return None
+
+        # TP limit order가 대기 중이고 가격 개선이 없으면 재발행하지 않음
+        # (봇은 대기 주문이 있으면 PLACE_TP_LIMIT을 무시 - 매 틱 시그널/로그 생성 방지)
+        if time_remaining > 300:
+            last_tp: Optional[tuple[str, float]] = self.last_tp_limit_price.get(market_id)
+            if (last_tp is not None and last_tp[0] == side and exit_price >= last_tp[1] * 0.999
+                    and self.active_exit_orders.get(market_id)):
+                return None
+
+        logger.info(f"   ✅ TP CONDITION MET! (current {exit_price:.3f} <= target {target_exit:.3f})")
+
+        pnl = total_size * (1.0 - avg_entry - exit_price)
+        pnl_pct = (pnl / total_cost) if total_cost > 0 else 0
+
+        logger.info(f"TP condition met: BUY {exit_side} x{total_size} @ {exit_price:.3f} (unwinding {side} avg @ {avg_entry:.3f}) = ${pnl:+.2f} ({pnl_pct:+.1%})")
+
+        # 5분 이하면 MARKET order, 5분 초과면 LIMIT order
+        # **중요: 포지션은 봇의 on_exit_filled()에서 제거** (주문 체결 후)
+        # (즉시 제거하면 주문 실패 시 데이터 불일치 발생)
+        if time_remaining <= 300:
+            action, reason, metadata = (
+                "EXIT", f"TP EXIT (<5min): BUY {exit_side} @ {exit_price:.3f} (target {pnl_pct:+.1%})",
+                {"side": side, "fallback_sell_price": hold_price, "fallback_token": hold_token})
+        else:
+            self.last_tp_limit_price[market_id] = (side, exit_price)
+            action, reason, metadata = (
+                "PLACE_TP_LIMIT", f"Place TP limit: BUY {exit_side} @ {exit_price:.3f} (target {pnl_pct:+.1%})",
+                self._signal_meta(ctx, side=side, order_type="BUY"))
+        return self._build_exit_signal(action, exit_token, exit_price, total_size, reason, metadata)
+
+    def _force_unwind(self, ctx: MarketContext, time_remaining: Optional[float] = None) -> Optional[ScalpSignal]:
         """
         긴급 청산 - 5분 미만 남았을 때 **LEVEL 포지션만** 강제 청산
         항상 MARKET order 사용 (체결 보장)
@@ -707,225 +776,153 @@ class MultiLevelScalpingStrategy:
         **중요: HIGH SCALP 포지션은 청산하지 않음** (자체 TP 로직 사용)
 
         모든 LEVEL 포지션을 합산해서 평균가 계산 후, 반대 토큰으로 한 번에 unwinding
+        (time_remaining은 evaluate_market에서 계산한 값 재사용)
         """
         market_id = ctx.market_id
         positions = self.positions.get(market_id, [])
 
-        logger.warning(f"🔍 _force_unwind called: market_id={market_id[:8]}, positions in dict={len(positions)}")
-        logger.warning(f"   ctx.position_yes={ctx.position_yes}, ctx.position_no={ctx.position_no}")
+        # 매 틱 호출되므로 로그 포맷은 loguru에 위임 (출력될 때만 포맷)
+        mid8 = market_id[:8]  # 로그용 마켓 ID 축약 (한 번만 슬라이스)
+        logger.warning("🔍 _force_unwind called: market_id={}, positions in dict={}", mid8, len(positions))
+        logger.warning("   ctx.position_yes={}, ctx.position_no={}", ctx.position_yes, ctx.position_no)
 
-        time_remaining = ctx.end_time - time.time()
+        if time_remaining is None:
+            time_remaining = ctx.end_time - time.time()
 
         # **중요: self.positions가 비어있어도 ctx에 포지션이 있으면 청산**
         # (수동 진입하거나 봇이 추적하지 못한 포지션 대응)
         if not positions:
-            logger.warning(f"⚠️ _force_unwind: No positions in self.positions[{market_id[:8]}], but checking ctx...")
-
-            # ctx에서 포지션 확인 (수동 진입 대응)
-            if ctx.position_yes > 0 and ctx.position_no > 0:
-                logger.warning(f"⚠️ Both YES ({ctx.position_yes}) and NO ({ctx.position_no}) in ctx - unwinding larger position")
-                if ctx.position_yes >= ctx.position_no:
-                    # YES 포지션 청산
-                    exit_price = ctx.no_price
-                    pnl = ctx.position_yes * (1.0 - ctx.avg_price_yes - exit_price)
-                    pnl_pct = (pnl / (ctx.position_yes * ctx.avg_price_yes)) if ctx.avg_price_yes > 0 else 0
-                    logger.warning(f"FORCE UNWIND (from ctx): BUY NO x{ctx.position_yes} @ {exit_price:.3f} (unwinding YES @ {ctx.avg_price_yes:.3f}) = ${pnl:+.2f} ({pnl_pct:+.1%})")
-                    return ScalpSignal(
-                        action="EXIT",
-                        token_id=ctx.token_no,
-                        price=exit_price,
-                        size=ctx.position_yes,
-                        confidence=1.0,
-                        edge=0.0,
-                        reason=f"⚠️ FORCE UNWIND (ctx, {time_remaining:.0f}s): BUY NO @ {exit_price:.3f}",
-                        urgency="CRITICAL",
-                        metadata={"side": "YES", "fallback_sell_price": ctx.yes_price, "fallback_token": ctx.token_yes}
-                    )
-                else:
-                    # NO 포지션 청산
-                    exit_price = ctx.yes_price
-                    pnl = ctx.position_no * (1.0 - ctx.avg_price_no - exit_price)
-                    pnl_pct = (pnl / (ctx.position_no * ctx.avg_price_no)) if ctx.avg_price_no > 0 else 0
-                    logger.warning(f"FORCE UNWIND (from ctx): BUY YES x{ctx.position_no} @ {exit_price:.3f} (unwinding NO @ {ctx.avg_price_no:.3f}) = ${pnl:+.2f} ({pnl_pct:+.1%})")
-                    return ScalpSignal(
-                        action="EXIT",
-                        token_id=ctx.token_yes,
-                        price=exit_price,
-                        size=ctx.position_no,
-                        confidence=1.0,
-                        edge=0.0,
-                        reason=f"⚠️ FORCE UNWIND (ctx, {time_remaining:.0f}s): BUY YES @ {exit_price:.3f}",
-                        urgency="CRITICAL",
-                        metadata={"side": "NO", "fallback_sell_price": ctx.no_price, "fallback_token": ctx.token_no}
-                    )
-            elif ctx.position_yes > 0:
-                # YES만 있음
-                exit_price = ctx.no_price
-                pnl = ctx.position_yes * (1.0 - ctx.avg_price_yes - exit_price)
-                pnl_pct = (pnl / (ctx.position_yes * ctx.avg_price_yes)) if ctx.avg_price_yes > 0 else 0
-                logger.warning(f"FORCE UNWIND (from ctx): BUY NO x{ctx.position_yes} @ {exit_price:.3f} (unwinding YES @ {ctx.avg_price_yes:.3f}) = ${pnl:+.2f} ({pnl_pct:+.1%})")
-                return ScalpSignal(
-                    action="EXIT",
-                    token_id=ctx.token_no,
-                    price=exit_price,
-                    size=ctx.position_yes,
-                    confidence=1.0,
-                    edge=0.0,
-                    reason=f"⚠️ FORCE UNWIND (ctx, {time_remaining:.0f}s): BUY NO @ {exit_price:.3f}",
-                    urgency="CRITICAL",
-                    metadata={"side": "YES", "fallback_sell_price": ctx.yes_price, "fallback_token": ctx.token_yes}
-                )
-            elif ctx.position_no > 0:
-                # NO만 있음
-                exit_price = ctx.yes_price
-                pnl = ctx.position_no * (1.0 - ctx.avg_price_no - exit_price)
-                pnl_pct = (pnl / (ctx.position_no * ctx.avg_price_no)) if ctx.avg_price_no > 0 else 0
-                logger.warning(f"FORCE UNWIND (from ctx): BUY YES x{ctx.position_no} @ {exit_price:.3f} (unwinding NO @ {ctx.avg_price_no:.3f}) = ${pnl:+.2f} ({pnl_pct:+.1%})")
-                return ScalpSignal(
-                    action="EXIT",
-                    token_id=ctx.token_yes,
-                    price=exit_price,
-                    size=ctx.position_no,
-                    confidence=1.0,
-                    edge=0.0,
-                    reason=f"⚠️ FORCE UNWIND (ctx, {time_remaining:.0f}s): BUY YES @ {exit_price:.3f}",
-                    urgency="CRITICAL",
-                    metadata={"side": "NO", "fallback_sell_price": ctx.no_price, "fallback_token": ctx.token_no}
-                )
-            else:
-                # 포지션 없음
-                logger.warning(f"✓ No positions in ctx either - nothing to unwind")
-                return None
-
-        # **중요: LEVEL 포지션만 필터링** (HIGH SCALP 제외)
-        level_positions = [p for p in positions if not p.is_high_price_scalp]
-        high_scalp_positions = [p for p in positions if p.is_high_price_scalp]
-
-        logger.warning(f"📊 _force_unwind breakdown: Total={len(positions)}, LEVEL={len(level_positions)}, HIGH_SCALP={len(high_scalp_positions)}")
-
-        # 각 포지션 상세 로그
-        for i, p in enumerate(level_positions):
-            logger.info(f"  LEVEL #{i+1}: {p.side} x{p.size} @ {p.entry_price:.3f}")
-        for i, p in enumerate(high_scalp_positions):
-            logger.info(f"  HIGH_SCALP #{i+1}: {p.side} x{p.size} @ {p.entry_price:.3f}")
-
-        if not level_positions:
-            logger.warning(f"❌ _force_unwind: No LEVEL positions to unwind (only {len(high_scalp_positions)} HIGH SCALP exist)")
+            return self._force_unwind_from_ctx(ctx, time_remaining, mid8)
+        return self._force_unwind_from_book(ctx, time_remaining, len(positions))
+
+    def _force_unwind_from_ctx(self, ctx: MarketContext, time_remaining: float, mid8: str) -> Optional[ScalpSignal]:
+        """강제 청산 - 봇이 추적하는 포지션이 없을 때 ctx 포지션 기준 (수동 진입 대응)"""
+        pos_yes, pos_no = ctx.position_yes, ctx.position_no
+        logger.warning("⚠️ _force_unwind: No positions in self.positions[{}], but checking ctx...", mid8)
+
+        # ctx에서 포지션 확인 (수동 진입 대응)
+        has_yes, has_no = pos_yes > 0, pos_no > 0
+        if not (has_yes or has_no):
+            # 포지션 없음
+            logger.warning("✓ No positions in ctx either - nothing to unwind")
+            return None
+        if has_yes and has_no:
+            logger.warning(f"⚠️ Both YES ({pos_yes}) and NO ({pos_no}) in ctx - unwinding larger position")
+
+        # YES만 있거나 YES가 더 크거나 같으면 YES, 아니면 NO 청산
+        pick_yes = has_yes and (not has_no or pos_yes >= pos_no)
+        side, size, avg_entry = ("YES", pos_yes, ctx.avg_price_yes) if pick_yes else ("NO", pos_no, ctx.avg_price_no)
+        return self._make_unwind_signal(ctx, side, size, avg_entry, time_remaining)
+
+    def _force_unwind_from_book(self, ctx: MarketContext, time_remaining: float, num_positions: int) -> Optional[ScalpSignal]:
+        """강제 청산 - 봇이 추적하는 LEVEL 포지션 기준 (side별 버퍼 합산값 사용)"""
+        # **중요: LEVEL 포지션만 합산** (HIGH SCALP 제외) - 체결/청산 시 갱신된 side별 합산값 사용
+        yes_agg, no_agg = aggs = self.side_agg[ctx.market_id]
+        yes_count, total_yes_size, total_yes_cost = yes_agg.level_n, yes_agg.level_size, yes_agg.level_cost
+        no_count, total_no_size, total_no_cost = no_agg.level_n, no_agg.level_size, no_agg.level_cost
+        level_count = yes_count + no_count
+        high_scalp_count = num_positions - level_count
+
+        logger.warning("📊 _force_unwind breakdown: Total={}, LEVEL={}, HIGH_SCALP={}", num_positions, level_count, high_scalp_count)
+
+        # HIGH_SCALP만 있으면 상세 로그/분류 없이 바로 종료
+        if not level_count:
+            logger.warning("❌ _force_unwind: No LEVEL positions to unwind (only {} HIGH SCALP exist)", high_scalp_count)
             return None
 
-        # LEVEL 포지션을 side별로 분류
-        yes_positions = [p for p in level_positions if p.side == "YES"]
-        no_positions = [p for p in level_positions if p.side == "NO"]
-
-        total_yes_size = sum(p.size for p in yes_positions) if yes_positions else 0
-        total_no_size = sum(p.size for p in no_positions) if no_positions else 0
+        # 각 포지션 상세 로그 (side별 버퍼를 한 번 순회하며 LEVEL/HIGH_SCALP로 분류)
+        # INFO 핸들러가 없으면 분류/포맷 작업 자체를 생략
+        if self._info_enabled:
+            level_rows, high_rows = [], []
+            for side, agg in zip(_SIDE_NAMES, aggs):
+                for p in agg.positions:
+                    (high_rows if p.is_high_price_scalp else level_rows).append((side, p.size, p.entry_price))
+            for label, rows in (("LEVEL", level_rows), ("HIGH_SCALP", high_rows)):
+                for i, (side, size, entry) in enumerate(rows):
+                    logger.info(f"  {label} #{i+1}: {side} x{size} @ {entry:.3f}")
 
         # 둘 다 있으면 로그 출력
-        if yes_positions and no_positions:
+        if yes_count and no_count:
             logger.warning(f"⚠️  FORCE UNWIND (LEVEL only): Both YES ({total_yes_size}) and NO ({total_no_size}) positions exist! Unwinding larger position first.")
 
         # YES 포지션이 더 크거나 같으면 YES 먼저 청산
-        if yes_positions and (not no_positions or total_yes_size >= total_no_size):
-            # 평균가 계산
-            total_yes_cost = sum(p.size * p.entry_price for p in yes_positions)
-            avg_yes_entry = total_yes_cost / total_yes_size if total_yes_size > 0 else 0
-
+        # (포지션 제거는 봇의 on_exit_filled에서 처리 - 주문 실패 시 재시도 가능하도록 여기서는 제거하지 않음)
+        if yes_count and (not no_count or total_yes_size >= total_no_size):
             # YES 포지션 → NO 토큰 BUY (unwinding)
-            exit_price = ctx.no_price
-            pnl = total_yes_size * (1.0 - avg_yes_entry - exit_price)
-            pnl_pct = (pnl / (total_yes_size * avg_yes_entry)) if avg_yes_entry > 0 else 0
-
-            logger.warning(f"FORCE UNWIND MARKET ({time_remaining:.0f}s left): BUY NO x{total_yes_size:.2f} @ {exit_price:.3f} (unwinding {len(yes_positions)} YES positions @ avg {avg_yes_entry:.3f}) = ${pnl:+.2f} ({pnl_pct:+.1%})")
-            # YES 포지션 제거는 봇의 on_exit_filled에서 처리 (주문 성공 후)
-            # 여기서는 제거하지 않음 (주문 실패 시 재시도 가능하도록)
-            return ScalpSignal(
-                action="EXIT",  # market order
-                token_id=ctx.token_no,
-                price=exit_price,
-                size=total_yes_size,
-                confidence=1.0,
-                edge=0.0,
-                reason=f"⚠️ FORCE UNWIND MARKET ({time_remaining:.0f}s left) {pnl_pct:+.1%}: BUY NO @ {exit_price:.3f}",
-                urgency="CRITICAL",
-                metadata={
-                    "side": "YES",
-                    "fallback_sell_price": ctx.yes_price,
-                    "fallback_token": ctx.token_yes,
-                    "avg_entry_price": avg_yes_entry,
-                    "num_positions": len(yes_positions)
-                }
-            )
+            avg_yes_entry = total_yes_cost / max(total_yes_size, _EPS)
+            return self._make_unwind_signal(ctx, "YES", total_yes_size, avg_yes_entry, time_remaining, yes_count)
 
         # NO 포지션 청산 (YES가 없거나 NO가 더 클 때)
-        elif no_positions:
-            # 평균가 계산
-            total_no_size = sum(p.size for p in no_positions)
-            total_no_cost = sum(p.size * p.entry_price for p in no_positions)
-            avg_no_entry = total_no_cost / total_no_size if total_no_size > 0 else 0
-
+        elif no_count:
             # NO 포지션 → YES 토큰 BUY (unwinding)
-            exit_price = ctx.yes_price
-            pnl = total_no_size * (1.0 - avg_no_entry - exit_price)
-            pnl_pct = (pnl / (total_no_size * avg_no_entry)) if avg_no_entry > 0 else 0
-
-            logger.warning(f"FORCE UNWIND MARKET ({time_remaining:.0f}s left): BUY YES x{total_no_size:.2f} @ {exit_price:.3f} (unwinding {len(no_positions)} NO positions @ avg {avg_no_entry:.3f}) = ${pnl:+.2f} ({pnl_pct:+.1%})")
-            # NO 포지션 제거는 봇의 on_exit_filled에서 처리 (주문 성공 후)
-            # 여기서는 제거하지 않음 (주문 실패 시 재시도 가능하도록)
-            return ScalpSignal(
-                action="EXIT",  # market order
-                token_id=ctx.token_yes,
-                price=exit_price,
-                size=total_no_size,
-                confidence=1.0,
-                edge=0.0,
-                reason=f"⚠️ FORCE UNWIND MARKET ({time_remaining:.0f}s left) {pnl_pct:+.1%}: BUY YES @ {exit_price:.3f}",
-                urgency="CRITICAL",
-                metadata={
-                    "side": "NO",
-                    "fallback_sell_price": ctx.no_price,
-                    "fallback_token": ctx.token_no,
-                    "avg_entry_price": avg_no_entry,
-                    "num_positions": len(no_positions)
-                }
-            )
+            avg_no_entry = total_no_cost / max(total_no_size, _EPS)
+            return self._make_unwind_signal(ctx, "NO", total_no_size, avg_no_entry, time_remaining, no_count)
 
         return None
 
+    def _make_unwind_signal(self, ctx: MarketContext, side: str, size: float, avg_entry: float,
+                            time_remaining: float, num_positions: Optional[int] = None) -> ScalpSignal:
+        """
+        강제 청산 MARKET 시그널 생성 (YES/NO 공용) - side 포지션을 반대 토큰 BUY로 unwinding
+
+        num_positions가 없으면 ctx 포지션 기준 (봇이 추적하지 못한 포지션)
+        """
+        if side == "YES":
+            exit_side, exit_price, exit_token = "NO", ctx.no_price, ctx.token_no
+            hold_price, hold_token = ctx.yes_price, ctx.token_yes
+        else:
+            exit_side, exit_price, exit_token = "YES", ctx.yes_price, ctx.token_yes
+            hold_price, hold_token = ctx.no_price, ctx.token_no
+
+        pnl, pnl_pct = _unwind_pnl(size, avg_entry, exit_price)
+        metadata = {"side": side, "fallback_sell_price": hold_price, "fallback_token": hold_token}
+
+        if num_positions is None:
+            logger.warning(f"FORCE UNWIND (from ctx): BUY {exit_side} x{size} @ {exit_price:.3f} (unwinding {side} @ {avg_entry:.3f}) = ${pnl:+.2f} ({pnl_pct:+.1%})")
+            reason = f"⚠️ FORCE UNWIND (ctx, {time_remaining:.0f}s): BUY {exit_side} @ {exit_price:.3f}"
+        else:
+            logger.warning(f"FORCE UNWIND MARKET ({time_remaining:.0f}s left): BUY {exit_side} x{size:.2f} @ {exit_price:.3f} (unwinding {num_positions} {side} positions @ avg {avg_entry:.3f}) = ${pnl:+.2f} ({pnl_pct:+.1%})")
+            reason = f"⚠️ FORCE UNWIND MARKET ({time_remaining:.0f}s left) {pnl_pct:+.1%}: BUY {exit_side} @ {exit_price:.3f}"
+            metadata["avg_entry_price"] = avg_entry
+            metadata["num_positions"] = num_positions
+
+        return ScalpSignal(
+            action="EXIT",  # market order
+            token_id=exit_token,
+            price=exit_price,
+            size=size,
+            confidence=1.0,
+            edge=0.0,
+            reason=reason,
+            urgency="CRITICAL",
+            metadata=metadata
+        )
+
     def get_position_summary(self, ctx: MarketContext) -> dict:
         """포지션 요약"""
-        positions = self.positions.get(ctx.market_id, [])
+        market_id = ctx.market_id
+        positions = self.positions.get(market_id, [])
 
         if not positions:
-            return {
-                "has_position": False,
-                "side": None,
-                "size": 0,
-                "avg_entry_price": 0,
-                "current_exit_price": 0,
-                "unrealized_pnl_usdc": 0,
-                "unrealized_pnl_pct": 0
-            }
-
-        # 모든 포지션 합산
-        total_size = sum(p.size for p in positions)
-        total_cost = sum(p.size * p.entry_price for p in positions)
-        avg_entry = total_cost / total_size if total_size > 0 else 0
-
-        # PnL 계산 (모든 포지션)
-        total_pnl = 0
-        for pos in positions:
-            if pos.side == "YES":
-                exit_price = ctx.no_price
-            else:
-                exit_price = ctx.yes_price
-            pnl = pos.size * (1.0 - pos.entry_price - exit_price)
-            total_pnl += pnl
+            return _EMPTY_SUMMARY.copy()
+
+        # side별 합산값은 버퍼에서 바로 읽음 (포지션 순회 없음)
+        yes_agg, no_agg = self.side_agg[market_id]
+        yes_price, no_price = ctx.yes_price, ctx.no_price
+
+        yes_size, yes_cost = yes_agg.size, yes_agg.cost
+        no_size, no_cost = no_agg.size, no_agg.cost
+        total_size = yes_size + no_size
+        total_cost = yes_cost + no_cost
+        avg_entry = total_cost / max(total_size, _EPS)
+
+        # PnL 계산 (모든 포지션) - YES는 NO 가격, NO는 YES 가격으로 청산
+        # sum(size * (1 - entry - exit)) = size_합 - cost_합 - size_합 * exit
+        total_pnl = (yes_size - yes_cost - yes_size * no_price) + (no_size - no_cost - no_size * yes_price)
 
-        pnl_pct = (total_pnl / total_cost) if total_cost > 0 else 0
+        pnl_pct = total_pnl / max(total_cost, _EPS)
 
         # 대표 side (가장 많은 쪽)
-        yes_size = sum(p.size for p in positions if p.side == "YES")
-        no_size = sum(p.size for p in positions if p.side == "NO")
         main_side = "YES" if yes_size > no_size else "NO"
 
         return {
@@ -933,7 +930,7 @@ class MultiLevelScalpingStrategy:
             "side": main_side,
             "size": total_size,
             "avg_entry_price": avg_entry,
-            "current_exit_price": ctx.no_price if main_side == "YES" else ctx.yes_price,
+            "current_exit_price": no_price if main_side == "YES" else yes_price,
             "unrealized_pnl_usdc": total_pnl,
             "unrealized_pnl_pct": pnl_pct,
             "num_positions": len(positions),
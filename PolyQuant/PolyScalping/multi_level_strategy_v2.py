@@ -10,17 +10,97 @@ Multi-Level Scalping Strategy V2 - Refactored
 5. 단순하고 명확한 로직
 """
 import time
+from collections import defaultdict
 from typing import Optional, List
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from loguru import logger
+import numpy as np
 
 from models import OrderSide
-from tracker import BTCPriceTracker
-
-
-@dataclass
+from btc_price_tracker import BTCPriceTracker
+
+try:
+    from numba import njit
+except ImportError:  # numba 미설치 시 순수 Python 함수 사용
+    njit = None
+
+# loguru DEBUG 레벨 번호 (핸들러 최소 레벨과 비교용)
+_DEBUG_LEVELNO = logger.level("DEBUG").no
+
+# <5분 모드 디버그 로그 최소 간격 (초, 마켓별)
+_DEBUG_LOG_INTERVAL = 5.0
+
+# 로그 템플릿 - loguru 지연 포맷 ({} 인자)용 상수, 로그가 실제로 출력될 때만 포맷됨
+_LOG_POSITION_ADDED = "✓ Position added [{}]: {} {} @ {:.3f} (target {:.0f}%) | Total positions: {}"
+_LOG_HIGH_SCALP_POSITION_ADDED = (
+    "✓ Position added [{}]: {} {} @ {:.3f} (target {:.0f}%) | "
+    "High scalp #{}/{} | Total positions: {}"
+)
+_LOG_EXIT_LEVEL = "✓ Exit confirmed (LEVEL): {} - Cycle #{}/{} completed - {} positions remaining"
+_LOG_EXIT_HIGH_SCALP = "✓ Exit confirmed (HIGH_SCALP): {} - {} positions remaining"
+_LOG_UNDER_5MIN = "⏰ <5min mode: {:.0f}s remaining"
+_LOG_FORCE_UNWIND_BOTH = "⚠️  FORCE UNWIND: Both YES ({}) and NO ({}) LEVEL positions exist! Unwinding larger first."
+_LOG_FORCE_UNWIND = (
+    "🚨 FORCE UNWIND: BUY {} x{} @ {:.3f} (unwinding {} {} @ avg {:.3f}) | "
+    "PnL: ${:+.2f} ({:+.1%}) | {:.0f}s left"
+)
+_LOG_TP_HIGH_SCALP = "✓ TP met (HIGH_SCALP {}): BUY {} x{} @ {:.3f} | PnL: ${:+.2f} ({:+.1%})"
+_LOG_TP_LEVEL = "✓ TP met (LEVEL {}): BUY {} x{} @ {:.3f} (unwinding {} @ avg {:.3f}) | PnL: ${:+.2f} ({:+.1%})"
+_LOG_LEVEL_ENTRY = "💰 LEVEL entry: {} @ {:.3f} < {:.2f} | Cycle {}/{} | {:.0f}s remaining"
+_LOG_HIGH_SCALP_ENTRY = "🎯 HIGH_SCALP entry: {} @ {:.3f} (≥{:.2f}) | #{}/{} | {:.0f}s remaining"
+
+
+# side 합산값 → (평균 진입가, 미실현 PnL, PnL%) 커널 - 청산/강제청산/요약 공용
+# (AOT 빌드 모듈 우선, 없으면 시그니처 지정 njit으로 import 시 컴파일 → 첫 틱에 JIT 지연 없음)
+def _side_pnl_py(total_size, cost, exit_price):
+    avg_entry = cost / total_size
+    pnl = total_size * (1.0 - avg_entry - exit_price)
+    pnl_pct = pnl / (total_size * avg_entry) if avg_entry > 0 else 0.0
+    return avg_entry, pnl, pnl_pct
+
+
+_SIDE_PNL_SIG = "UniTuple(f8, 3)(f8, f8, f8)"
+
+try:
+    # AOT 빌드 모듈 (python compile_kernels.py) - 첫 틱부터 JIT 컴파일/캐시 로드 없이 사용
+    from scalping_kernels import side_pnl as _side_pnl
+except ImportError:
+    _side_pnl = njit(_SIDE_PNL_SIG, cache=True)(_side_pnl_py) if njit is not None else _side_pnl_py
+
+
+def _side_meta_templates(**fields) -> dict:
+    """side별 메타데이터 템플릿 {"YES": {...}, "NO": {...}} ("side" 다음 fields 순서 유지)"""
+    return {side: {"side": side, **fields} for side in ("YES", "NO")}
+
+
+# 시그널 메타데이터 템플릿 - 경로/side별 고정 필드는 미리 만들어 두고 시그널마다 copy() 후 가변 필드만 채움
+# (봇이 metadata.get()으로 읽고 dict 그대로 넘기므로 dict 유지, 템플릿 자체는 수정 금지)
+_META_FORCE_UNWIND = _side_meta_templates(is_high_price_scalp=False, fallback_sell_price=0.0, fallback_token="")
+_META_HIGH_SCALP_EXIT = _side_meta_templates(is_high_price_scalp=True, fallback_sell_price=0.0, fallback_token="")
+_META_TP_LIMIT = _side_meta_templates(is_high_price_scalp=False, order_type="BUY", token_yes="", token_no="")
+_META_LEVEL_ENTRY = _side_meta_templates(level=0.0, is_high_price_scalp=False, profit_target=0.0)
+_META_HIGH_SCALP_ENTRY = _side_meta_templates(level=0.0, is_high_price_scalp=True, profit_target=0.0)
+
+
+def _exit_meta(template: dict, fallback_sell_price: float, fallback_token: str) -> dict:
+    """청산 메타데이터 (MARKET 실패 시 보유 토큰 SELL fallback 정보)"""
+    meta = template.copy()
+    meta["fallback_sell_price"] = fallback_sell_price
+    meta["fallback_token"] = fallback_token
+    return meta
+
+
+def _entry_meta(template: dict, level: float, profit_target: float) -> dict:
+    """진입 메타데이터 (진입 레벨 + 익절 목표)"""
+    meta = template.copy()
+    meta["level"] = level
+    meta["profit_target"] = profit_target
+    return meta
+
+
+@dataclass(frozen=True, slots=True)
 class LevelPosition:
-    """단일 포지션 (레벨별로 구분)"""
+    """단일 포지션 (레벨별로 구분, 생성 후 변경 없음)"""
     side: str  # "YES" or "NO"
     entry_price: float
     size: float
@@ -29,9 +109,61 @@ class LevelPosition:
     profit_target: float  # 익절 목표 (0.05 = 5%, 0.02 = 2%)
 
 
-@dataclass
+@dataclass(slots=True)
+class PositionBucket:
+    """같은 side/타입 포지션 묶음 - 체결 시 합산값을 누적해 매 틱 재계산하지 않음"""
+    positions: List[LevelPosition] = field(default_factory=list)
+    size: float = 0.0  # sum(size)
+    cost: float = 0.0  # sum(size * entry_price) - 평균 진입가 분자
+    target_exit: Optional[float] = None  # 익절 목표 청산가 (포지션 없으면 None)
+    level_mask: int = 0  # 진입가가 걸친 entry level 비트 (정렬된 레벨 인덱스, LEVEL 버킷만 사용)
+
+    def add(self, position: LevelPosition, profit_target: float):
+        self.positions.append(position)
+        self.size += position.size
+        self.cost += position.size * position.entry_price
+        self.retarget(profit_target)
+
+    def retarget(self, profit_target: float):
+        """목표 청산가 재계산: 1 - (1 + profit_target) * 평균 진입가"""
+        if self.positions:
+            self.target_exit = 1.0 - (1.0 + profit_target) * (self.cost / self.size)
+
+    def clear(self):
+        """버킷 비우기 - 포지션 리스트는 새로 만들지 않고 재사용 (사이클마다 할당 없음)"""
+        self.positions.clear()
+        self.size = 0.0
+        self.cost = 0.0
+        self.target_exit = None
+        self.level_mask = 0
+
+
+@dataclass(slots=True)
+class MarketState:
+    """마켓별 포지션 버킷 (LEVEL/HIGH SCALP × YES/NO) - on_order_filled/on_exit_filled에서만 갱신"""
+    yes_level: PositionBucket = field(default_factory=PositionBucket)
+    no_level: PositionBucket = field(default_factory=PositionBucket)
+    yes_high: PositionBucket = field(default_factory=PositionBucket)
+    no_high: PositionBucket = field(default_factory=PositionBucket)
+    last_debug_log: float = 0.0  # 마지막 <5분 모드 디버그 로그 시각
+
+    def bucket(self, side: str, is_high_scalp: bool) -> PositionBucket:
+        if side == "YES":
+            return self.yes_high if is_high_scalp else self.yes_level
+        return self.no_high if is_high_scalp else self.no_level
+
+    def clear_side(self, side: str):
+        if side == "YES":
+            self.yes_level.clear()
+            self.yes_high.clear()
+        else:
+            self.no_level.clear()
+            self.no_high.clear()
+
+
+@dataclass(slots=True)
 class MarketContext:
-    """마켓 평가에 필요한 모든 정보"""
+    """마켓 평가에 필요한 모든 정보 (봇이 매 틱 가격을 갱신하므로 frozen 아님)"""
     market_id: str
     end_time: float  # Unix timestamp
     yes_price: float  # 현재 YES ASK 가격
@@ -40,7 +172,7 @@ class MarketContext:
     token_no: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ScalpSignal:
     """전략 시그널"""
     action: str  # "ENTER_YES", "ENTER_NO", "EXIT"
@@ -85,11 +217,39 @@ class MultiLevelScalpingStrategyV2:
         self.max_completed_cycles = 3
 
         # === 상태 (포지션만) ===
-        self.positions: dict[str, List[LevelPosition]] = {}
+        self.positions: dict[str, List[LevelPosition]] = defaultdict(list)
+
+        # 포지션 버킷 + 합산값 (positions와 함께 갱신되는 파생 상태 - 카운트/평균가 O(1) 조회용)
+        self.market_states: dict[str, MarketState] = defaultdict(MarketState)
 
         # 완료된 사이클 추적 (LEVEL만, HIGH SCALP 제외)
         # 한 사이클 = 진입 → 익절 완료
-        self.completed_cycles: dict[str, int] = {}
+        self.completed_cycles: dict[str, int] = defaultdict(int)
+
+        # 설정 기반 캐시 (정렬된 레벨, 로그 레벨, evaluate 클로저)
+        self.on_config_changed()
+
+    def _refresh_log_level(self):
+        """현재 loguru 핸들러 기준 DEBUG 출력 여부 캐시"""
+        self._debug_enabled = logger._core.min_level <= _DEBUG_LEVELNO
+
+    def on_config_changed(self):
+        """설정 변경(또는 로그 핸들러 변경) 후 호출 - 설정에서 파생된 캐시와 evaluate 클로저 재생성"""
+        self._entry_levels_sorted = tuple(sorted(self.entry_levels, reverse=True))  # 진입 스캔용 (내림차순)
+        self._level_bits = {level: 1 << i for i, level in enumerate(self._entry_levels_sorted)}  # 레벨 → level_mask 비트
+        self._refresh_log_level()
+
+        # 버킷 캐시 (레벨 비트마스크, 익절 목표가)는 포지션 진입가에서 다시 계산
+        for state in self.market_states.values():
+            for bucket in (state.yes_level, state.no_level):
+                bucket.level_mask = 0
+                for p in bucket.positions:
+                    bucket.level_mask |= self._level_mask_for(p.entry_price)
+                bucket.retarget(self.level_profit_target)
+            for bucket in (state.yes_high, state.no_high):
+                bucket.retarget(self.high_scalp_profit_target)
+
+        self._evaluate = self._make_evaluate()
 
     def on_order_filled(self, market_id: str, side: str, price: float, size: float,
                        level: float, metadata: dict):
@@ -98,9 +258,6 @@ class MultiLevelScalpingStrategyV2:
 
         **중요**: 이 함수만이 포지션을 추가할 수 있음
         """
-        if market_id not in self.positions:
-            self.positions[market_id] = []
-
         is_high_scalp = metadata.get('is_high_price_scalp', False)
         profit_target = metadata.get('profit_target', self.level_profit_target)
 
@@ -114,6 +271,11 @@ class MultiLevelScalpingStrategyV2:
         )
 
         self.positions[market_id].append(position)
+        bucket_target = self.high_scalp_profit_target if is_high_scalp else self.level_profit_target
+        bucket = self.market_states[market_id].bucket(side, is_high_scalp)
+        bucket.add(position, bucket_target)
+        if not is_high_scalp:
+            bucket.level_mask |= self._level_mask_for(price)
 
         # 로그
         pos_type = "HIGH_SCALP" if is_high_scalp else "LEVEL"
@@ -122,16 +284,14 @@ class MultiLevelScalpingStrategyV2:
         if is_high_scalp:
             high_scalp_count = self._count_high_scalp_positions(market_id)
             logger.info(
-                f"✓ Position added [{pos_type}]: {side} {size} @ {price:.3f} "
-                f"(target {profit_target*100:.0f}%) | "
-                f"High scalp #{high_scalp_count}/{self.max_high_scalp_per_market} | "
-                f"Total positions: {total_positions}"
+                _LOG_HIGH_SCALP_POSITION_ADDED,
+                pos_type, side, size, price, profit_target * 100,
+                high_scalp_count, self.max_high_scalp_per_market, total_positions
             )
         else:
             logger.info(
-                f"✓ Position added [{pos_type}]: {side} {size} @ {price:.3f} "
-                f"(target {profit_target*100:.0f}%) | "
-                f"Total positions: {total_positions}"
+                _LOG_POSITION_ADDED,
+                pos_type, side, size, price, profit_target * 100, total_positions
             )
 
     def on_exit_filled(self, market_id: str, side: str, is_high_scalp: bool = False):
@@ -140,63 +300,69 @@ class MultiLevelScalpingStrategyV2:
 
         **중요**: 이 함수만이 포지션을 제거할 수 있음
         """
-        if market_id not in self.positions:
+        # 평가/체결된 적 없는 마켓은 무시 (market_states는 evaluate_market/on_order_filled에서 생성)
+        if market_id not in self.market_states:
             return
 
-        # 해당 side의 모든 포지션 제거
-        removed_positions = [p for p in self.positions[market_id] if p.side == side]
-        self.positions[market_id] = [p for p in self.positions[market_id] if p.side != side]
+        # 해당 side의 모든 포지션 제거 (한 번 순회 - 제거 여부는 길이 차이로 판단)
+        positions = self.positions[market_id]
+        remaining = [p for p in positions if p.side != side]
+        removed_any = len(remaining) != len(positions)
+        self.positions[market_id] = remaining
+        self.market_states[market_id].clear_side(side)
 
         # LEVEL 포지션 청산이면 completed_cycles 증가
-        if not is_high_scalp and removed_positions:
-            if market_id not in self.completed_cycles:
-                self.completed_cycles[market_id] = 0
+        if not is_high_scalp and removed_any:
             self.completed_cycles[market_id] += 1
 
             logger.info(
-                f"✓ Exit confirmed (LEVEL): {side} - "
-                f"Cycle #{self.completed_cycles[market_id]}/{self.max_completed_cycles} completed - "
-                f"{len(self.positions[market_id])} positions remaining"
+                _LOG_EXIT_LEVEL,
+                side, self.completed_cycles[market_id], self.max_completed_cycles, len(remaining)
             )
         else:
-            logger.info(
-                f"✓ Exit confirmed (HIGH_SCALP): {side} - "
-                f"{len(self.positions[market_id])} positions remaining"
-            )
+            logger.info(_LOG_EXIT_HIGH_SCALP, side, len(remaining))
 
     # === 유틸리티: 포지션에서 통계 계산 ===
 
     def _count_high_scalp_positions(self, market_id: str) -> int:
         """현재 HIGH SCALP 포지션 개수"""
-        if market_id not in self.positions:
+        state = self.market_states.get(market_id)
+        if state is None:
             return 0
-        return sum(1 for p in self.positions[market_id] if p.is_high_scalp)
+        return len(state.yes_high.positions) + len(state.no_high.positions)
 
-    def _get_level_positions(self, market_id: str) -> List[LevelPosition]:
-        """LEVEL 포지션만 필터링"""
-        if market_id not in self.positions:
-            return []
-        return [p for p in self.positions[market_id] if not p.is_high_scalp]
-
-    def _get_high_scalp_positions(self, market_id: str) -> List[LevelPosition]:
-        """HIGH SCALP 포지션만 필터링"""
-        if market_id not in self.positions:
-            return []
-        return [p for p in self.positions[market_id] if p.is_high_scalp]
+    def _level_mask_for(self, entry_price: float, tolerance: float = 0.01) -> int:
+        """진입가가 tolerance 이내로 걸친 레벨들의 비트마스크 (_entry_levels_sorted 인덱스)"""
+        mask = 0
+        for i, level in enumerate(self._entry_levels_sorted):
+            if abs(entry_price - level) < tolerance:
+                mask |= 1 << i
+        return mask
 
     def _has_position_at_level(self, market_id: str, level: float, tolerance: float = 0.01) -> bool:
-        """특정 레벨에 이미 포지션이 있는지 확인 (LEVEL만)"""
-        level_positions = self._get_level_positions(market_id)
-        for p in level_positions:
-            if abs(p.entry_price - level) < tolerance:
-                return True
+        """
+        특정 레벨에 이미 포지션이 있는지 확인 (LEVEL만)
+
+        설정된 entry level + 기본 tolerance면 버킷 level_mask 비트로 O(1) 판정,
+        그 외 (임의 가격/tolerance)는 포지션 스캔
+        """
+        state = self.market_states.get(market_id)
+        if state is None:
+            return False
+        bit = self._level_bits.get(level) if tolerance == 0.01 else None
+        if bit is not None:
+            return bool((state.yes_level.level_mask | state.no_level.level_mask) & bit)
+        for bucket in (state.yes_level, state.no_level):
+            for p in bucket.positions:
+                if abs(p.entry_price - level) < tolerance:
+                    return True
         return False
 
     # === 메인 평가 함수 ===
 
     def evaluate_market(self, ctx: MarketContext) -> Optional[ScalpSignal]:
         """
-        마켓 평가 및 신호 생성
+        마켓 평가 및 신호 생성 (본체는 _make_evaluate가 만든 클로저)
 
         우선순위:
         1. <5분: LEVEL 강제 청산 (MARKET order)
@@ -204,92 +370,166 @@ class MultiLevelScalpingStrategyV2:
         3. >=5분: LEVEL 진입
         4. >=5분: LEVEL 청산 (봇에서 LIMIT order 처리)
         """
-        market_id = ctx.market_id
-        time_remaining = ctx.end_time - time.time()
-
-        # 초기화
-        if market_id not in self.positions:
-            self.positions[market_id] = []
-        if market_id not in self.completed_cycles:
-            self.completed_cycles[market_id] = 0
-
-        # === 1. <5분: 긴급 상황 ===
-        if time_remaining < self.force_unwind_time:
-            logger.debug(f"⏰ <5min mode: {time_remaining:.0f}s remaining")
-
-            # 1-1. LEVEL 포지션 강제 청산
-            force_unwind_signal = self._check_force_unwind(ctx)
-            if force_unwind_signal:
-                return force_unwind_signal
-
-            # 1-2. HIGH SCALP 청산 체크
-            high_scalp_exit = self._check_high_scalp_exit(ctx)
-            if high_scalp_exit:
-                return high_scalp_exit
-
-            # 1-3. HIGH SCALP 진입 체크
-            high_scalp_entry = self._check_high_scalp_entry(ctx)
-            if high_scalp_entry:
-                return high_scalp_entry
-
-            # <5분에는 LEVEL 진입/청산 하지 않음
-            return None
+        return self._evaluate(ctx, time.time())
 
-        # === 2. >=5분: 일반 모드 ===
+    def evaluate_all(self, contexts: List[MarketContext]) -> List[Optional[ScalpSignal]]:
+        """
+        여러 마켓 일괄 평가 - 같은 시각에 evaluate_market을 마켓마다 호출한 것과 같은 결과
 
-        # 2-1. LEVEL 청산 체크 (TP 조건 만족 시)
-        # 실제 청산은 봇에서 LIMIT order로 처리
-        level_exit = self._check_level_exit(ctx)
-        if level_exit:
-            return level_exit
+        가격/남은 시간/캐시된 목표가를 배열로 모아 벡터 비교로 신호가 나올 수 있는 마켓만 고르고,
+        그 마켓만 스칼라 경로로 평가 (대부분의 마켓은 Python 분기 없이 None)
+        """
+        n = len(contexts)
+        signals: List[Optional[ScalpSignal]] = [None] * n
+        if not n:
+            return signals
+
+        now = time.time()
+        nan = float("nan")  # 목표가 없음 - NaN과의 비교는 항상 False
+        rows = []
+        for ctx in contexts:
+            state = self.market_states[ctx.market_id]
+            yes_level, no_level, yes_high, no_high = state.yes_level, state.no_level, state.yes_high, state.no_high
+            rows.append((
+                ctx.end_time, ctx.yes_price, ctx.no_price,
+                nan if yes_level.target_exit is None else yes_level.target_exit,
+                nan if no_level.target_exit is None else no_level.target_exit,
+                nan if yes_high.target_exit is None else yes_high.target_exit,
+                nan if no_high.target_exit is None else no_high.target_exit,
+                bool(yes_level.positions or no_level.positions),
+                bool(yes_high.positions or no_high.positions),
+                self.completed_cycles.get(ctx.market_id, 0),
+            ))
+        (end_time, yes, no, yes_level_t, no_level_t, yes_high_t, no_high_t,
+         has_level, has_high, cycles) = np.array(rows, dtype=np.float64).T
+        time_remaining = end_time - now
+        has_level, has_high = has_level > 0, has_high > 0
+
+        # <5분: 강제 청산 / HIGH SCALP 익절 / HIGH SCALP 진입 가능 마켓
+        urgent = time_remaining < self.force_unwind_time
+        threshold = self.high_scalp_threshold
+        urgent_candidates = urgent & (
+            has_level
+            | (no <= yes_high_t) | (yes <= no_high_t)
+            | (~has_high & ((yes >= threshold) | (no >= threshold)))
+        )
+        # >=5분: LEVEL 익절 / LEVEL 진입 가능 마켓 (가장 높은 레벨 아래로 내려온 가격)
+        top_level = self._entry_levels_sorted[0] if self._entry_levels_sorted else -np.inf
+        normal_candidates = ~urgent & (
+            (no <= yes_level_t) | (yes <= no_level_t)
+            | ((time_remaining >= self.min_time_for_level_entry)
+               & (cycles < self.max_completed_cycles)
+               & ((yes < top_level) | (no < top_level)))
+        )
 
-        # 2-2. LEVEL 진입 체크
-        level_entry = self._check_level_entry(ctx)
-        if level_entry:
-            return level_entry
+        evaluate = self._evaluate
+        for i in np.flatnonzero(urgent_candidates | normal_candidates).tolist():
+            signals[i] = evaluate(contexts[i], now)
+        return signals
 
-        return None
+    def _make_evaluate(self):
+        """
+        evaluate_market 본체 생성
+
+        설정값/상태 dict/체크 메서드를 클로저 변수로 고정해 매 틱 self 속성 조회를 없앰
+        (설정 변경 후에는 on_config_changed가 재생성)
+        """
+        force_unwind_time = self.force_unwind_time
+        debug_enabled = self._debug_enabled
+        market_states = self.market_states
+        check_force_unwind = self._check_force_unwind
+        check_high_scalp_exit = self._check_high_scalp_exit
+        check_high_scalp_entry = self._check_high_scalp_entry
+        check_level_exit = self._check_level_exit
+        check_level_entry = self._check_level_entry
+
+        def evaluate(ctx: MarketContext, now: float) -> Optional[ScalpSignal]:
+            market_id = ctx.market_id
+            # 시계는 호출부에서 틱(배치)당 한 번만 조회 - 하위 체크에는 인자로 전달
+            time_remaining = ctx.end_time - now
+
+            # 대부분의 틱은 아무 신호도 없으므로 버킷 상태(포지션 유무, 캐시된 목표가)로
+            # 하위 체크 호출 여부를 먼저 판단 - 필요할 때만 체크 함수 호출
+            state = market_states[market_id]  # 처음 보는 마켓이면 생성 (defaultdict)
+            yes_price, no_price = ctx.yes_price, ctx.no_price
+
+            # === 1. <5분: 긴급 상황 ===
+            if time_remaining < force_unwind_time:
+                # 매 틱 호출되므로 DEBUG 출력 시에만, 마켓당 _DEBUG_LOG_INTERVAL초에 한 번
+                if debug_enabled and now - state.last_debug_log >= _DEBUG_LOG_INTERVAL:
+                    state.last_debug_log = now
+                    logger.debug(_LOG_UNDER_5MIN, time_remaining)
+
+                # 1-1. LEVEL 포지션 강제 청산 (LEVEL 포지션이 있을 때만)
+                if state.yes_level.positions or state.no_level.positions:
+                    force_unwind_signal = check_force_unwind(ctx, time_remaining)
+                    if force_unwind_signal:
+                        return force_unwind_signal
+
+                # 1-2. HIGH SCALP 청산 체크 (캐시된 목표가에 도달했을 때만)
+                yes_target, no_target = state.yes_high.target_exit, state.no_high.target_exit
+                if (yes_target is not None and no_price <= yes_target) or (no_target is not None and yes_price <= no_target):
+                    high_scalp_exit = check_high_scalp_exit(ctx)
+                    if high_scalp_exit:
+                        return high_scalp_exit
+
+                # 1-3. HIGH SCALP 진입 체크 (HIGH SCALP 포지션이 없을 때만)
+                if not (state.yes_high.positions or state.no_high.positions):
+                    high_scalp_entry = check_high_scalp_entry(ctx, time_remaining)
+                    if high_scalp_entry:
+                        return high_scalp_entry
+
+                # <5분에는 LEVEL 진입/청산 하지 않음
+                return None
+
+            # === 2. >=5분: 일반 모드 ===
+
+            # 2-1. LEVEL 청산 체크 (TP 조건 만족 시 - 캐시된 목표가에 도달했을 때만)
+            # 실제 청산은 봇에서 LIMIT order로 처리
+            yes_target, no_target = state.yes_level.target_exit, state.no_level.target_exit
+            if (yes_target is not None and no_price <= yes_target) or (no_target is not None and yes_price <= no_target):
+                level_exit = check_level_exit(ctx)
+                if level_exit:
+                    return level_exit
+
+            # 2-2. LEVEL 진입 체크
+            level_entry = check_level_entry(ctx, time_remaining)
+            if level_entry:
+                return level_entry
+
+            return None
+
+        return evaluate
 
     # === 청산 체크 ===
 
-    def _check_force_unwind(self, ctx: MarketContext) -> Optional[ScalpSignal]:
+    def _check_force_unwind(self, ctx: MarketContext, time_remaining: float) -> Optional[ScalpSignal]:
         """
         5분 미만: LEVEL 포지션 강제 청산 (MARKET order)
         HIGH SCALP 포지션은 제외 (자체 익절 로직 사용)
         """
-        market_id = ctx.market_id
-        level_positions = self._get_level_positions(market_id)
+        state = self.market_states[ctx.market_id]
+        yes_bucket, no_bucket = state.yes_level, state.no_level
+        yes_positions, no_positions = yes_bucket.positions, no_bucket.positions
 
-        if not level_positions:
+        if not (yes_positions or no_positions):
             return None
 
-        time_remaining = ctx.end_time - time.time()
-
-        # Side별로 분류
-        yes_positions = [p for p in level_positions if p.side == "YES"]
-        no_positions = [p for p in level_positions if p.side == "NO"]
-
-        total_yes_size = sum(p.size for p in yes_positions)
-        total_no_size = sum(p.size for p in no_positions)
+        total_yes_size = yes_bucket.size
+        total_no_size = no_bucket.size
 
         # 둘 다 있으면 경고 (헷징 상태)
         if yes_positions and no_positions:
-            logger.warning(
-                f"⚠️  FORCE UNWIND: Both YES ({total_yes_size}) and NO ({total_no_size}) "
-                f"LEVEL positions exist! Unwinding larger first."
-            )
+            logger.warning(_LOG_FORCE_UNWIND_BOTH, total_yes_size, total_no_size)
 
         # YES 포지션이 더 크면 YES 청산
         if yes_positions and (not no_positions or total_yes_size >= total_no_size):
-            avg_entry = sum(p.size * p.entry_price for p in yes_positions) / total_yes_size
             exit_price = ctx.no_price
-            pnl = total_yes_size * (1.0 - avg_entry - exit_price)
-            pnl_pct = pnl / (total_yes_size * avg_entry) if avg_entry > 0 else 0
+            avg_entry, pnl, pnl_pct = _side_pnl(total_yes_size, yes_bucket.cost, exit_price)
 
             logger.warning(
-                f"🚨 FORCE UNWIND: BUY NO x{total_yes_size} @ {exit_price:.3f} "
-                f"(unwinding {len(yes_positions)} YES @ avg {avg_entry:.3f}) | "
-                f"PnL: ${pnl:+.2f} ({pnl_pct:+.1%}) | {time_remaining:.0f}s left"
+                _LOG_FORCE_UNWIND,
+                "NO", total_yes_size, exit_price, len(yes_positions), "YES", avg_entry, pnl, pnl_pct, time_remaining
             )
 
             return ScalpSignal(
@@ -299,25 +539,17 @@ class MultiLevelScalpingStrategyV2:
                 size=total_yes_size,
                 reason=f"FORCE UNWIND ({time_remaining:.0f}s): BUY NO @ {exit_price:.3f}",
                 urgency="CRITICAL",
-                metadata={
-                    "side": "YES",
-                    "is_high_price_scalp": False,
-                    "fallback_sell_price": ctx.yes_price,
-                    "fallback_token": ctx.token_yes
-                }
+                metadata=_exit_meta(_META_FORCE_UNWIND["YES"], ctx.yes_price, ctx.token_yes)
             )
 
         # NO 포지션 청산
         if no_positions:
-            avg_entry = sum(p.size * p.entry_price for p in no_positions) / total_no_size
             exit_price = ctx.yes_price
-            pnl = total_no_size * (1.0 - avg_entry - exit_price)
-            pnl_pct = pnl / (total_no_size * avg_entry) if avg_entry > 0 else 0
+            avg_entry, pnl, pnl_pct = _side_pnl(total_no_size, no_bucket.cost, exit_price)
 
             logger.warning(
-                f"🚨 FORCE UNWIND: BUY YES x{total_no_size} @ {exit_price:.3f} "
-                f"(unwinding {len(no_positions)} NO @ avg {avg_entry:.3f}) | "
-                f"PnL: ${pnl:+.2f} ({pnl_pct:+.1%}) | {time_remaining:.0f}s left"
+                _LOG_FORCE_UNWIND,
+                "YES", total_no_size, exit_price, len(no_positions), "NO", avg_entry, pnl, pnl_pct, time_remaining
             )
 
             return ScalpSignal(
@@ -327,12 +559,7 @@ class MultiLevelScalpingStrategyV2:
                 size=total_no_size,
                 reason=f"FORCE UNWIND ({time_remaining:.0f}s): BUY YES @ {exit_price:.3f}",
                 urgency="CRITICAL",
-                metadata={
-                    "side": "NO",
-                    "is_high_price_scalp": False,
-                    "fallback_sell_price": ctx.no_price,
-                    "fallback_token": ctx.token_no
-                }
+                metadata=_exit_meta(_META_FORCE_UNWIND["NO"], ctx.no_price, ctx.token_no)
             )
 
         return None
@@ -343,172 +570,68 @@ class MultiLevelScalpingStrategyV2:
 
         TP 조건 만족 시 신호 반환 (실제 LIMIT order는 봇에서 처리)
         """
-        market_id = ctx.market_id
-        level_positions = self._get_level_positions(market_id)
-
-        if not level_positions:
-            return None
-
-        # Side별로 분류
-        yes_positions = [p for p in level_positions if p.side == "YES"]
-        no_positions = [p for p in level_positions if p.side == "NO"]
-
-        # YES 포지션 청산 체크
-        if yes_positions:
-            total_size = sum(p.size for p in yes_positions)
-            avg_entry = sum(p.size * p.entry_price for p in yes_positions) / total_size
-            profit_target = self.level_profit_target
-
-            # Target exit = 1 - (1 + profit_target) * avg_entry
-            target_exit = 1.0 - (1.0 + profit_target) * avg_entry
-            current_exit = ctx.no_price
-
-            if current_exit <= target_exit:
-                pnl = total_size * (1.0 - avg_entry - current_exit)
-                pnl_pct = pnl / (total_size * avg_entry)
-
-                logger.info(
-                    f"✓ TP met (LEVEL YES): BUY NO x{total_size} @ {current_exit:.3f} "
-                    f"(unwinding YES @ avg {avg_entry:.3f}) | "
-                    f"PnL: ${pnl:+.2f} ({pnl_pct:+.1%})"
-                )
-
-                return ScalpSignal(
-                    action="PLACE_TP_LIMIT",
-                    token_id=ctx.token_no,
-                    price=current_exit,
-                    size=total_size,
-                    reason=f"TP LIMIT: BUY NO @ {current_exit:.3f} ({pnl_pct:+.1%})",
-                    urgency="MEDIUM",
-                    metadata={
-                        "side": "YES",
-                        "is_high_price_scalp": False,
-                        "order_type": "BUY",
-                        "token_yes": ctx.token_yes,
-                        "token_no": ctx.token_no
-                    }
-                )
-
-        # NO 포지션 청산 체크
-        if no_positions:
-            total_size = sum(p.size for p in no_positions)
-            avg_entry = sum(p.size * p.entry_price for p in no_positions) / total_size
-            profit_target = self.level_profit_target
-
-            target_exit = 1.0 - (1.0 + profit_target) * avg_entry
-            current_exit = ctx.yes_price
-
-            if current_exit <= target_exit:
-                pnl = total_size * (1.0 - avg_entry - current_exit)
-                pnl_pct = pnl / (total_size * avg_entry)
-
-                logger.info(
-                    f"✓ TP met (LEVEL NO): BUY YES x{total_size} @ {current_exit:.3f} "
-                    f"(unwinding NO @ avg {avg_entry:.3f}) | "
-                    f"PnL: ${pnl:+.2f} ({pnl_pct:+.1%})"
-                )
-
-                return ScalpSignal(
-                    action="PLACE_TP_LIMIT",
-                    token_id=ctx.token_yes,
-                    price=current_exit,
-                    size=total_size,
-                    reason=f"TP LIMIT: BUY YES @ {current_exit:.3f} ({pnl_pct:+.1%})",
-                    urgency="MEDIUM",
-                    metadata={
-                        "side": "NO",
-                        "is_high_price_scalp": False,
-                        "order_type": "BUY",
-                        "token_yes": ctx.token_yes,
-                        "token_no": ctx.token_no
-                    }
-                )
-
-        return None
+        state = self.market_states[ctx.market_id]
+        # YES 포지션 → NO 매수로 청산, NO 포지션 → YES 매수로 청산
+        return (self._maybe_exit(ctx, state.yes_level, "YES", "NO", ctx.no_price, ctx.token_no, ctx.yes_price, ctx.token_yes, False)
+                or self._maybe_exit(ctx, state.no_level, "NO", "YES", ctx.yes_price, ctx.token_yes, ctx.no_price, ctx.token_no, False))
 
     def _check_high_scalp_exit(self, ctx: MarketContext) -> Optional[ScalpSignal]:
         """HIGH SCALP 포지션 익절 체크 (MARKET order)"""
-        market_id = ctx.market_id
-        high_scalp_positions = self._get_high_scalp_positions(market_id)
+        state = self.market_states[ctx.market_id]
+        return (self._maybe_exit(ctx, state.yes_high, "YES", "NO", ctx.no_price, ctx.token_no, ctx.yes_price, ctx.token_yes, True)
+                or self._maybe_exit(ctx, state.no_high, "NO", "YES", ctx.yes_price, ctx.token_yes, ctx.no_price, ctx.token_no, True))
 
-        if not high_scalp_positions:
-            return None
-
-        # Side별로 분류
-        yes_positions = [p for p in high_scalp_positions if p.side == "YES"]
-        no_positions = [p for p in high_scalp_positions if p.side == "NO"]
-
-        # YES 포지션 청산 체크
-        if yes_positions:
-            total_size = sum(p.size for p in yes_positions)
-            avg_entry = sum(p.size * p.entry_price for p in yes_positions) / total_size
-            profit_target = self.high_scalp_profit_target
-
-            target_exit = 1.0 - (1.0 + profit_target) * avg_entry
-            current_exit = ctx.no_price
-
-            if current_exit <= target_exit:
-                pnl = total_size * (1.0 - avg_entry - current_exit)
-                pnl_pct = pnl / (total_size * avg_entry)
-
-                logger.info(
-                    f"✓ TP met (HIGH_SCALP YES): BUY NO x{total_size} @ {current_exit:.3f} | "
-                    f"PnL: ${pnl:+.2f} ({pnl_pct:+.1%})"
-                )
-
-                return ScalpSignal(
-                    action="EXIT",
-                    token_id=ctx.token_no,
-                    price=current_exit,
-                    size=total_size,
-                    reason=f"HIGH_SCALP TP: BUY NO @ {current_exit:.3f} ({pnl_pct:+.1%})",
-                    urgency="HIGH",
-                    metadata={
-                        "side": "YES",
-                        "is_high_price_scalp": True,
-                        "fallback_sell_price": ctx.yes_price,
-                        "fallback_token": ctx.token_yes
-                    }
-                )
+    def _maybe_exit(self, ctx: MarketContext, bucket: PositionBucket, side: str, exit_side: str,
+                    current_exit: float, exit_token: str, hold_price: float, hold_token: str,
+                    is_high_scalp: bool) -> Optional[ScalpSignal]:
+        """
+        한 버킷의 익절 체크 (LEVEL/HIGH SCALP × YES/NO 공용)
 
-        # NO 포지션 청산 체크
-        if no_positions:
-            total_size = sum(p.size for p in no_positions)
-            avg_entry = sum(p.size * p.entry_price for p in no_positions) / total_size
-            profit_target = self.high_scalp_profit_target
+        목표가 (1 - (1 + profit_target) * avg_entry)는 체결 시 캐시 - 반대 토큰 가격이 목표가 이하면 신호
+        LEVEL은 TP LIMIT (봇에서 LIMIT order 처리), HIGH SCALP은 MARKET EXIT
+        """
+        target_exit = bucket.target_exit
+        if target_exit is None or current_exit > target_exit:
+            return None
 
-            target_exit = 1.0 - (1.0 + profit_target) * avg_entry
-            current_exit = ctx.yes_price
+        total_size = bucket.size
+        avg_entry, pnl, pnl_pct = _side_pnl(total_size, bucket.cost, current_exit)
 
-            if current_exit <= target_exit:
-                pnl = total_size * (1.0 - avg_entry - current_exit)
-                pnl_pct = pnl / (total_size * avg_entry)
+        if is_high_scalp:
+            logger.info(_LOG_TP_HIGH_SCALP, side, exit_side, total_size, current_exit, pnl, pnl_pct)
 
-                logger.info(
-                    f"✓ TP met (HIGH_SCALP NO): BUY YES x{total_size} @ {current_exit:.3f} | "
-                    f"PnL: ${pnl:+.2f} ({pnl_pct:+.1%})"
-                )
+            return ScalpSignal(
+                action="EXIT",
+                token_id=exit_token,
+                price=current_exit,
+                size=total_size,
+                reason=f"HIGH_SCALP TP: BUY {exit_side} @ {current_exit:.3f} ({pnl_pct:+.1%})",
+                urgency="HIGH",
+                metadata=_exit_meta(_META_HIGH_SCALP_EXIT[side], hold_price, hold_token)
+            )
 
-                return ScalpSignal(
-                    action="EXIT",
-                    token_id=ctx.token_yes,
-                    price=current_exit,
-                    size=total_size,
-                    reason=f"HIGH_SCALP TP: BUY YES @ {current_exit:.3f} ({pnl_pct:+.1%})",
-                    urgency="HIGH",
-                    metadata={
-                        "side": "NO",
-                        "is_high_price_scalp": True,
-                        "fallback_sell_price": ctx.no_price,
-                        "fallback_token": ctx.token_no
-                    }
-                )
+        logger.info(
+            _LOG_TP_LEVEL,
+            side, exit_side, total_size, current_exit, side, avg_entry, pnl, pnl_pct
+        )
 
-        return None
+        metadata = _META_TP_LIMIT[side].copy()
+        metadata["token_yes"] = ctx.token_yes
+        metadata["token_no"] = ctx.token_no
+
+        return ScalpSignal(
+            action="PLACE_TP_LIMIT",
+            token_id=exit_token,
+            price=current_exit,
+            size=total_size,
+            reason=f"TP LIMIT: BUY {exit_side} @ {current_exit:.3f} ({pnl_pct:+.1%})",
+            urgency="MEDIUM",
+            metadata=metadata
+        )
 
     # === 진입 체크 ===
 
-    def _check_level_entry(self, ctx: MarketContext) -> Optional[ScalpSignal]:
+    def _check_level_entry(self, ctx: MarketContext, time_remaining: float) -> Optional[ScalpSignal]:
         """
         LEVEL 진입 체크 (5분 이상만)
 
@@ -519,7 +642,6 @@ class MultiLevelScalpingStrategyV2:
         - 포지션이 없거나 반대편만 있을 때
         """
         market_id = ctx.market_id
-        time_remaining = ctx.end_time - time.time()
 
         # 7분 미만이면 LEVEL 진입 금지
         if time_remaining < self.min_time_for_level_entry:
@@ -531,81 +653,70 @@ class MultiLevelScalpingStrategyV2:
             return None
 
         # 현재 LEVEL 포지션 확인
-        level_positions = self._get_level_positions(market_id)
-        yes_positions = [p for p in level_positions if p.side == "YES"]
-        no_positions = [p for p in level_positions if p.side == "NO"]
+        state = self.market_states[market_id]
+        yes_positions = state.yes_level.positions
+        no_positions = state.no_level.positions
 
         # YES와 NO 둘 다 있으면 진입 금지 (헷징 방지)
         if yes_positions and no_positions:
             return None
 
-        # YES 진입 체크 (레벨 하향 돌파)
-        for level in self.entry_levels:
-            if ctx.yes_price < level:
+        # 이미 진입한 레벨 (양쪽 LEVEL 포지션 진입가 기준, 체결 시 계산된 비트마스크)
+        occupied = state.yes_level.level_mask | state.no_level.level_mask
+        yes_price, no_price = ctx.yes_price, ctx.no_price
+        levels = self._entry_levels_sorted
+
+        # YES 진입 체크 (레벨 하향 돌파) - NO 포지션이 있으면 진입 금지 (헷징 방지)
+        if not no_positions:
+            for i, level in enumerate(levels):
+                # 내림차순이므로 이 레벨 이상이면 나머지 레벨도 불만족
+                if yes_price >= level:
+                    break
                 # 이미 이 레벨에 진입했는지 체크
-                if self._has_position_at_level(market_id, level):
-                    continue
-
-                # NO 포지션이 있으면 진입 금지 (헷징 방지)
-                if no_positions:
+                if occupied >> i & 1:
                     continue
 
                 logger.info(
-                    f"💰 LEVEL entry: YES @ {ctx.yes_price:.3f} < {level:.2f} | "
-                    f"Cycle {cycles+1}/{self.max_completed_cycles} | "
-                    f"{time_remaining:.0f}s remaining"
+                    _LOG_LEVEL_ENTRY,
+                    "YES", yes_price, level, cycles + 1, self.max_completed_cycles, time_remaining
                 )
 
                 return ScalpSignal(
                     action="ENTER_YES",
                     token_id=ctx.token_yes,
-                    price=ctx.yes_price,
+                    price=yes_price,
                     size=self.level_size,
-                    reason=f"LEVEL entry: YES @ {ctx.yes_price:.3f} (level {level:.2f})",
+                    reason=f"LEVEL entry: YES @ {yes_price:.3f} (level {level:.2f})",
                     urgency="MEDIUM",
-                    metadata={
-                        "side": "YES",
-                        "level": level,
-                        "is_high_price_scalp": False,
-                        "profit_target": self.level_profit_target
-                    }
+                    metadata=_entry_meta(_META_LEVEL_ENTRY["YES"], level, self.level_profit_target)
                 )
 
-        # NO 진입 체크 (레벨 하향 돌파)
-        for level in self.entry_levels:
-            if ctx.no_price < level:
-                # 이미 이 레벨에 진입했는지 체크
-                if self._has_position_at_level(market_id, level):
-                    continue
-
-                # YES 포지션이 있으면 진입 금지 (헷징 방지)
-                if yes_positions:
+        # NO 진입 체크 (레벨 하향 돌파) - YES 포지션이 있으면 진입 금지 (헷징 방지)
+        if not yes_positions:
+            for i, level in enumerate(levels):
+                if no_price >= level:
+                    break
+                if occupied >> i & 1:
                     continue
 
                 logger.info(
-                    f"💰 LEVEL entry: NO @ {ctx.no_price:.3f} < {level:.2f} | "
-                    f"Cycle {cycles+1}/{self.max_completed_cycles} | "
-                    f"{time_remaining:.0f}s remaining"
+                    _LOG_LEVEL_ENTRY,
+                    "NO", no_price, level, cycles + 1, self.max_completed_cycles, time_remaining
                 )
 
                 return ScalpSignal(
                     action="ENTER_NO",
                     token_id=ctx.token_no,
-                    price=ctx.no_price,
+                    price=no_price,
                     size=self.level_size,
-                    reason=f"LEVEL entry: NO @ {ctx.no_price:.3f} (level {level:.2f})",
+                    reason=f"LEVEL entry: NO @ {no_price:.3f} (level {level:.2f})",
                     urgency="MEDIUM",
-                    metadata={
-                        "side": "NO",
-                        "level": level,
-                        "is_high_price_scalp": False,
-                        "profit_target": self.level_profit_target
-                    }
+                    metadata=_entry_meta(_META_LEVEL_ENTRY["NO"], level, self.level_profit_target)
                 )
 
         return None
 
-    def _check_high_scalp_entry(self, ctx: MarketContext) -> Optional[ScalpSignal]:
+    def _check_high_scalp_entry(self, ctx: MarketContext, time_remaining: float) -> Optional[ScalpSignal]:
         """
         HIGH SCALP 진입 체크 (5분 미만만)
 
@@ -615,7 +726,6 @@ class MultiLevelScalpingStrategyV2:
         - HIGH SCALP 포지션이 max 미만
         """
         market_id = ctx.market_id
-        time_remaining = ctx.end_time - time.time()
 
         # 5분 이상이면 스킵
         if time_remaining >= self.force_unwind_time:
@@ -626,57 +736,45 @@ class MultiLevelScalpingStrategyV2:
         if high_scalp_count >= self.max_high_scalp_per_market:
             return None
 
-        # 현재 HIGH SCALP 포지션 확인
-        high_scalp_positions = self._get_high_scalp_positions(market_id)
-
         # 이미 포지션이 있으면 진입 금지 (한 번에 하나만)
-        if high_scalp_positions:
+        if high_scalp_count:
             return None
 
+        yes_price, no_price = ctx.yes_price, ctx.no_price
+        threshold = self.high_scalp_threshold
+
         # YES가 threshold 이상이면 YES 매수
-        if ctx.yes_price >= self.high_scalp_threshold:
+        if yes_price >= threshold:
             logger.info(
-                f"🎯 HIGH_SCALP entry: YES @ {ctx.yes_price:.3f} (≥{self.high_scalp_threshold:.2f}) | "
-                f"#{high_scalp_count+1}/{self.max_high_scalp_per_market} | "
-                f"{time_remaining:.0f}s remaining"
+                _LOG_HIGH_SCALP_ENTRY,
+                "YES", yes_price, threshold, high_scalp_count + 1, self.max_high_scalp_per_market, time_remaining
             )
 
             return ScalpSignal(
                 action="ENTER_YES",
                 token_id=ctx.token_yes,
-                price=ctx.yes_price,
+                price=yes_price,
                 size=self.high_scalp_size,
-                reason=f"HIGH_SCALP: YES @ {ctx.yes_price:.3f} ({time_remaining:.0f}s)",
+                reason=f"HIGH_SCALP: YES @ {yes_price:.3f} ({time_remaining:.0f}s)",
                 urgency="HIGH",
-                metadata={
-                    "side": "YES",
-                    "level": ctx.yes_price,
-                    "is_high_price_scalp": True,
-                    "profit_target": self.high_scalp_profit_target
-                }
+                metadata=_entry_meta(_META_HIGH_SCALP_ENTRY["YES"], yes_price, self.high_scalp_profit_target)
             )
 
         # NO가 threshold 이상이면 NO 매수
-        if ctx.no_price >= self.high_scalp_threshold:
+        if no_price >= threshold:
             logger.info(
-                f"🎯 HIGH_SCALP entry: NO @ {ctx.no_price:.3f} (≥{self.high_scalp_threshold:.2f}) | "
-                f"#{high_scalp_count+1}/{self.max_high_scalp_per_market} | "
-                f"{time_remaining:.0f}s remaining"
+                _LOG_HIGH_SCALP_ENTRY,
+                "NO", no_price, threshold, high_scalp_count + 1, self.max_high_scalp_per_market, time_remaining
             )
 
             return ScalpSignal(
                 action="ENTER_NO",
                 token_id=ctx.token_no,
-                price=ctx.no_price,
+                price=no_price,
                 size=self.high_scalp_size,
-                reason=f"HIGH_SCALP: NO @ {ctx.no_price:.3f} ({time_remaining:.0f}s)",
+                reason=f"HIGH_SCALP: NO @ {no_price:.3f} ({time_remaining:.0f}s)",
                 urgency="HIGH",
-                metadata={
-                    "side": "NO",
-                    "level": ctx.no_price,
-                    "is_high_price_scalp": True,
-                    "profit_target": self.high_scalp_profit_target
-                }
+                metadata=_entry_meta(_META_HIGH_SCALP_ENTRY["NO"], no_price, self.high_scalp_profit_target)
             )
 
         return None
@@ -688,30 +786,27 @@ class MultiLevelScalpingStrategyV2:
         if not positions:
             return {"has_position": False}
 
-        # Side별 합산
-        yes_positions = [p for p in positions if p.side == "YES"]
-        no_positions = [p for p in positions if p.side == "NO"]
-
-        total_yes_size = sum(p.size for p in yes_positions)
-        total_no_size = sum(p.size for p in no_positions)
+        # Side별 합산 (LEVEL + HIGH SCALP 버킷 합산값)
+        state = self.market_states[ctx.market_id]
+        total_yes_size = state.yes_level.size + state.yes_high.size
+        total_no_size = state.no_level.size + state.no_high.size
 
         # 메인 side 결정
         if total_yes_size > total_no_size:
             main_side = "YES"
             total_size = total_yes_size
-            avg_entry = sum(p.size * p.entry_price for p in yes_positions) / total_yes_size
+            total_cost = state.yes_level.cost + state.yes_high.cost
             current_exit_price = ctx.no_price
         elif total_no_size > 0:
             main_side = "NO"
             total_size = total_no_size
-            avg_entry = sum(p.size * p.entry_price for p in no_positions) / total_no_size
+            total_cost = state.no_level.cost + state.no_high.cost
             current_exit_price = ctx.yes_price
         else:
             return {"has_position": False}
 
         # PnL 계산
-        pnl = total_size * (1.0 - avg_entry - current_exit_price)
-        pnl_pct = pnl / (total_size * avg_entry) if avg_entry > 0 else 0
+        avg_entry, pnl, pnl_pct = _side_pnl(total_size, total_cost, current_exit_price)
 
         return {
             "has_position": True,
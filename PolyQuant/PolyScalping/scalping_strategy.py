@@ -5,14 +5,14 @@ BTC 15분 마켓 스캘핑 전략
 from dataclasses import dataclass
 from typing import Optional, List, Dict, Any
 from loguru import logger
-from config import config
+from config import get_config
 from btc_price_tracker import BTCPriceTracker, MarketPriceAnalyzer
 import time
 
 
-@dataclass
+@dataclass(slots=True)
 class ScalpSignal:
-    """스캘핑 신호"""
+    """스캘핑 신호 (틱마다 생성되므로 __dict__ 없이 slots 사용)"""
     action: str  # "ENTER_YES", "ENTER_NO", "EXIT", "HOLD"
     token_id: str
     price: float
@@ -63,8 +63,8 @@ class BTCScalpingStrategy:
         self.min_confidence = 0.5  # 50% 최소 신뢰도
 
         # 포지션 관리
-        self.max_position_size = config.shares_per_clip * 2  # 20 shares
-        self.scale_in_size = config.shares_per_clip  # 10 shares씩
+        self.max_position_size = get_config().shares_per_clip * 2  # 20 shares
+        self.scale_in_size = get_config().shares_per_clip  # 10 shares씩
 
         # 타이밍
         self.min_time_to_enter = 180  # 진입은 만료 3분 전까지
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from typing import Optional, Tuple
 from loguru import logger
-from config import config
+from config import get_config
 
 @dataclass
 class TradeSignal:
@@ -14,13 +14,13 @@ class TradeSignal:
 class PolyScalpingStrategy:
     def __init__(self):
         self.entry_prices = [
-            config.entry_price_1,
-            config.entry_price_2,
-            config.entry_price_3
+            get_config().entry_price_1,
+            get_config().entry_price_2,
+            get_config().entry_price_3
         ]
-        self.shares_clip = config.shares_per_clip
-        self.tp_spread = config.unwind_profit_spread
-        self.sl_spread = config.stop_loss_spread
+        self.shares_clip = get_config().shares_per_clip
+        self.tp_spread = get_config().unwind_profit_spread
+        self.sl_spread = get_config().stop_loss_spread
         
     def check_market(self, 
                     token_yes: str, 
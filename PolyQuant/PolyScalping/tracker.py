@@ -1,12 +1,99 @@
 import asyncio
 import json
 import time
-from typing import Dict, List, Optional, Callable, Set
+from typing import Dict, List, Optional, Callable, Set, Union
 import aiohttp
 from loguru import logger
 from dataclasses import dataclass, field
 
-from config import config
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+from config import get_config
+
+try:
+    import msgspec
+
+    class BookLevel(msgspec.Struct):
+        price: float
+        size: float
+
+    class PriceChange(msgspec.Struct):
+        asset_id: Optional[str] = None
+        side: Optional[str] = None
+        price: float = 0.0
+        size: float = 0.0
+
+    class WsItem(msgspec.Struct):
+        asset_id: Optional[str] = None
+        bids: List[BookLevel] = []
+        asks: List[BookLevel] = []
+        price_changes: List[PriceChange] = []
+
+    # strict=False: CLOB sends prices/sizes as strings, decoded straight to float
+    _decode_ws_strict = msgspec.json.Decoder(Union[List[WsItem], WsItem], strict=False).decode
+
+    def _decode_ws(raw):
+        try:
+            return _decode_ws_strict(raw)
+        except msgspec.ValidationError:
+            # One bad field must not drop the whole frame (e.g. a full book snapshot)
+            return _decode_ws_tolerant(raw)
+
+except ImportError:
+    @dataclass
+    class BookLevel:
+        price: float
+        size: float
+
+    @dataclass
+    class PriceChange:
+        asset_id: Optional[str] = None
+        side: Optional[str] = None
+        price: float = 0.0
+        size: float = 0.0
+
+    @dataclass
+    class WsItem:
+        asset_id: Optional[str] = None
+        bids: List[BookLevel] = field(default_factory=list)
+        asks: List[BookLevel] = field(default_factory=list)
+        price_changes: List[PriceChange] = field(default_factory=list)
+
+    def _decode_ws(raw):
+        return _decode_ws_tolerant(raw)
+
+
+def _parse_level(d) -> Optional[tuple]:
+    """(price, size) of one level/change dict, or None if either field is unparseable."""
+    try:
+        return float(d.get("price", 0)), float(d.get("size", 0))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _parse_item(d: Dict) -> WsItem:
+    """Field-by-field parse: bad levels/changes are skipped individually, null ids are tolerated."""
+    bids = [BookLevel(*ps) for ps in map(_parse_level, d.get("bids") or ()) if ps is not None]
+    asks = [BookLevel(*ps) for ps in map(_parse_level, d.get("asks") or ()) if ps is not None]
+    price_changes = []
+    for c in d.get("price_changes") or ():
+        ps = _parse_level(c)
+        if ps is not None:
+            price_changes.append(PriceChange(c.get("asset_id"), c.get("side"), *ps))
+    asset_id = d.get("asset_id")
+    return WsItem(asset_id if isinstance(asset_id, str) else None, bids, asks, price_changes)
+
+
+def _decode_ws_tolerant(raw):
+    data = _json_loads(raw)
+    if isinstance(data, list):
+        return [_parse_item(d) for d in data if isinstance(d, dict)]
+    return _parse_item(data)
+
 
 @dataclass
 class OrderBook:
@@ -17,8 +104,8 @@ class OrderBook:
     _asks: Dict[float, float] = field(default_factory=dict)
     last_updated: float = 0.0
 
-    def update(self, bids: List[Dict], asks: List[Dict]):
-        """Update levels from WS message."""
+    def update(self, bids: List[BookLevel], asks: List[BookLevel]):
+        """Update levels from WS message (levels carry float .price/.size)."""
         # 🔍 DEBUG: Log before update
         old_best_bid = self.get_best_bid()
         old_best_ask = self.get_best_ask()
@@ -33,18 +120,14 @@ class OrderBook:
         if new_best_bid != old_best_bid or new_best_ask != old_best_ask:
             logger.debug(f"🔄 OrderBook {self.token_id[:16]}... prices changed: bid {old_best_bid:.4f}→{new_best_bid:.4f}, ask {old_best_ask:.4f}→{new_best_ask:.4f}")
 
-    def _update_side(self, side_map: Dict[float, float], updates: List[Dict]):
+    def _update_side(self, side_map: Dict[float, float], updates: List[BookLevel]):
         for u in updates:
-            try:
-                p = float(u.get('price', 0))
-                s = float(u.get('size', 0))
-                if s == 0:
-                    if p in side_map:
-                        del side_map[p]
-                else:
-                    side_map[p] = s
-            except Exception:
-                continue
+            p = u.price
+            s = u.size
+            if s == 0:
+                side_map.pop(p, None)
+            else:
+                side_map[p] = s
 
     def get_best_bid(self) -> float:
         if not self._bids: return 0.0
@@ -64,7 +147,7 @@ class OrderBook:
 
 class MarketDataStreamer:
     def __init__(self):
-        self.ws_url = config.polymarket_ws_url
+        self.ws_url = get_config().polymarket_ws_url
         self.subscribed_tokens: Set[str] = set()
         self.order_books: Dict[str, OrderBook] = {} # token_id -> OrderBook
         self.callbacks: List[Callable[[str, OrderBook], None]] = []
@@ -172,7 +255,7 @@ class MarketDataStreamer:
                                     try:
                                         if not msg.data:
                                             continue
-                                        data = json.loads(msg.data)
+                                        data = _decode_ws(msg.data)
                                         # Track message reception
                                         self.last_msg_time = time.time()
                                         self.msg_count += 1
@@ -262,7 +345,7 @@ class MarketDataStreamer:
         if isinstance(data, list):
             for item in data:
                 await self._process_item(item)
-        elif isinstance(data, dict):
+        else:
             await self._process_item(data)
 
     async def _process_item(self, item):
@@ -274,11 +357,11 @@ class MarketDataStreamer:
             logger.debug(f"📦 Raw WS item: {str(item)[:500]}")
 
         # 방법 1: asset_id가 직접 있는 경우 (orderbook snapshot)
-        asset_id = item.get("asset_id")
+        asset_id = item.asset_id
         if asset_id and asset_id in self.order_books:
             ob = self.order_books[asset_id]
-            bids = item.get("bids", [])
-            asks = item.get("asks", [])
+            bids = item.bids
+            asks = item.asks
 
             # 🔍 DEBUG: Log orderbook data
             if bids or asks:
@@ -304,20 +387,20 @@ class MarketDataStreamer:
                         logger.error(f"Callback error: {e}")
 
         # 방법 2: price_changes가 있는 경우 (실시간 업데이트)
-        price_changes = item.get("price_changes", [])
+        price_changes = item.price_changes
         if price_changes and self.msg_count % 50 == 0:
             logger.debug(f"💱 Price changes: {len(price_changes)} changes")
 
         # Process price_changes - these are incremental updates to the orderbook
         for change in price_changes:
-            asset_id = change.get("asset_id")
+            asset_id = change.asset_id
             if not asset_id or asset_id not in self.order_books:
                 continue
 
             ob = self.order_books[asset_id]
-            side = change.get("side")  # "BUY" or "SELL"
-            price = change.get("price")
-            size = change.get("size")
+            side = change.side  # "BUY" or "SELL"
+            price = change.price
+            size = change.size
 
             # 🔍 DEBUG: Log price change details (less frequently)
             if self.msg_count % 100 == 0:
@@ -327,9 +410,9 @@ class MarketDataStreamer:
                 has_relevant_data = True
                 # SELL side = ask (someone wants to sell), BUY side = bid (someone wants to buy)
                 if side == "SELL":
-                    ob.update([], [{"price": price, "size": size}])  # Update asks
+                    ob.update((), (change,))  # Update asks
                 elif side == "BUY":
-                    ob.update([{"price": price, "size": size}], [])  # Update bids
+                    ob.update((change,), ())  # Update bids
 
                 # Trigger callbacks for each change
                 for cb in self.callbacks:
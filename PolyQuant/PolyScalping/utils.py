@@ -3,7 +3,7 @@ import time
 import math
 from datetime import datetime
 from loguru import logger
-from config import config
+from config import get_config
 
 def setup_logging():
     """Configure loguru logging."""
@@ -11,7 +11,7 @@ def setup_logging():
     logger.add(
         sys.stderr,
         format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-        level=config.log_level
+        level=get_config().log_level
     )
     logger.add(
         "polyscalping.log",